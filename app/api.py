@@ -1,69 +1,178 @@
 import logging
+import os
 import sys
+import time
 import traceback
-import uuid
 from functools import wraps
 from http import HTTPStatus
-from typing import Callable, Dict, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Tuple
 
-from flask import Flask, Response, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 
-from app.checkout_calculator import CheckoutCalculator
+from app.json_provider import install_json_provider
 from app.logger_config import setup_logging
+from app.metrics import REGISTRY, time_stage
+from app.order_service import (
+    OrderService,
+    describe_error,
+    error_status,
+    etag_for,
+    etag_matches,
+    parse_since,
+)
+from app.order_store import create_order_store
+from app.quote_cache import get_quote_cache
+from config.app_config import load_app_config
+from config.config_loader import (
+    get_pricing_config,
+    pricing_config_stats,
+    reload_pricing_config,
+)
+from config.venue_registry import VenueRegistry
+
+if TYPE_CHECKING:
+    from app.profiling import ProfilingMiddleware
 
-setup_logging(
+app_config = load_app_config()
+log_queue_handler = setup_logging(
     level=logging.INFO,
     log_to_file=True,
-    log_file_path="logs/flask-app.log",
+    log_file_path=os.path.join(app_config.log_dir, "flask-app.log"),
     logger_name="flask-app",
+    queue_size=app_config.log_queue_size,
+    block_when_full=app_config.log_queue_policy == "block",
 )
 logger = logging.getLogger("flask-app")
 app = Flask(__name__)
+install_json_provider(app, app_config.json_provider)
+
+# Open orders live in a bounded in-memory store by default; set
+# RESTAURANT_ORDER_STORE=sqlite to keep them durable and shared between workers
+order_store = create_order_store(app_config)
+venue_registry = VenueRegistry(app_config.venue_config_dir)
+order_service = OrderService(order_store, venues=venue_registry)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    labelnames=("method", "route"),
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    "http_requests_total",
+    "Requests served by route and status code",
+    labelnames=("method", "route", "status"),
+)
+ERRORS_TOTAL = REGISTRY.counter(
+    "http_errors_total",
+    "Errors returned by handle_errors by status code and exception type",
+    labelnames=("status", "error_type"),
+)
+REGISTRY.gauge(
+    "active_orders", "Open orders in the order store", lambda: len(order_service.store)
+)
+for stat, documentation in (
+    ("evictions", "Orders evicted from the full order store"),
+    ("expirations", "Orders dropped after order_ttl_seconds without use"),
+):
+    # Stores without the counter, such as SQLite without evictions, report 0
+    REGISTRY.gauge(
+        f"order_store_{stat}",
+        documentation,
+        lambda stat=stat: order_service.store.stats().get(stat, 0),
+    )
+REGISTRY.gauge(
+    "pricing_config_cache_hits",
+    "Pricing config lookups served from the cache",
+    lambda: pricing_config_stats()["hits"],
+)
+REGISTRY.gauge(
+    "pricing_config_reloads",
+    "Times the pricing config file was parsed",
+    lambda: pricing_config_stats()["reloads"],
+)
+REGISTRY.gauge(
+    "venue_configs",
+    "Venues with a pricing config",
+    lambda: venue_registry.stats()["venues"],
+)
+REGISTRY.gauge(
+    "price_tables",
+    "Distinct compiled price tables in use, shared by configs with equal prices",
+    lambda: venue_registry.stats()["price_tables"],
+)
+REGISTRY.gauge(
+    "log_records_dropped",
+    "Log records discarded because the log queue was full",
+    lambda: log_queue_handler.dropped if log_queue_handler else 0,
+)
+for stat, documentation in (
+    ("hits", "Quotes served from the quote cache"),
+    ("misses", "Quotes that had to be priced"),
+    ("evictions", "Quotes evicted from the full quote cache"),
+):
+    REGISTRY.gauge(
+        f"quote_cache_{stat}",
+        documentation,
+        lambda stat=stat: get_quote_cache().stats()[stat],
+    )
 
 
-# Store active orders in memory (in production, this should be a proper database)
-active_orders = {}
-
-
-def validate_checkout_data(data: Dict) -> Tuple[List, str]:
-    """Validate and extract checkout data from request"""
-    if not isinstance(data, dict):
-        raise ValueError("Invalid request format: JSON object expected")
-    logger.debug("Checkout payload: %s", data)
-    items = data.get("items")
-    order_time = data.get("order_time", "")
-
-    if not isinstance(items, list):
-        raise ValueError("Items must be a list")
-
-    return items, order_time
-
+if app_config.preload:
+    # Parse and validate params.yaml at boot rather than on the first order, so
+    # a broken config stops the server and forked workers inherit the result
+    get_pricing_config()
 
-def validate_modification_data(data: Dict) -> Tuple[List, str]:
-    """Validate and extract modification data from request"""
-    if not isinstance(data, dict):
-        raise ValueError("Invalid request format: JSON object expected")
-    items = data.get("items")
-    if items is None:
-        raise ValueError("Missing required 'items' field")
+# Venue configs are always parsed at boot, so requests never read them from disk
+if venue_registry.directory is not None:
+    logger.info(
+        "Loaded pricing configs of %d venues from %s",
+        venue_registry.load_all(),
+        venue_registry.directory,
+    )
+    if app_config.venue_poll_seconds > 0:
+        venue_registry.start_polling(app_config.venue_poll_seconds)
+
+# Only wrap the app when profiling is configured, so it costs nothing otherwise
+profiler = None
+if app_config.profiling_enabled:
+    from app.profiling import ProfilingMiddleware
+
+    profiler = ProfilingMiddleware(
+        app.wsgi_app,
+        sample_rate=app_config.profile_sample_rate,
+        slow_threshold_seconds=app_config.profile_slow_seconds,
+        max_profiles=app_config.profile_keep,
+    )
+    app.wsgi_app = profiler
 
-    order_time = data.get("order_time", "")
 
-    if not isinstance(items, list):
-        raise ValueError("Items must be a list")
+@app.before_request
+def start_request_timer() -> None:
+    g.request_started = time.perf_counter()
 
-    for item in items:
-        if not isinstance(item, dict):
-            raise ValueError("Each item must be an object")
-        if "item" not in item or "quantity" not in item:
-            raise ValueError("Each item must have 'item' and 'quantity' fields")
 
-    return items, order_time
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - g.request_started, request.method, route
+    )
+    REQUESTS_TOTAL.inc(request.method, route, str(response.status_code))
+    return response
 
 
 def create_success_response(data: Dict) -> Tuple[Dict, int]:
     """Create successful response with data"""
-    return jsonify(data), HTTPStatus.OK
+    with time_stage("serialization"):
+        return jsonify(data), HTTPStatus.OK
+
+
+def create_order_response(order: Dict) -> Tuple[Response, int]:
+    """Success response for an order, tagged with its version for polling clients"""
+    with time_stage("serialization"):
+        response = jsonify(order)
+    response.headers["ETag"] = etag_for(order["version"])
+    return response, HTTPStatus.OK
 
 
 def handle_errors(func: Callable) -> Callable[..., Tuple[Response, int]]:
@@ -81,10 +190,7 @@ def handle_errors(func: Callable) -> Callable[..., Tuple[Response, int]]:
             exc_type, exc_value, exc_traceback = sys.exc_info()
 
             # Build detailed error information
-            error_details = {
-                "error_type": exc_type.__name__,
-                "error_message": str(exc_value),
-            }
+            error_details = describe_error(exc_value)
 
             if app.debug:
                 # Add stack trace in debug mode
@@ -98,112 +204,182 @@ def handle_errors(func: Callable) -> Callable[..., Tuple[Response, int]]:
                 }
 
             # Determine appropriate status code
-            if isinstance(e, ValueError):
-                status_code = HTTPStatus.BAD_REQUEST
-            elif isinstance(e, KeyError) or isinstance(e, LookupError):
-                status_code = HTTPStatus.NOT_FOUND
-            else:
-                status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+            status_code = error_status(e)
+            ERRORS_TOTAL.inc(str(int(status_code)), exc_type.__name__)
 
             return jsonify({"status": "error", "error": error_details}), status_code
 
     return wrapper
 
 
-@app.route("/order", methods=["POST"])
-@handle_errors
-def create_order() -> Tuple[Dict, int]:
-    logger.info("Received new order creation request")
-
-    data = request.get_json()
+def get_json_body() -> Dict:
+    with time_stage("json_parse"):
+        data = request.get_json(silent=True)
     if data is None:
         logger.error("Invalid JSON in request body")
         raise ValueError("Invalid JSON in request body")
-    items, order_time = validate_checkout_data(data)
+    return data
 
-    # Create new calculator instance
-    calculator = CheckoutCalculator(items, order_time)
 
-    # Generate order ID (in production, use proper ID generation)
-    order_id = str(uuid.uuid4())
-    active_orders[order_id] = calculator
-    total = calculator.calculate_total()
-    logger.info(f"Created order {order_id} with {len(items)} items. Total: {total}")
+@app.route("/order", methods=["POST"])
+@handle_errors
+def create_order() -> Tuple[Dict, int]:
+    logger.info("Received new order creation request")
 
-    return create_success_response(
-        {
-            "order_id": order_id,
-            "total": total,
-            "items": [item.to_dict() for item in calculator.order_items],
-        }
+    data = get_json_body()
+    order = order_service.create_order(data)
+    logger.info(
+        "Created order %s with %d items. Total: %s",
+        order["order_id"],
+        len(data["items"]),
+        order["total"],
     )
 
+    return create_order_response(order)
+
 
 @app.route("/orders/<order_id>/add", methods=["POST"])
 @handle_errors
 def add_items(order_id: str) -> Tuple[Dict, int]:
     """Add items to the existing order"""
-    if order_id not in active_orders:
-        raise ValueError("Order not found", HTTPStatus.NOT_FOUND)
+    data = get_json_body()
+    order = order_service.add_items(
+        order_id, data, parse_since(request.args.get("since"))
+    )
+    logger.info("Added items %s to order %s", data["items"], order_id)
+
+    return create_order_response(order)
 
-    data = request.get_json()
-    if data is None:
-        raise ValueError("Invalid JSON in request body")
-    items, order_time = validate_modification_data(data)
 
-    calculator = active_orders[order_id]
-    calculator.add_items(items, order_time)
-    logger.info(f"Added items {items} to order {order_id}")
+@app.route("/orders/<order_id>/cancel", methods=["POST"])
+@handle_errors
+def cancel_items(order_id: str) -> Tuple[Dict, int]:
+    """Cancel items from the existing order"""
+    data = get_json_body()
+    order = order_service.cancel_items(
+        order_id, data, parse_since(request.args.get("since"))
+    )
+    logger.info("Canceled items %s from order %s", data["items"], order_id)
+
+    return create_order_response(order)
+
+
+@app.route("/orders/<order_id>", methods=["GET"])
+@handle_errors
+def get_order_total(order_id: str) -> Tuple[Dict, int]:
+    """
+    Return the current total and items of an order. Answers 304 without a
+    body when If-None-Match names the current version; with ?since=<version>
+    only the lines changed after that version are returned.
+    """
+    since = parse_since(request.args.get("since"))
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        version = order_service.get_order_version(order_id)
+        if etag_matches(if_none_match, version):
+            return Response(
+                status=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag_for(version)}
+            )
+    return create_order_response(order_service.get_order(order_id, since))
+
+
+@app.route("/quote", methods=["POST"])
+@handle_errors
+def quote() -> Tuple[Dict, int]:
+    """Price a cart without creating an order"""
+    return create_success_response(order_service.quote(get_json_body()))
 
+
+@app.route("/reports/sales", methods=["GET"])
+@handle_errors
+def sales_report() -> Tuple[Dict, int]:
+    """
+    Quantities and revenue per item type and per hour of orders placed on
+    ?date=YYYY-MM-DD (default today) between ?from=HH:MM (inclusive) and
+    ?to=HH:MM (exclusive)
+    """
     return create_success_response(
-        {
-            "order_id": order_id,
-            "total": calculator.calculate_total(),
-            "items": [item.to_dict() for item in calculator.order_items],
-        }
+        order_service.sales_report(
+            request.args.get("from"), request.args.get("to"), request.args.get("date")
+        )
     )
 
 
-@app.route("/orders/<order_id>/cancel", methods=["POST"])
+@app.route("/orders/batch", methods=["POST"])
 @handle_errors
-def cancel_items(order_id: str) -> Tuple[Dict, int]:
-    """Add items to the existing order"""
-    if order_id not in active_orders:
-        raise ValueError("Order not found", HTTPStatus.NOT_FOUND)
+def price_orders_batch() -> Tuple[Dict, int]:
+    """Price many orders in one request without storing them"""
+    batch = order_service.price_batch(get_json_body())
+    logger.info(
+        "Priced batch of %d orders with %d errors", batch["count"], batch["errors"]
+    )
 
-    data = request.get_json()
-    if data is None:
-        raise ValueError("Invalid JSON in request body")
-    items, _ = validate_modification_data(data)
+    return create_success_response(batch)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Request, stage and order metrics in Prometheus text format"""
+    return Response(
+        REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def get_profiler() -> "ProfilingMiddleware":
+    if profiler is None or not (app.debug or app_config.debug_endpoints):
+        raise LookupError("Profiling is not enabled")
+    return profiler
 
-    calculator = active_orders[order_id]
-    calculator.cancel_items(items)
-    logger.info(f"Canceled items {items} from order {order_id}")
 
+@app.route("/debug/profiles", methods=["GET"])
+@handle_errors
+def list_profiles() -> Tuple[Dict, int]:
+    """Slowest profiled requests kept by the profiling middleware"""
     return create_success_response(
-        {
-            "order_id": order_id,
-            "total": calculator.calculate_total(),
-            "items": [item.to_dict() for item in calculator.order_items],
-        }
+        {"profiles": [record.summary() for record in get_profiler().profiles()]}
     )
 
 
-@app.route("/orders/<order_id>", methods=["GET"])
+@app.route("/debug/profiles/<int:profile_id>.<any(pstats, collapsed):fmt>")
 @handle_errors
-def get_order_total(order_id: str) -> Tuple[Dict, int]:
-    """Add items to the existing order"""
-    if order_id not in active_orders:
-        raise ValueError("Order not found", HTTPStatus.NOT_FOUND)
+def download_profile(profile_id: int, fmt: str) -> Response:
+    """Download one profile as a pstats dump or collapsed stacks for flame graphs"""
+    record = get_profiler().get(profile_id)
+    if record is None:
+        raise LookupError(f"Profile {profile_id} not found")
+    if fmt == "pstats":
+        body, mimetype = record.to_pstats(), "application/octet-stream"
+    else:
+        body, mimetype = record.to_collapsed(), "text/plain"
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=profile-{profile_id}.{fmt}"
+        },
+    )
 
-    calculator = active_orders[order_id]
-    return create_success_response(
-        {
-            "order_id": order_id,
-            "total": calculator.calculate_total(),
-            "items": [item.to_dict() for item in calculator.order_items],
-        }
+
+@app.route("/config/reload", methods=["POST"])
+@handle_errors
+def reload_config() -> Tuple[Dict, int]:
+    """Re-read params.yaml; existing orders keep the config they were priced with"""
+    config = reload_pricing_config()
+    logger.info("Reloaded pricing config, now at version %s", config.version)
+    return create_success_response(pricing_config_stats())
+
+
+@app.route("/venues/<venue_id>/reload", methods=["POST"])
+@handle_errors
+def reload_venue_config(venue_id: str) -> Tuple[Dict, int]:
+    """Re-read one venue's config file; other venues and open orders are unaffected"""
+    config = venue_registry.reload(venue_id)
+    logger.info(
+        "Reloaded pricing config of venue %s, now at version %s",
+        venue_id,
+        config.version,
     )
+    return create_success_response({"venue_id": venue_id, "version": config.version})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+"""
+ASGI variant of the order API in app/api.py, serving the same routes.
+
+    uvicorn app.asgi:application --workers 1
+
+Requests for the same order are serialised with a per-order asyncio.Lock,
+requests for different orders run concurrently. The app is plain ASGI and
+does not depend on a web framework.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import weakref
+from http import HTTPStatus
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.logger_config import setup_logging
+from app.order_service import (
+    OrderService,
+    describe_error,
+    error_status,
+    etag_for,
+    etag_matches,
+    parse_since,
+)
+from app.order_store import InMemoryOrderStore, OrderStore, create_order_store
+from config.app_config import load_app_config
+from config.venue_registry import VenueRegistry
+
+logger = logging.getLogger("asgi-app")
+
+ORDER_ROUTE = re.compile(r"^/orders/(?P<order_id>[^/]+?)(?:/(?P<action>add|cancel))?$")
+
+
+class OrderAPI:
+    def __init__(self, store: OrderStore, venues: Optional[VenueRegistry] = None):
+        self.service = OrderService(store, venues=venues)
+        # In-memory orders are priced inline; other stores do blocking I/O
+        # and are called from a worker thread to keep the event loop free
+        self._offload = not isinstance(store, InMemoryOrderStore)
+        self._order_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _lock_for(self, order_id: str) -> asyncio.Lock:
+        lock = self._order_locks.get(order_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._order_locks[order_id] = lock
+        return lock
+
+    async def _run(self, func: Callable, *args):
+        if self._offload:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            status, payload = await self._dispatch(scope, receive)
+        except Exception as e:
+            status = error_status(e)
+            payload = {"status": "error", "error": describe_error(e)}
+            if status == HTTPStatus.INTERNAL_SERVER_ERROR:
+                logger.exception("Unhandled error serving %s", scope["path"])
+        await self._send_json(send, status, payload)
+
+    async def _dispatch(
+        self, scope: Dict, receive: Callable
+    ) -> Tuple[HTTPStatus, Optional[Dict]]:
+        """Route a request; a None payload is sent as an empty body"""
+        method, path = scope["method"], scope["path"]
+
+        if path == "/order" and method == "POST":
+            data = await self._read_json(receive)
+            order = await self._run(self.service.create_order, data)
+            logger.info(
+                "Created order %s. Total: %s", order["order_id"], order["total"]
+            )
+            return HTTPStatus.OK, order
+
+        if path == "/quote" and method == "POST":
+            data = await self._read_json(receive)
+            return HTTPStatus.OK, await self._run(self.service.quote, data)
+
+        if path == "/orders/batch" and method == "POST":
+            data = await self._read_json(receive)
+            return HTTPStatus.OK, await self._run(self.service.price_batch, data)
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+
+        if path == "/reports/sales" and method == "GET":
+            return HTTPStatus.OK, await self._run(
+                self.service.sales_report,
+                query["from"][-1] if "from" in query else None,
+                query["to"][-1] if "to" in query else None,
+                query["date"][-1] if "date" in query else None,
+            )
+
+        match = ORDER_ROUTE.match(path)
+        if match is None:
+            return HTTPStatus.NOT_FOUND, self._error("NotFound", "Unknown route")
+        order_id, action = match.group("order_id"), match.group("action")
+        since = parse_since(query["since"][-1] if "since" in query else None)
+
+        if action is None and method == "GET":
+            if_none_match = self._header(scope, b"if-none-match")
+            async with self._lock_for(order_id):
+                if if_none_match:
+                    version = await self._run(self.service.get_order_version, order_id)
+                    if etag_matches(if_none_match, version):
+                        return HTTPStatus.NOT_MODIFIED, None
+                return HTTPStatus.OK, await self._run(
+                    self.service.get_order, order_id, since
+                )
+
+        if action is not None and method == "POST":
+            data = await self._read_json(receive)
+            handler = (
+                self.service.add_items if action == "add" else self.service.cancel_items
+            )
+            async with self._lock_for(order_id):
+                order = await self._run(handler, order_id, data, since)
+            logger.info("Applied %s to order %s", action, order_id)
+            return HTTPStatus.OK, order
+
+        return HTTPStatus.METHOD_NOT_ALLOWED, self._error(
+            "MethodNotAllowed", f"{method} is not allowed on {path}"
+        )
+
+    @staticmethod
+    def _error(error_type: str, message: str) -> Dict:
+        return {
+            "status": "error",
+            "error": {"error_type": error_type, "error_message": message},
+        }
+
+    @staticmethod
+    def _header(scope: Dict, name: bytes) -> Optional[str]:
+        for key, value in scope.get("headers", ()):
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    @staticmethod
+    async def _read_json(receive: Callable[[], Awaitable[Dict]]) -> Dict:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        try:
+            data = json.loads(b"".join(chunks))
+        except ValueError:
+            data = None
+        if data is None:
+            raise ValueError("Invalid JSON in request body")
+        return data
+
+    @staticmethod
+    async def _send_json(send: Callable, status: int, payload: Optional[Dict]) -> None:
+        headers: List[Tuple[bytes, bytes]] = []
+        if payload is None:
+            body = b""
+        else:
+            body = json.dumps(payload).encode()
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode()))
+            if "version" in payload and "order_id" in payload:
+                headers.append((b"etag", etag_for(payload["version"]).encode()))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": int(status),
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _lifespan(receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(
+    store: Optional[OrderStore] = None, venues: Optional[VenueRegistry] = None
+) -> OrderAPI:
+    return OrderAPI(store or create_order_store(load_app_config()), venues)
+
+
+app_config = load_app_config()
+setup_logging(
+    level=logging.INFO,
+    log_to_file=True,
+    log_file_path=os.path.join(app_config.log_dir, "asgi-app.log"),
+    logger_name="asgi-app",
+    queue_size=app_config.log_queue_size,
+    block_when_full=app_config.log_queue_policy == "block",
+)
+venue_registry = VenueRegistry(app_config.venue_config_dir)
+venue_registry.load_all()
+if venue_registry.directory is not None and app_config.venue_poll_seconds > 0:
+    venue_registry.start_polling(app_config.venue_poll_seconds)
+application = create_asgi_app(create_order_store(app_config), venue_registry)
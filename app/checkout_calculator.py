@@ -1,77 +1,283 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
-from config.config_loader import load_pricing_config
+from app.metrics import time_stage
+from app.order_decoder import decode_items
+from app.quote_cache import canonical_cart, get_quote_cache
+from app.sales_index import LineChange
+from config.checkout_config import PricingConfig
+from config.config_loader import (
+    get_pricing_config,
+    parse_pricing_config,
+    pricing_config_to_dict,
+)
 from models.order_model import ItemType, OrderItem
+from models.order_time import format_minute, parse_minute
 
 
-class CheckoutCalculator:
-    TIME_FORMAT = "%H:%M"
+# Orders read back from storage share a handful of pricing configs; each is
+# parsed and compiled once per process instead of once per order
+_MAX_RESTORED_CONFIGS = 64
+_restored_configs: Dict[int, Tuple[Dict, PricingConfig]] = {}
+
+
+def _restore_pricing_config(pricing: Dict[str, any]) -> PricingConfig:
+    cached = _restored_configs.get(pricing["version"])
+    if cached is not None and cached[0] == pricing["values"]:
+        return cached[1]
+    config = parse_pricing_config(pricing["values"], version=pricing["version"])
+    if len(_restored_configs) >= _MAX_RESTORED_CONFIGS:
+        _restored_configs.clear()
+    _restored_configs[pricing["version"]] = (pricing["values"], config)
+    return config
+
 
+class CheckoutCalculator:
     def __init__(
-        self, items_with_qty: List[Dict[str, any]], order_time: Optional[str] = None
+        self,
+        items_with_qty: List[Dict[str, any]],
+        order_time: Optional[str] = None,
+        pricing_config: Optional[PricingConfig] = None,
     ):
-        self.pricing_config = load_pricing_config()
-        self.order_items = [
-            OrderItem(
-                item_type=ItemType(item["item"]),
-                quantity=int(item["quantity"]),
-                order_time=self._parse_order_time(order_time),
+        with time_stage("config_load"):
+            self.pricing_config = pricing_config or get_pricing_config()
+        # Order lines aggregated by (item type, order time), in the order they
+        # were first added. Repeated add rounds at the same time share a line.
+        self._lines: Dict[Tuple[ItemType, Optional[int]], int] = {}
+        # Running quantities keyed by (item type, price table time bucket);
+        # kept in step with _lines so calculate_total never walks the lines.
+        self._quantities: Dict[Tuple[ItemType, int], int] = {}
+        # Serialised order lines, rebuilt only after the order changes
+        self._items_payload: Optional[List[Dict[str, any]]] = None
+        # Incremented by every add/cancel. _line_versions maps each line that
+        # ever existed to the version that last changed it, oldest first, so
+        # changes_since() only walks lines that actually changed.
+        self.version = 0
+        self._line_versions: Dict[Tuple[ItemType, Optional[int]], int] = {}
+        self.add_items(items_with_qty, order_time)
+
+    @classmethod
+    def price_many(
+        cls,
+        orders: Iterable[Tuple[List[Dict[str, any]], Optional[str]]],
+        pricing_config: Optional[PricingConfig] = None,
+    ) -> List[Union[float, Exception]]:
+        """
+        Price many independent orders against a single pricing config.
+
+        Args:
+            orders: Iterable of (items, order_time) pairs in the same format
+                    accepted by the constructor
+            pricing_config: Config to price with (default: the shared config)
+
+        Returns:
+            One entry per order: its total, or the exception that made the
+            order invalid. An invalid order does not affect the others.
+
+        Carts already in the QuoteCache are served from it, but batch orders
+        are not added: a large batch would evict the carts /quote keeps asking for.
+        """
+        pricing_config = pricing_config or get_pricing_config()
+        results = []
+        for items, order_time in orders:
+            try:
+                results.append(
+                    cls.quote(items, order_time, pricing_config, remember=False)
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                results.append(e)
+        return results
+
+    @classmethod
+    def quote(
+        cls,
+        items: List[Dict[str, any]],
+        order_time: Optional[str] = None,
+        pricing_config: Optional[PricingConfig] = None,
+        remember: bool = True,
+    ) -> float:
+        """
+        Total of a cart that is priced but not kept as an order.
+
+        Totals are cached per canonical cart in the shared QuoteCache, so
+        repeated carts skip building a calculator. With remember=False a
+        cart that is not cached yet is priced without adding it.
+        """
+        pricing_config = pricing_config or get_pricing_config()
+        cart = canonical_cart(items, order_time, pricing_config)
+        if cart is not None:
+            cents = get_quote_cache().get(pricing_config, cart)
+            if cents is not None:
+                return cents / 100
+        cents = cls(items, order_time, pricing_config).calculate_total_cents()
+        if cart is not None and remember:
+            get_quote_cache().put(pricing_config, cart, cents)
+        return cents / 100
+
+    @classmethod
+    def from_state(cls, state: Dict[str, any]) -> "CheckoutCalculator":
+        """Rebuild a calculator from the output of to_state()"""
+        calculator = cls(
+            [], pricing_config=_restore_pricing_config(state["pricing_config"])
+        )
+        for line in state["items"]:
+            calculator._apply_quantity_delta(
+                ItemType(line["item"]),
+                calculator._parse_order_time(line["order_time"]),
+                int(line["quantity"]),
+            )
+        calculator.version = state.get("version", 0)
+        calculator._line_versions = {
+            (
+                ItemType(line["item"]),
+                calculator._parse_order_time(line["order_time"]),
+            ): line["version"]
+            for line in state.get("line_versions", ())
+        }
+        return calculator
+
+    def to_state(self) -> Dict[str, any]:
+        """JSON-serialisable snapshot of the order, including its pricing config"""
+        return {
+            "pricing_config": {
+                "version": self.pricing_config.version,
+                "values": pricing_config_to_dict(self.pricing_config),
+            },
+            "items": self.items_payload(),
+            "version": self.version,
+            "line_versions": [
+                {
+                    "item": item_type.value,
+                    "order_time": format_minute(order_time),
+                    "version": version,
+                }
+                for (item_type, order_time), version in self._line_versions.items()
+            ],
+        }
+
+    def changes_since(self, version: int) -> List[Dict[str, any]]:
+        """
+        Lines changed after the given version, oldest change first.
+
+        Lines that were cancelled completely are included with quantity 0.
+        """
+        changes = []
+        for line_key in reversed(self._line_versions):
+            if self._line_versions[line_key] <= version:
+                break
+            item_type, order_time = line_key
+            quantity = self._lines.get(line_key, 0)
+            changes.append(OrderItem(item_type, quantity, order_time).to_dict())
+        changes.reverse()
+        return changes
+
+    def apply_changes(self, version: int, lines: List[Dict[str, any]]) -> None:
+        """
+        Bring the order to the given version using lines reported by
+        changes_since() on a copy of it. Lines carry absolute quantities, so
+        applying the same changes twice is harmless; older versions are ignored.
+        """
+        if version <= self.version:
+            return
+        self.version = version
+        for line in lines:
+            item_type = ItemType(line["item"])
+            order_time = self._parse_order_time(line["order_time"])
+            self._apply_quantity_delta(
+                item_type,
+                order_time,
+                int(line["quantity"]) - self._lines.get((item_type, order_time), 0),
             )
-            for item in items_with_qty
+
+    def items_payload(self) -> List[Dict[str, any]]:
+        """
+        The order lines as dictionaries, as returned by the API.
+
+        The list is cached until the order is next modified; callers must
+        not mutate it.
+        """
+        if self._items_payload is None:
+            self._items_payload = [item.to_dict() for item in self.order_items]
+        return self._items_payload
+
+    @property
+    def order_items(self) -> List[OrderItem]:
+        return [
+            OrderItem(item_type=item_type, quantity=quantity, order_time=order_time)
+            for (item_type, order_time), quantity in self._lines.items()
         ]
 
-    def _parse_order_time(self, order_time: Optional[str]) -> Optional[datetime]:
+    def _parse_order_time(self, order_time: Optional[str]) -> Optional[int]:
+        """Parse HH:MM into minutes after midnight; no order time gives None"""
         if not order_time:
             return None
 
         try:
-            return datetime.strptime(order_time, self.TIME_FORMAT)
+            return parse_minute(order_time)
         except (ValueError, TypeError):
             raise ValueError("Invalid order time format. Must be HH:MM. Example: 18:30")
 
-    def _is_early_bird_eligible(self, order_time: Optional[datetime]) -> bool:
-        if not order_time:
-            return False
-        return order_time.time() < self.pricing_config.discount_cutoff_time
+    def _apply_quantity_delta(
+        self, item_type: ItemType, order_time: Optional[int], delta: int
+    ) -> None:
+        self._items_payload = None
+        line_key = (item_type, order_time)
+        self._line_versions.pop(line_key, None)
+        self._line_versions[line_key] = self.version
+        remaining_qty = self._lines.get(line_key, 0) + delta
+        if remaining_qty or delta > 0:
+            self._lines[line_key] = remaining_qty
+        else:
+            self._lines.pop(line_key, None)
+
+        bucket_key = (
+            item_type,
+            self.pricing_config.price_table.bucket_for(order_time),
+        )
+        self._quantities[bucket_key] = self._quantities.get(bucket_key, 0) + delta
+
+    def _ordered_quantity(self, item_type: ItemType) -> int:
+        return sum(
+            self._quantities.get((item_type, bucket), 0)
+            for bucket in range(self.pricing_config.price_table.bucket_count)
+        )
+
+    def calculate_total_cents(self) -> int:
+        """
+        The order total in whole cents, including service charge.
 
-    def _calculate_item_price(self, order_item: OrderItem) -> float:
-        base_price = self.pricing_config.item_prices[order_item.item_type]
-        if order_item.item_type == ItemType.DRINK and self._is_early_bird_eligible(
-            order_item.order_time
-        ):
-            base_price *= 1 - self.pricing_config.drink_discount_rate
-        return base_price * order_item.quantity
+        The subtotals come from running quantities per item type and
+        time bucket, priced with the config's precompiled price table in
+        which discounts and the food service charge are already applied, so
+        the cost does not depend on the number of lines in the order. All
+        arithmetic is on integers and the total is rounded to cents once,
+        half up.
+        """
+        with time_stage("total_calculation"):
+            price_table = self.pricing_config.price_table
+            unit_amounts = price_table.unit_amounts
+            amount = 0
+            for bucket_key, quantity in self._quantities.items():
+                if quantity:
+                    amount += unit_amounts[bucket_key] * quantity
+            if price_table.amount_scale == 1:
+                # Every unit price is whole cents, nothing to round
+                return amount
+            return price_table.to_cents(amount)
 
     def calculate_total(self) -> float:
         """
         Calculates the total cost of an order including service charge based
         on the type of items (food or drink) in the order.
 
-        The function computes the cost of food items and drink items
-        separately. It then applies a service charge to the food total and
-        combines all parts to determine the final order total.
+        The service charge applies to food items only. See
+        calculate_total_cents, which this converts to currency units.
 
         :return: The rounded total cost of the order including service charge.
         :rtype: float
         """
-        food_total = sum(
-            self._calculate_item_price(item)
-            for item in self.order_items
-            if item.is_food
-        )
-        drink_total = sum(
-            self._calculate_item_price(item)
-            for item in self.order_items
-            if not item.is_food
-        )
-
-        service_charge = food_total * self.pricing_config.service_charge_rate
-        total = food_total + service_charge + drink_total
+        return self.calculate_total_cents() / 100
 
-        return round(total, 2)
-
-    def cancel_items(self, items_to_cancel: List[Dict[str, any]]) -> None:
+    def cancel_items(self, items_to_cancel: List[Dict[str, any]]) -> List[LineChange]:
         """
         Cancel specific items from the order.
 
@@ -79,36 +285,43 @@ class CheckoutCalculator:
             items_to_cancel: List of dictionaries containing item type and quantity to cancel
                            Format: [{"item": "starter", "quantity": 1}, ...]
 
+        Returns:
+            The (item type, order time, negative quantity) taken from each line
+
         Raises:
             ValueError: If trying to cancel more items than ordered or invalid item type
+            InvalidItemsError: If any entry is invalid (a ValueError)
+
+        Entries of the same item type are summed. Cancelled quantities are
+        taken from the most recently added lines of each item type first.
         """
-        # Convert items_to_cancel to a more manageable format
-        cancellations = {
-            ItemType(item["item"]): int(item["quantity"]) for item in items_to_cancel
-        }
+        with time_stage("item_construction"):
+            cancellations = decode_items(items_to_cancel)
+
+        for item_type, cancelled_qty in cancellations.items():
+            ordered_qty = self._ordered_quantity(item_type)
+            if cancelled_qty > ordered_qty:
+                raise ValueError(
+                    f"Cannot cancel {cancelled_qty} of {item_type.value}, "
+                    f"only {ordered_qty} were ordered"
+                )
 
-        # Create new order items list
-        new_order_items = []
-
-        for order_item in self.order_items:
-            if order_item.item_type in cancellations:
-                cancelled_qty = cancellations[order_item.item_type]
-                if cancelled_qty > order_item.quantity:
-                    raise ValueError(
-                        f"Cannot cancel {cancelled_qty} of {order_item.item_type.value}, "
-                        f"only {order_item.quantity} were ordered"
-                    )
-                remaining_qty = order_item.quantity - cancelled_qty
-                if remaining_qty > 0:
-                    order_item.quantity = remaining_qty
-                    new_order_items.append(order_item)
-            else:
-                new_order_items.append(order_item)
-        self.order_items = new_order_items
+        self.version += 1
+        changes = []
+        # Take cancelled quantities from the most recently added lines first
+        for (item_type, order_time), quantity in reversed(list(self._lines.items())):
+            cancelled_qty = cancellations.get(item_type, 0)
+            if cancelled_qty <= 0:
+                continue
+            taken_qty = min(quantity, cancelled_qty)
+            self._apply_quantity_delta(item_type, order_time, -taken_qty)
+            changes.append((item_type, order_time, -taken_qty))
+            cancellations[item_type] = cancelled_qty - taken_qty
+        return changes
 
     def add_items(
         self, items: List[Dict[str, any]], order_time: Optional[str] = None
-    ) -> None:
+    ) -> List[LineChange]:
         """
         Add new items to the existing order with their own order time.
 
@@ -117,18 +330,23 @@ class CheckoutCalculator:
                   Format: [{"item": "starter", "quantity": 1}, ...]
             order_time: Time of the additional order (optional)
 
+        Returns:
+            The (item type, order time, quantity) added to each line
+
         Raises:
-            ValueError: If an invalid item type is provided
+            ValueError: If the order time is invalid
+            InvalidItemsError: If any entry is invalid (a ValueError)
+
+        Entries of the same item type are summed into one line.
         """
-        parsed_time = self._parse_order_time(order_time)
+        with time_stage("item_construction"):
+            parsed_time = self._parse_order_time(order_time)
+            new_lines = decode_items(items)
 
-        new_items = [
-            OrderItem(
-                item_type=ItemType(item["item"]),
-                quantity=int(item["quantity"]),
-                order_time=parsed_time,
-            )
-            for item in items
+            self.version += 1
+            for item_type, quantity in new_lines.items():
+                self._apply_quantity_delta(item_type, parsed_time, quantity)
+        return [
+            (item_type, parsed_time, quantity)
+            for item_type, quantity in new_lines.items()
         ]
-
-        self.order_items.extend(new_items)
@@ -0,0 +1,72 @@
+"""
+Flask JSON provider backed by orjson when it is installed.
+
+orjson is optional; without it the app keeps Flask's stdlib json provider.
+Output stays compatible: keys are sorted like Flask's default provider, and
+values orjson cannot serialise, such as integers beyond 64 bits, are left
+to the default provider.
+"""
+
+from typing import Any, Union
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Formatting options such as indent are only supported by json
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Keep the indented output of the default provider in debug mode
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(
+                obj,
+                default=self.default,
+                option=self.OPTIONS | orjson.OPT_APPEND_NEWLINE,
+            )
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app: Flask, provider: str = "auto") -> str:
+    """
+    Select the app's JSON provider.
+
+    Args:
+        app: Flask app to configure
+        provider: "orjson", "stdlib" or "auto" (orjson if installed)
+
+    Returns:
+        The name of the provider in use
+    """
+    if provider not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON provider: {provider}")
+    if provider == "orjson" and orjson is None:
+        raise ValueError("The orjson JSON provider requires: pip install orjson")
+    if provider == "stdlib" or orjson is None:
+        return "stdlib"
+    app.json = OrjsonProvider(app)
+    return "orjson"
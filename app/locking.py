@@ -0,0 +1,19 @@
+import threading
+from typing import Hashable
+
+
+class StripedLock:
+    """
+    Fixed pool of locks shared out by key hash.
+
+    Gives per-key mutual exclusion without a lock object per key: two keys
+    only contend if they hash to the same stripe.
+    """
+
+    def __init__(self, stripes: int = 256):
+        if stripes <= 0:
+            raise ValueError("stripes must be positive")
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+
+    def lock_for(self, key: Hashable) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
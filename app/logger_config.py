@@ -1,11 +1,90 @@
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Queue handlers and their listeners started by setup_logging, keyed by
+# logger name
+_listeners = {}
+
+
+class _BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full; wait for the listener to make room
+        self.queue.put(self._sentinel)
+
+
+class _LazyRotatingFileHandler(RotatingFileHandler):
+    """Creates the log directory on the first record instead of at setup"""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def _stop_listeners() -> None:
+    while _listeners:
+        _, (_, listener) = _listeners.popitem()
+        listener.stop()
+
+
+def _restart_listeners_after_fork() -> None:
+    # Only the forking thread survives in the child, and the old queue's lock
+    # may have been held by the listener thread; start over with a new queue
+    # so workers forked from a preloaded app (gunicorn preload_app) keep logging
+    for name, (handler, listener) in list(_listeners.items()):
+        log_queue = queue.Queue(maxsize=handler.queue.maxsize)
+        handler.queue = log_queue
+        listener = _BoundedQueueListener(
+            log_queue, *listener.handlers, respect_handler_level=True
+        )
+        listener.start()
+        _listeners[name] = (handler, listener)
+
+
+atexit.register(_stop_listeners)
+os.register_at_fork(after_in_child=_restart_listeners_after_fork)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue.
+
+    When the queue is full the record is either dropped and counted
+    (block_when_full=False) or the logging thread waits for room.
+
+    Records are queued as they are: the queue never leaves the process, so
+    unlike the stdlib handler nothing is formatted to make them picklable,
+    and all formatting happens on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_when_full: bool = False):
+        super().__init__(log_queue)
+        self.block_when_full = block_when_full
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block_when_full:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 def setup_logging(
-    level=logging.INFO, log_to_file=False, log_file_path=None, logger_name=None
+    level=logging.INFO,
+    log_to_file=False,
+    log_file_path=None,
+    logger_name=None,
+    queue_size=0,
+    block_when_full=False,
 ):
     """
     Configure logging with flexible output options.
@@ -15,6 +94,14 @@ def setup_logging(
         log_to_file: Boolean flag to enable/disable file logging (default: False)
         log_file_path: Path to the log file (optional, used only if log_to_file is True)
         logger_name: Name of the logger to configure (optional, configures root logger if None)
+        queue_size: If positive, hand records to a background thread through a
+            queue of this size instead of writing them on the calling thread
+            (default: 0, write synchronously)
+        block_when_full: With a queue, wait for room instead of dropping
+            records when the queue is full (default: False)
+
+    Returns:
+        The BoundedQueueHandler when queue_size is positive, otherwise None
     """
     formatter = logging.Formatter(
         "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s",
@@ -25,21 +112,41 @@ def setup_logging(
     logger.setLevel(level)
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    previous = _listeners.pop(logger_name, None)
+    if previous is not None:
+        previous[1].stop()
 
+    handlers = []
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     if log_to_file and log_file_path:
-        log_dir = os.path.dirname(log_file_path)
-        if log_dir:
-            os.makedirs(log_dir, exist_ok=True)
-        file_handler = RotatingFileHandler(
+        # The file and its directory are only created once something is logged
+        file_handler = _LazyRotatingFileHandler(
             filename=log_file_path,
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5,
             delay=True,
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    if queue_size <= 0:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return None
+
+    # Formatting and I/O happen on the listener thread; request threads only
+    # pay for building the record and putting it on the queue
+    queue_handler = BoundedQueueHandler(
+        queue.Queue(maxsize=queue_size), block_when_full=block_when_full
+    )
+    listener = _BoundedQueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _listeners[logger_name] = (queue_handler, listener)
+    logger.addHandler(queue_handler)
+    return queue_handler
@@ -0,0 +1,163 @@
+"""
+Decoding of the "items" list of order requests.
+
+decode_items() validates a raw JSON items list and aggregates it into the
+quantity of each ItemType in a single pass. Valid entries cost a few dict
+lookups and type checks: item names are checked against a table built from
+ItemType once, at import, instead of calling ItemType() per entry. Only
+entries that fail those checks go through _decode_entry(), which works out
+what exactly is wrong with them.
+
+Every invalid entry is reported, with its position in the list and the
+field at fault, instead of failing on the first one.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.order_model import ItemType
+
+ITEM_TYPES: Dict[str, ItemType] = {item_type.value: item_type for item_type in ItemType}
+MAX_REPORTED_ERRORS = 50
+# Far above any real order, and small enough that totals and responses stay
+# within 64-bit integers
+MAX_QUANTITY = 10000
+
+_ITEM_NAMES = ", ".join(ITEM_TYPES)
+
+# Quantities of each item type, in the order the types first appear
+ItemQuantities = Dict[ItemType, int]
+
+
+class InvalidItemsError(ValueError):
+    """
+    Invalid entries of an items list. errors holds one
+    {"index", "field", "message"} dict per problem found, up to
+    MAX_REPORTED_ERRORS; field is None when the entry itself is malformed.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]], error_count: int):
+        self.errors = errors
+        self.error_count = error_count
+        message = "; ".join(
+            f"items[{error['index']}]"
+            + (f".{error['field']}" if error["field"] else "")
+            + f": {error['message']}"
+            for error in errors
+        )
+        if error_count > len(errors):
+            message += f" (and {error_count - len(errors)} more)"
+        super().__init__(message)
+
+
+def _quantity_error(quantity: Any) -> str:
+    return f"quantity must be a positive whole number, got {quantity!r}"
+
+
+def parse_quantity(quantity: Any) -> int:
+    """
+    A quantity as a positive int up to MAX_QUANTITY. Whole floats and numeric
+    strings, as read from CSV files, are accepted; booleans and fractions are
+    not.
+
+    Raises:
+        ValueError: If the quantity is not a positive whole number, or too large
+    """
+    if type(quantity) is int:
+        value = quantity
+    elif type(quantity) is float and quantity.is_integer():
+        value = int(quantity)
+    elif isinstance(quantity, str):
+        try:
+            value = int(quantity)
+        except ValueError:
+            raise ValueError(_quantity_error(quantity)) from None
+    else:
+        raise ValueError(_quantity_error(quantity))
+    if value <= 0:
+        raise ValueError(_quantity_error(quantity))
+    if value > MAX_QUANTITY:
+        raise ValueError(f"quantity must be at most {MAX_QUANTITY}, got {quantity!r}")
+    return value
+
+
+def _decode_entry(
+    index: int, entry: Any, errors: List[Dict[str, Any]]
+) -> Optional[Tuple[ItemType, int]]:
+    """Slow path of decode_items: the entry's line, or None after recording why not"""
+    if not isinstance(entry, dict):
+        errors.append({"index": index, "field": None, "message": "must be an object"})
+        return None
+    if "item" not in entry or "quantity" not in entry:
+        errors.append(
+            {
+                "index": index,
+                "field": None,
+                "message": "must have 'item' and 'quantity' fields",
+            }
+        )
+        return None
+
+    name = entry["item"]
+    item_type = ITEM_TYPES.get(name) if isinstance(name, str) else None
+    if item_type is None:
+        errors.append(
+            {
+                "index": index,
+                "field": "item",
+                "message": f"{name!r} is not a valid item ({_ITEM_NAMES})",
+            }
+        )
+    try:
+        quantity = parse_quantity(entry["quantity"])
+    except ValueError as e:
+        errors.append({"index": index, "field": "quantity", "message": str(e)})
+        return None
+    if item_type is None:
+        return None
+    return item_type, quantity
+
+
+def decode_items(items: Any) -> ItemQuantities:
+    """
+    Validate an items list and total its quantities per item type.
+
+    Args:
+        items: Format: [{"item": "starter", "quantity": 1}, ...]
+
+    Returns:
+        The quantity of each item type, in order of first appearance
+
+    Raises:
+        ValueError: If items is not a list
+        InvalidItemsError: If any entry is invalid
+    """
+    if not isinstance(items, list):
+        raise ValueError("Items must be a list")
+
+    # Totals are keyed by item name while decoding: str hashes are cached,
+    # whereas hashing an Enum member calls Enum.__hash__ every time
+    totals: Dict[str, int] = {}
+    errors: List[Dict[str, Any]] = []
+    item_types = ITEM_TYPES
+    for index, entry in enumerate(items):
+        try:
+            name = entry["item"]
+            quantity = entry["quantity"]
+            if (
+                type(quantity) is int
+                and 0 < quantity <= MAX_QUANTITY
+                and name in item_types
+                and type(entry) is dict
+            ):
+                totals[name] = totals.get(name, 0) + quantity
+                continue
+        except (KeyError, TypeError, IndexError):
+            pass
+        line = _decode_entry(index, entry, errors)
+        if line is not None:
+            name = line[0].value
+            totals[name] = totals.get(name, 0) + line[1]
+
+    if errors:
+        raise InvalidItemsError(errors[:MAX_REPORTED_ERRORS], len(errors))
+    return {item_types[name]: quantity for name, quantity in totals.items()}
@@ -0,0 +1,483 @@
+"""
+Append-only journal of order changes with periodic snapshots, so open orders
+kept in memory survive a restart without a database write per request.
+
+Request threads only queue a record. A background thread writes everything
+queued since its last pass with one write and one fsync (group commit), so
+a crash loses at most flush_interval seconds of changes. The journal is
+split into numbered segments; whenever one fills up, the previous snapshot
+and the completed segments are folded into a new snapshot in the background
+and the folded segments are deleted. Recovery loads the snapshot and
+replays the segments written after it.
+
+Only one process may write to a journal directory. JournaledOrderStore opens
+it in the process that first uses the store, so a store created before
+gunicorn forks its worker belongs to the worker.
+
+Records, one JSON object per line:
+
+    {"op": "put", "id": ..., "state": <CheckoutCalculator.to_state()>}
+    {"op": "change", "id": ..., "version": ..., "lines": <changes_since()>}
+    {"op": "delete", "id": ...}
+    {"op": "sales", "date": "YYYY-MM-DD", "lines": <SalesIndex changes>}
+
+The sales counters are journaled as priced changes per business date, so
+they keep orders that were closed or evicted across restarts and
+compactions. The snapshot holds one sales record per date.
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_store import InMemoryOrderStore
+from app.sales_index import LineChange, PricedChange, SalesIndex, priced_changes
+from config.checkout_config import PricingConfig
+from models.order_model import ItemType
+from models.order_time import MINUTES_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+SEGMENT_FILE = re.compile(r"^journal-(\d{8})\.jsonl$")
+
+
+def segment_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, f"journal-{segment:08d}.jsonl")
+
+
+def list_segments(directory: str) -> List[int]:
+    return sorted(
+        int(match.group(1))
+        for match in map(SEGMENT_FILE.match, os.listdir(directory))
+        if match
+    )
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A crash can leave the last record half written
+                logger.warning("Ignoring truncated record at the end of %s", path)
+                return
+
+
+def sales_record(business_date: date, changes: Iterable[PricedChange]) -> Dict:
+    return {
+        "op": "sales",
+        "date": business_date.isoformat(),
+        "lines": [
+            [item_type.value, order_time, delta, amount]
+            for item_type, order_time, delta, amount in changes
+        ],
+    }
+
+
+def apply_sales_record(sales: SalesIndex, record: Dict) -> None:
+    sales.add(
+        date.fromisoformat(record["date"]),
+        [
+            (ItemType(item), order_time, delta, amount)
+            for item, order_time, delta, amount in record["lines"]
+        ],
+    )
+
+
+def apply_record(
+    orders: Dict[str, CheckoutCalculator],
+    record: Dict,
+    sales: Optional[SalesIndex] = None,
+) -> None:
+    op = record["op"]
+    if op == "sales":
+        if sales is not None:
+            apply_sales_record(sales, record)
+        return
+    order_id = record["id"]
+    if op == "put":
+        orders[order_id] = CheckoutCalculator.from_state(record["state"])
+    elif op == "change":
+        calculator = orders.get(order_id)
+        if calculator is not None:
+            calculator.apply_changes(record["version"], record["lines"])
+    elif op == "delete":
+        orders.pop(order_id, None)
+    else:
+        raise ValueError(f"Unknown journal record: {op}")
+
+
+def replay(
+    directory: str,
+    up_to_segment: Optional[int] = None,
+    sales: Optional[SalesIndex] = None,
+) -> Tuple[Dict[str, CheckoutCalculator], int]:
+    """
+    Rebuild orders from the snapshot and the segments after it.
+
+    Args:
+        directory: Journal directory
+        up_to_segment: Stop before this segment (default: replay all)
+        sales: Index to add the journaled sales to (default: skip them)
+
+    Returns:
+        (orders by id, number of the first segment that was not replayed)
+    """
+    orders: Dict[str, CheckoutCalculator] = {}
+    next_segment = 0
+    snapshot = os.path.join(directory, SNAPSHOT_FILE)
+    if os.path.exists(snapshot):
+        records = read_records(snapshot)
+        next_segment = next(records)["next_segment"]
+        for record in records:
+            if record.get("op") == "sales":
+                if sales is not None:
+                    apply_sales_record(sales, record)
+            else:
+                orders[record["id"]] = CheckoutCalculator.from_state(record["state"])
+
+    for segment in list_segments(directory):
+        if segment < next_segment:
+            continue
+        if up_to_segment is not None and segment >= up_to_segment:
+            break
+        for record in read_records(segment_path(directory, segment)):
+            apply_record(orders, record, sales)
+        next_segment = segment + 1
+    return orders, next_segment
+
+
+def _fsync_directory(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(
+    directory: str,
+    orders: Dict[str, CheckoutCalculator],
+    next_segment: int,
+    sales: Optional[SalesIndex] = None,
+) -> None:
+    """Atomically replace the snapshot, then delete the segments it covers"""
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    with open(path + ".tmp", "w") as f:
+        f.write(json.dumps({"next_segment": next_segment}) + "\n")
+        for order_id, calculator in orders.items():
+            f.write(json.dumps({"id": order_id, "state": calculator.to_state()}))
+            f.write("\n")
+        if sales is not None:
+            for business_date, changes in sales.days():
+                f.write(json.dumps(sales_record(business_date, changes)) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    _fsync_directory(directory)
+    for segment in list_segments(directory):
+        if segment < next_segment:
+            os.remove(segment_path(directory, segment))
+
+
+def compact(directory: str, up_to_segment: int) -> int:
+    """Fold the snapshot and segments before up_to_segment into a new snapshot"""
+    sales = SalesIndex()
+    orders, next_segment = replay(directory, up_to_segment, sales)
+    write_snapshot(directory, orders, next_segment, sales)
+    return len(orders)
+
+
+class OrderJournal:
+    """Group-committed writer of journal segments"""
+
+    def __init__(
+        self,
+        directory: str,
+        segment: int,
+        flush_interval: float = 0.05,
+        segment_records: int = 100000,
+        on_rotate: Optional[Callable[[int], None]] = None,
+    ):
+        self.directory = directory
+        self.segment = segment
+        self.flush_interval = flush_interval
+        self.segment_records = segment_records
+        self.on_rotate = on_rotate
+        self.records = 0
+        self.commits = 0
+        self._records_in_segment = 0
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        # Held while writing, so flush() and the background thread never
+        # interleave their writes
+        self._write_lock = threading.Lock()
+        self._file = open(segment_path(directory, segment), "ab")
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="order-journal", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, record: Dict) -> None:
+        """Queue a record for the next group commit"""
+        with self._pending_lock:
+            self._pending.append(record)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing the order journal failed")
+
+    def flush(self) -> None:
+        """Write and fsync every queued record"""
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            self._file.write(
+                "".join(
+                    json.dumps(record, separators=(",", ":")) + "\n"
+                    for record in pending
+                ).encode()
+            )
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records += len(pending)
+            self.commits += 1
+            self._records_in_segment += len(pending)
+            if self._records_in_segment >= self.segment_records:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self.segment += 1
+        self._records_in_segment = 0
+        self._file = open(segment_path(self.directory, self.segment), "ab")
+        if self.on_rotate is not None:
+            self.on_rotate(self.segment)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
+
+
+class JournaledOrderStore(InMemoryOrderStore):
+    """
+    InMemoryOrderStore that records every change in an OrderJournal and
+    restores the open orders from it.
+
+    A new order is journaled with its full state; later puts of the same
+    calculator only record the lines changed since the last journaled version.
+
+    The orders are recovered and the journal opened by the first process that
+    uses the store, not when it is created: a gunicorn master that creates it
+    while preloading the app never touches the directory, and the worker
+    forked from it starts its own writer thread. A process that inherits an
+    open store through fork reopens it from disk the same way, so it sees
+    only what was written before the fork.
+
+    Sales are journaled as they are recorded, so after a restart the counters
+    still cover orders that were closed or evicted before it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_orders: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        flush_interval: float = 0.05,
+        segment_records: int = 100000,
+    ):
+        super().__init__(max_orders=max_orders, ttl_seconds=ttl_seconds, clock=clock)
+        # put() journals and stores under one lock, and the parent's eviction
+        # calls _removed() while it is held
+        self._lock = threading.RLock()
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.segment_records = segment_records
+        os.makedirs(directory, exist_ok=True)
+
+        # Process that opened the journal, None until the store is first used
+        self._pid: Optional[int] = None
+        self._open_lock = threading.Lock()
+        self._journal: Optional[OrderJournal] = None
+        # Version of each order as last written to the journal
+        self._journaled: Dict[str, int] = {}
+        self._recovered_orders = 0
+        self.recovery_seconds = 0.0
+        self.snapshots = 0
+        self._compacting = threading.Lock()
+
+    def open(self) -> None:
+        """Recover the orders and start journaling, once per process"""
+        if self._pid == os.getpid():
+            return
+        with self._open_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Inherited through fork: the parent's writer thread is gone
+                # and its locks may have been held by threads that no longer
+                # exist, so start from what is on disk
+                self._lock = threading.RLock()
+                self._compacting = threading.Lock()
+            self._recover()
+            self._journal = OrderJournal(
+                self.directory,
+                self._next_segment,
+                flush_interval=self.flush_interval,
+                segment_records=self.segment_records,
+                on_rotate=self._start_compaction,
+            )
+            self._closed = False
+            self._pid = os.getpid()
+            atexit.unregister(self.close)
+            atexit.register(self.close)
+
+    def _recover(self) -> None:
+        started = time.perf_counter()
+        self._sales = SalesIndex()
+        orders, self._next_segment = replay(self.directory, sales=self._sales)
+        now = self._clock()
+        self._orders.clear()
+        for order_id, calculator in orders.items():
+            self._orders[order_id] = (calculator, now)
+        self._journaled = {
+            order_id: calculator.version for order_id, calculator in orders.items()
+        }
+        self._recovered_orders = len(orders)
+        self.recovery_seconds = time.perf_counter() - started
+        if orders:
+            logger.info(
+                "Recovered %d open orders in %.3fs",
+                self._recovered_orders,
+                self.recovery_seconds,
+            )
+
+    @property
+    def journal(self) -> OrderJournal:
+        self.open()
+        return self._journal
+
+    @property
+    def recovered_orders(self) -> int:
+        self.open()
+        return self._recovered_orders
+
+    def get(self, order_id: str) -> Optional[CheckoutCalculator]:
+        self.open()
+        return super().get(order_id)
+
+    def delete(self, order_id: str) -> None:
+        self.open()
+        super().delete(order_id)
+
+    def __len__(self) -> int:
+        self.open()
+        return super().__len__()
+
+    def record_sales(
+        self,
+        business_date: date,
+        pricing_config: PricingConfig,
+        changes: Iterable[LineChange],
+    ) -> None:
+        self.open()
+        changes = list(priced_changes(pricing_config, changes))
+        if not changes:
+            return
+        with self._lock:
+            self._journal.append(sales_record(business_date, changes))
+            self._sales.add(business_date, changes)
+
+    def sales_report(
+        self,
+        business_date: date,
+        start_minute: int = 0,
+        end_minute: int = MINUTES_PER_DAY,
+    ) -> Dict:
+        self.open()
+        return super().sales_report(business_date, start_minute, end_minute)
+
+    def put(self, order_id: str, calculator: CheckoutCalculator) -> None:
+        self.open()
+        with self._lock:
+            entry = self._orders.get(order_id)
+            journaled = self._journaled.get(order_id)
+            if entry is None or entry[0] is not calculator or journaled is None:
+                record = {"op": "put", "id": order_id, "state": calculator.to_state()}
+            elif journaled != calculator.version:
+                record = {
+                    "op": "change",
+                    "id": order_id,
+                    "version": calculator.version,
+                    "lines": calculator.changes_since(journaled),
+                }
+            else:
+                record = None
+            if record is not None:
+                self._journal.append(record)
+                self._journaled[order_id] = calculator.version
+            super().put(order_id, calculator)
+
+    def _removed(self, order_id: str) -> None:
+        self._journaled.pop(order_id, None)
+        self._journal.append({"op": "delete", "id": order_id})
+
+    def _start_compaction(self, up_to_segment: int) -> None:
+        # A rotation during a running compaction is picked up by the next one
+        if not self._compacting.acquire(blocking=False):
+            return
+        threading.Thread(
+            target=self._compact,
+            args=(up_to_segment,),
+            name="order-journal-compaction",
+            daemon=True,
+        ).start()
+
+    def _compact(self, up_to_segment: int) -> None:
+        try:
+            compact(self.directory, up_to_segment)
+            self.snapshots += 1
+        except Exception:
+            logger.exception("Compacting the order journal failed")
+        finally:
+            self._compacting.release()
+
+    def close(self) -> None:
+        """Write out queued changes and fold the whole journal into a snapshot"""
+        # Only the process that opened the journal may write to the directory
+        if self._pid != os.getpid() or self._closed:
+            return
+        self._closed = True
+        self._journal.close()
+        with self._compacting:
+            compact(self.directory, self._journal.segment + 1)
+            self.snapshots += 1
+
+    def stats(self) -> Dict[str, int]:
+        self.open()
+        stats = super().stats()
+        stats.update(
+            journal_records=self.journal.records,
+            journal_commits=self.journal.commits,
+            snapshots=self.snapshots,
+            recovered_orders=self._recovered_orders,
+        )
+        return stats
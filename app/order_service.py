@@ -0,0 +1,316 @@
+import logging
+import uuid
+from datetime import date
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.checkout_calculator import CheckoutCalculator
+from app.locking import StripedLock
+from app.metrics import time_stage
+from app.order_decoder import InvalidItemsError
+from app.order_store import OrderStore
+from config.checkout_config import PricingConfig
+from config.venue_registry import VenueRegistry
+from models.order_time import MINUTES_PER_DAY, parse_minute
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 10000
+
+
+def validate_checkout_data(data: Dict) -> Tuple[List, str]:
+    """Validate and extract checkout data from request"""
+    if not isinstance(data, dict):
+        raise ValueError("Invalid request format: JSON object expected")
+    logger.debug("Checkout payload: %s", data)
+    items = data.get("items")
+    order_time = data.get("order_time", "")
+
+    if not isinstance(items, list):
+        raise ValueError("Items must be a list")
+
+    return items, order_time
+
+
+def validate_modification_data(data: Dict) -> Tuple[List, str]:
+    """Validate and extract modification data from request"""
+    if not isinstance(data, dict):
+        raise ValueError("Invalid request format: JSON object expected")
+    items = data.get("items")
+    if items is None:
+        raise ValueError("Missing required 'items' field")
+
+    order_time = data.get("order_time", "")
+
+    if not isinstance(items, list):
+        raise ValueError("Items must be a list")
+
+    # The entries themselves are checked by decode_items() when they are
+    # added or cancelled, in the same pass that aggregates them
+    return items, order_time
+
+
+def validate_batch_data(data: Dict) -> List:
+    """Validate and extract the list of orders from a batch request"""
+    if not isinstance(data, dict):
+        raise ValueError("Invalid request format: JSON object expected")
+    orders = data.get("orders")
+    if not isinstance(orders, list):
+        raise ValueError("Orders must be a list")
+    if len(orders) > MAX_BATCH_SIZE:
+        raise ValueError(f"A batch may contain at most {MAX_BATCH_SIZE} orders")
+    return orders
+
+
+def parse_since(value: Optional[str]) -> Optional[int]:
+    """Parse the optional ?since=<version> query parameter"""
+    if value is None:
+        return None
+    try:
+        since = int(value)
+    except ValueError:
+        since = -1
+    if since < 0:
+        raise ValueError("'since' must be a non-negative order version")
+    return since
+
+
+def parse_report_window(start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+    """
+    Parse the ?from=HH:MM&to=HH:MM query parameters of a report into a
+    [start, end) window in minutes; the defaults cover the whole day and
+    to=24:00 is the end of the day
+    """
+    window = []
+    for name, value, default in (
+        ("from", start, 0),
+        ("to", end, MINUTES_PER_DAY),
+    ):
+        if value is None:
+            window.append(default)
+        elif value == "24:00":
+            window.append(MINUTES_PER_DAY)
+        else:
+            try:
+                window.append(parse_minute(value))
+            except (ValueError, TypeError):
+                raise ValueError(f"'{name}' must be a time formatted as HH:MM")
+    if window[0] > window[1]:
+        raise ValueError("'from' must not be later than 'to'")
+    return window[0], window[1]
+
+
+def parse_report_date(value: Optional[str], today: date) -> date:
+    """Parse the optional ?date=YYYY-MM-DD query parameter; defaults to today"""
+    if value is None:
+        return today
+    try:
+        if len(value) != 10:
+            raise ValueError
+        return date.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise ValueError("'date' must be a date formatted as YYYY-MM-DD")
+
+
+def etag_for(version: int) -> str:
+    return f'"v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], version: int) -> bool:
+    """True when an If-None-Match header already names this order version"""
+    if not if_none_match:
+        return False
+    etag = etag_for(version)
+    return any(
+        tag.strip() in ("*", etag, "W/" + etag) for tag in if_none_match.split(",")
+    )
+
+
+def describe_error(error: BaseException) -> Dict:
+    description = {"error_type": type(error).__name__, "error_message": str(error)}
+    if isinstance(error, InvalidItemsError):
+        description["errors"] = error.errors
+    return description
+
+
+def error_status(error: BaseException) -> HTTPStatus:
+    """Map an exception raised by the order operations to an HTTP status"""
+    if isinstance(error, ValueError):
+        return HTTPStatus.BAD_REQUEST
+    elif isinstance(error, KeyError) or isinstance(error, LookupError):
+        return HTTPStatus.NOT_FOUND
+    return HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def order_response(
+    order_id: str, calculator: CheckoutCalculator, since: Optional[int] = None
+) -> Dict:
+    """
+    Full order payload, or with since set only the lines changed after that
+    version (fully cancelled lines are reported with quantity 0)
+    """
+    response = {
+        "order_id": order_id,
+        "version": calculator.version,
+        "total": calculator.calculate_total(),
+    }
+    if since is None:
+        response["items"] = calculator.items_payload()
+    else:
+        response["since"] = since
+        response["items"] = calculator.changes_since(since)
+    return response
+
+
+class OrderService:
+    """
+    Order operations behind the HTTP routes, shared by the Flask app in
+    app/api.py and the ASGI app in app/asgi.py. Methods take the decoded
+    JSON body and return the response payload; errors are raised and
+    mapped to a status by error_status().
+
+    Reads and modifications of one order are serialised with a striped
+    lock, so threaded servers cannot lose concurrent add/cancel updates;
+    the store's transaction() does the same across worker processes.
+
+    New orders, quotes and batches are priced with the config of the venue
+    named by an optional "venue_id" in the body, or with params.yaml without
+    one.
+
+    Every change to an order's lines is also added to the store's sales
+    counters, in the same transaction as the order itself, under the
+    business date returned by today() when the change is made.
+    """
+
+    def __init__(
+        self,
+        store: OrderStore,
+        lock_stripes: int = 256,
+        venues: Optional[VenueRegistry] = None,
+        today: Callable[[], date] = date.today,
+    ):
+        self.store = store
+        self.today = today
+        self.venues = VenueRegistry() if venues is None else venues
+        self._order_locks = StripedLock(lock_stripes)
+
+    def pricing_config_for(self, data: Dict) -> Optional[PricingConfig]:
+        """Config of the request's venue; None means the default config"""
+        venue_id = data.get("venue_id")
+        if venue_id is None:
+            return None
+        return self.venues.get(venue_id)
+
+    def get_active_order(self, order_id: str) -> CheckoutCalculator:
+        calculator = self.store.get(order_id)
+        if calculator is None:
+            raise ValueError("Order not found", HTTPStatus.NOT_FOUND)
+        return calculator
+
+    def create_order(self, data: Dict) -> Dict:
+        with time_stage("validation"):
+            items, order_time = validate_checkout_data(data)
+            pricing_config = self.pricing_config_for(data)
+
+        # Create new calculator instance
+        calculator = CheckoutCalculator(items, order_time, pricing_config)
+
+        # Generate order ID (in production, use proper ID generation)
+        order_id = str(uuid.uuid4())
+        with self.store.transaction(order_id):
+            self.store.put(order_id, calculator)
+            self.store.record_sales(
+                self.today(),
+                calculator.pricing_config,
+                [
+                    (line.item_type, line.order_time, line.quantity)
+                    for line in calculator.order_items
+                ],
+            )
+        return order_response(order_id, calculator)
+
+    def add_items(self, order_id: str, data: Dict, since: Optional[int] = None) -> Dict:
+        with time_stage("validation"):
+            items, order_time = validate_modification_data(data)
+
+        with self._order_locks.lock_for(order_id), self.store.transaction(order_id):
+            calculator = self.get_active_order(order_id)
+            changes = calculator.add_items(items, order_time)
+            self.store.put(order_id, calculator)
+            self.store.record_sales(self.today(), calculator.pricing_config, changes)
+            return order_response(order_id, calculator, since)
+
+    def cancel_items(
+        self, order_id: str, data: Dict, since: Optional[int] = None
+    ) -> Dict:
+        with time_stage("validation"):
+            items, _ = validate_modification_data(data)
+
+        with self._order_locks.lock_for(order_id), self.store.transaction(order_id):
+            calculator = self.get_active_order(order_id)
+            changes = calculator.cancel_items(items)
+            self.store.put(order_id, calculator)
+            self.store.record_sales(self.today(), calculator.pricing_config, changes)
+            return order_response(order_id, calculator, since)
+
+    def get_order(self, order_id: str, since: Optional[int] = None) -> Dict:
+        with self._order_locks.lock_for(order_id):
+            return order_response(order_id, self.get_active_order(order_id), since)
+
+    def get_order_version(self, order_id: str) -> int:
+        """Current version of an order, for answering conditional requests"""
+        with self._order_locks.lock_for(order_id):
+            version = self.store.get_version(order_id)
+        if version is None:
+            raise ValueError("Order not found", HTTPStatus.NOT_FOUND)
+        return version
+
+    def sales_report(
+        self,
+        start: Optional[str],
+        end: Optional[str],
+        business_date: Optional[str] = None,
+    ) -> Dict:
+        """
+        Sales of one business date in the window given by the from/to query
+        parameters; the date query parameter defaults to today
+        """
+        return self.store.sales_report(
+            parse_report_date(business_date, self.today()),
+            *parse_report_window(start, end),
+        )
+
+    def quote(self, data: Dict) -> Dict:
+        with time_stage("validation"):
+            items, order_time = validate_checkout_data(data)
+            pricing_config = self.pricing_config_for(data)
+        return {"total": CheckoutCalculator.quote(items, order_time, pricing_config)}
+
+    def price_batch(self, data: Dict) -> Dict:
+        with time_stage("validation"):
+            orders = validate_batch_data(data)
+            pricing_config = self.pricing_config_for(data)
+
+            results = [None] * len(orders)
+            valid_orders = []
+            valid_positions = []
+            for position, order in enumerate(orders):
+                try:
+                    valid_orders.append(validate_checkout_data(order))
+                    valid_positions.append(position)
+                except ValueError as e:
+                    results[position] = e
+
+        priced = CheckoutCalculator.price_many(valid_orders, pricing_config)
+        for position, result in zip(valid_positions, priced):
+            results[position] = result
+
+        response = []
+        error_count = 0
+        for result in results:
+            if isinstance(result, Exception):
+                error_count += 1
+                response.append({"status": "error", "error": describe_error(result)})
+            else:
+                response.append({"total": result})
+        return {"count": len(orders), "errors": error_count, "results": response}
@@ -0,0 +1,458 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, Optional, Tuple
+
+from app.checkout_calculator import CheckoutCalculator
+from app.sales_index import (
+    LineChange,
+    SalesIndex,
+    build_report,
+    check_report_window,
+    priced_changes,
+)
+from config.app_config import AppConfig
+from config.checkout_config import PricingConfig
+from models.order_model import ItemType
+from models.order_time import MINUTES_PER_DAY
+
+
+class OrderStore(ABC):
+    """Storage for open orders, keyed by order id"""
+
+    @abstractmethod
+    def get(self, order_id: str) -> Optional[CheckoutCalculator]:
+        """Return the order, or None if it does not exist or has expired"""
+
+    @abstractmethod
+    def put(self, order_id: str, calculator: CheckoutCalculator) -> None:
+        """Insert or update an order; call again after mutating a calculator"""
+
+    @abstractmethod
+    def delete(self, order_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    def record_sales(
+        self,
+        business_date: date,
+        pricing_config: PricingConfig,
+        changes: Iterable[LineChange],
+    ) -> None:
+        """Add the line changes of one order to the sales counters of a date"""
+
+    @abstractmethod
+    def sales_report(
+        self,
+        business_date: date,
+        start_minute: int = 0,
+        end_minute: int = MINUTES_PER_DAY,
+    ) -> Dict:
+        """Sales of one business date's orders placed in [start_minute, end_minute)"""
+
+    def __contains__(self, order_id: str) -> bool:
+        return self.get(order_id) is not None
+
+    def get_version(self, order_id: str) -> Optional[int]:
+        """
+        Version of an order, or None like get(); stores that keep orders
+        serialised override this to avoid decoding the whole order
+        """
+        calculator = self.get(order_id)
+        return None if calculator is None else calculator.version
+
+    def transaction(self, order_id: str) -> ContextManager[None]:
+        """
+        Make a get, modify, put sequence on one order atomic with respect to
+        other processes sharing the store. Threads of one process are
+        serialised by OrderService; stores private to a process need nothing.
+        """
+        return nullcontext()
+
+
+class InMemoryOrderStore(OrderStore):
+    """
+    Bounded LRU store kept in process memory.
+
+    Orders untouched for longer than ttl_seconds are dropped on access or
+    when new orders are stored; once max_orders is reached the least
+    recently used order is evicted. The sales counters keep orders that
+    have left the store, for as long as the process runs.
+    """
+
+    def __init__(
+        self,
+        max_orders: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_orders <= 0:
+            raise ValueError("max_orders must be positive")
+        self.max_orders = max_orders
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._orders: "OrderedDict[str, Tuple[CheckoutCalculator, float]]" = (
+            OrderedDict()
+        )
+        self._sales = SalesIndex()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _removed(self, order_id: str) -> None:
+        """Called with the lock held whenever an order leaves the store"""
+
+    def _is_expired(self, touched_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - touched_at > self.ttl_seconds
+
+    def _purge_expired(self, now: float) -> None:
+        # Entries are ordered by last access, so expired ones sit at the front
+        while self._orders:
+            order_id, (_, touched_at) = next(iter(self._orders.items()))
+            if not self._is_expired(touched_at, now):
+                break
+            del self._orders[order_id]
+            self._removed(order_id)
+            self.expirations += 1
+
+    def get(self, order_id: str) -> Optional[CheckoutCalculator]:
+        now = self._clock()
+        with self._lock:
+            entry = self._orders.get(order_id)
+            if entry is None:
+                return None
+            calculator, touched_at = entry
+            if self._is_expired(touched_at, now):
+                del self._orders[order_id]
+                self._removed(order_id)
+                self.expirations += 1
+                return None
+            self._orders[order_id] = (calculator, now)
+            self._orders.move_to_end(order_id)
+            return calculator
+
+    def put(self, order_id: str, calculator: CheckoutCalculator) -> None:
+        now = self._clock()
+        with self._lock:
+            self._orders[order_id] = (calculator, now)
+            self._orders.move_to_end(order_id)
+            self._purge_expired(now)
+            while len(self._orders) > self.max_orders:
+                evicted_id, _ = self._orders.popitem(last=False)
+                self._removed(evicted_id)
+                self.evictions += 1
+
+    def delete(self, order_id: str) -> None:
+        with self._lock:
+            if self._orders.pop(order_id, None) is not None:
+                self._removed(order_id)
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "orders": len(self._orders),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def record_sales(
+        self,
+        business_date: date,
+        pricing_config: PricingConfig,
+        changes: Iterable[LineChange],
+    ) -> None:
+        self._sales.record(business_date, pricing_config, changes)
+
+    def sales_report(
+        self,
+        business_date: date,
+        start_minute: int = 0,
+        end_minute: int = MINUTES_PER_DAY,
+    ) -> Dict:
+        return self._sales.report(business_date, start_minute, end_minute)
+
+
+class SQLiteOrderStore(OrderStore):
+    """
+    Durable store backed by a SQLite database in WAL mode.
+
+    Every worker process opens the same file, so an order created by one
+    gunicorn worker can be modified by any other. Orders are kept as JSON
+    produced by CheckoutCalculator.to_state(), with their version in a column
+    of its own so conditional requests do not have to decode them.
+
+    transaction() holds SQLite's write lock (BEGIN IMMEDIATE) from the read
+    to the write, so concurrent modifications from different processes are
+    serialised instead of overwriting each other.
+
+    The sales counters are a table of totals per business date, item type
+    and minute of the day, with minute -1 for lines without an order time.
+    They are updated in the transaction that stores the order, so all
+    workers report the same totals and they survive restarts.
+    """
+
+    UNTIMED_MINUTE = -1
+
+    PURGE_EVERY = 1000
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._local = threading.local()
+        self._puts = 0
+        self.expirations = 0
+        db_dir = os.path.dirname(path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS orders ("
+                " order_id TEXT PRIMARY KEY,"
+                " state TEXT NOT NULL,"
+                " version INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL NOT NULL)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(orders)")]
+            if "version" not in columns:
+                # Databases created before the column existed
+                conn.execute(
+                    "ALTER TABLE orders ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+                )
+                conn.execute(
+                    "UPDATE orders"
+                    " SET version = COALESCE(json_extract(state, '$.version'), 0)"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS orders_updated_at ON orders (updated_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_sales ("
+                " business_date TEXT NOT NULL,"
+                " item TEXT NOT NULL,"
+                " minute INTEGER NOT NULL,"
+                " quantity INTEGER NOT NULL,"
+                " amount INTEGER NOT NULL,"
+                " PRIMARY KEY (business_date, item, minute)) WITHOUT ROWID"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads, nor with
+        # worker processes forked after the store was created
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.in_transaction = False
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Connection for a write, committed here unless a transaction is open"""
+        conn = self._connection()
+        if self._local.in_transaction:
+            yield conn
+            return
+        with conn:
+            yield conn
+
+    @contextmanager
+    def transaction(self, order_id: str) -> Iterator[None]:
+        conn = self._connection()
+        if self._local.in_transaction:
+            yield
+            return
+        # Take the database write lock before reading, so no other process can
+        # change the order between our read and write
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.in_transaction = True
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.in_transaction = False
+
+    def _expired(self, order_id: str, updated_at: float) -> bool:
+        """Delete the order if it has outlived ttl_seconds"""
+        if (
+            self.ttl_seconds is not None
+            and self._clock() - updated_at > self.ttl_seconds
+        ):
+            self.delete(order_id)
+            self.expirations += 1
+            return True
+        return False
+
+    def get(self, order_id: str) -> Optional[CheckoutCalculator]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT state, updated_at FROM orders WHERE order_id = ?", (order_id,)
+            )
+            .fetchone()
+        )
+        if row is None or self._expired(order_id, row[1]):
+            return None
+        return CheckoutCalculator.from_state(json.loads(row[0]))
+
+    def get_version(self, order_id: str) -> Optional[int]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT version, updated_at FROM orders WHERE order_id = ?",
+                (order_id,),
+            )
+            .fetchone()
+        )
+        if row is None or self._expired(order_id, row[1]):
+            return None
+        return row[0]
+
+    def put(self, order_id: str, calculator: CheckoutCalculator) -> None:
+        now = self._clock()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO orders (order_id, state, version, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    order_id,
+                    json.dumps(calculator.to_state()),
+                    calculator.version,
+                    now,
+                ),
+            )
+            self._puts += 1
+            if self.ttl_seconds is not None and self._puts % self.PURGE_EVERY == 0:
+                cursor = conn.execute(
+                    "DELETE FROM orders WHERE updated_at < ?", (now - self.ttl_seconds,)
+                )
+                self.expirations += cursor.rowcount
+
+    def delete(self, order_id: str) -> None:
+        with self._write() as conn:
+            conn.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"orders": len(self), "expirations": self.expirations}
+
+    def record_sales(
+        self,
+        business_date: date,
+        pricing_config: PricingConfig,
+        changes: Iterable[LineChange],
+    ) -> None:
+        totals: Dict[Tuple[str, str, int], Tuple[int, int]] = {}
+        for item_type, order_time, delta, amount in priced_changes(
+            pricing_config, changes
+        ):
+            key = (
+                business_date.isoformat(),
+                item_type.value,
+                self.UNTIMED_MINUTE if order_time is None else order_time,
+            )
+            quantity, total = totals.get(key, (0, 0))
+            totals[key] = (quantity + delta, total + amount)
+        if not totals:
+            return
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT INTO daily_sales"
+                " (business_date, item, minute, quantity, amount)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (business_date, item, minute) DO UPDATE SET"
+                " quantity = quantity + excluded.quantity,"
+                " amount = amount + excluded.amount",
+                [key + value for key, value in totals.items()],
+            )
+
+    def sales_report(
+        self,
+        business_date: date,
+        start_minute: int = 0,
+        end_minute: int = MINUTES_PER_DAY,
+    ) -> Dict:
+        check_report_window(start_minute, end_minute)
+        window = end_minute - start_minute
+        quantities = {item_type: [0] * window for item_type in ItemType}
+        amounts = {item_type: [0] * window for item_type in ItemType}
+        untimed_quantities = dict.fromkeys(ItemType, 0)
+        untimed_amounts = dict.fromkeys(ItemType, 0)
+        rows = self._connection().execute(
+            "SELECT item, minute, quantity, amount FROM daily_sales"
+            " WHERE business_date = ?"
+            " AND (minute = ? OR (minute >= ? AND minute < ?))",
+            (
+                business_date.isoformat(),
+                self.UNTIMED_MINUTE,
+                start_minute,
+                end_minute,
+            ),
+        )
+        for item, minute, quantity, amount in rows:
+            item_type = ItemType(item)
+            if minute == self.UNTIMED_MINUTE:
+                untimed_quantities[item_type] = quantity
+                untimed_amounts[item_type] = amount
+            else:
+                quantities[item_type][minute - start_minute] = quantity
+                amounts[item_type][minute - start_minute] = amount
+        return build_report(
+            business_date,
+            start_minute,
+            end_minute,
+            quantities,
+            amounts,
+            untimed_quantities,
+            untimed_amounts,
+        )
+
+
+def create_order_store(config: AppConfig) -> OrderStore:
+    if config.order_store == "journal":
+        from app.order_journal import JournaledOrderStore
+
+        return JournaledOrderStore(
+            config.order_journal_dir,
+            max_orders=config.max_active_orders,
+            ttl_seconds=config.order_ttl_seconds,
+            flush_interval=config.journal_flush_seconds,
+        )
+    if config.order_store == "sqlite":
+        return SQLiteOrderStore(
+            config.order_store_path, ttl_seconds=config.order_ttl_seconds
+        )
+    return InMemoryOrderStore(
+        max_orders=config.max_active_orders, ttl_seconds=config.order_ttl_seconds
+    )
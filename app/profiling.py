@@ -0,0 +1,190 @@
+"""
+Sampling cProfile middleware for the WSGI app.
+
+A request is profiled when it is picked by sample_rate, or always when
+slow_threshold_seconds is set (a request can only be kept for being slow
+if it was profiled from the start). Of the profiled requests, only the
+max_profiles slowest are kept. When neither option is set the middleware
+should not be installed at all, so disabled profiling costs nothing.
+"""
+
+import cProfile
+import heapq
+import itertools
+import marshal
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+MAX_STACK_DEPTH = 64
+
+
+@dataclass(order=True)
+class ProfileRecord:
+    duration: float
+    profile_id: int
+    method: str = field(compare=False)
+    path: str = field(compare=False)
+    started_at: float = field(compare=False)
+    stats: Dict = field(compare=False, repr=False)
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration * 1000, 3),
+            "started_at": self.started_at,
+        }
+
+    def to_pstats(self) -> bytes:
+        """Same format as cProfile.Profile.dump_stats, readable by pstats.Stats"""
+        return marshal.dumps(self.stats)
+
+    def to_collapsed(self) -> str:
+        """Collapsed stacks (one "frame;frame;frame weight" per line) in microseconds"""
+        return "".join(
+            f"{stack} {weight}\n" for stack, weight in collapse_stats(self.stats)
+        )
+
+
+def _frame_name(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({filename.rsplit('/', 1)[-1]}:{line})"
+
+
+def collapse_stats(stats: Dict) -> List[Tuple[str, int]]:
+    """
+    Rebuild approximate call stacks from cProfile's caller/callee graph.
+
+    cProfile only records edges, so a function's time is split between its
+    callers in proportion to the cumulative time of each call edge.
+    """
+    callees: Dict[Tuple, List[Tuple]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    roots = [func for func, entry in stats.items() if not entry[4]]
+
+    weights: Dict[str, float] = {}
+
+    def walk(func: Tuple, path: Tuple[str, ...], scale: float, seen: frozenset):
+        _, _, own_time, cumulative, _ = stats[func]
+        stack = path + (_frame_name(func),)
+        if own_time * scale > 0:
+            key = ";".join(stack)
+            weights[key] = weights.get(key, 0.0) + own_time * scale
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee in callees.get(func, ()):
+            if callee in seen:
+                continue
+            callee_cumulative = stats[callee][3]
+            edge_cumulative = stats[callee][4][func][3]
+            if callee_cumulative <= 0 or edge_cumulative <= 0:
+                continue
+            walk(
+                callee,
+                stack,
+                scale * edge_cumulative / callee_cumulative,
+                seen | {callee},
+            )
+
+    for root in roots:
+        walk(root, (), 1.0, frozenset((root,)))
+    return [
+        (stack, round(seconds * 1_000_000))
+        for stack, seconds in sorted(weights.items())
+        if round(seconds * 1_000_000) > 0
+    ]
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        sample_rate: float = 0.0,
+        slow_threshold_seconds: Optional[float] = None,
+        max_profiles: int = 20,
+    ):
+        if max_profiles <= 0:
+            raise ValueError("max_profiles must be positive")
+        self.wsgi_app = wsgi_app
+        self.sample_rate = sample_rate
+        self.slow_threshold_seconds = slow_threshold_seconds
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        # Min-heap on duration: the fastest kept profile is dropped first
+        self._profiles: List[ProfileRecord] = []
+        self._ids = itertools.count(1)
+
+    def _should_profile(self) -> bool:
+        if self.slow_threshold_seconds is not None:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, environ: Dict, start_response: Callable) -> Iterable[bytes]:
+        if not self._should_profile():
+            return self.wsgi_app(environ, start_response)
+
+        profiler = cProfile.Profile()
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this interpreter
+            return self.wsgi_app(environ, start_response)
+        try:
+            return self.wsgi_app(environ, start_response)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - started
+            if (
+                self.slow_threshold_seconds is None
+                or duration >= self.slow_threshold_seconds
+            ):
+                self._keep(profiler, environ, started_at, duration)
+
+    def _keep(
+        self,
+        profiler: cProfile.Profile,
+        environ: Dict,
+        started_at: float,
+        duration: float,
+    ) -> None:
+        with self._lock:
+            if (
+                len(self._profiles) >= self.max_profiles
+                and duration <= self._profiles[0].duration
+            ):
+                return
+            profiler.create_stats()
+            record = ProfileRecord(
+                duration=duration,
+                profile_id=next(self._ids),
+                method=environ.get("REQUEST_METHOD", ""),
+                path=environ.get("PATH_INFO", ""),
+                started_at=started_at,
+                stats=profiler.stats,
+            )
+            if len(self._profiles) >= self.max_profiles:
+                heapq.heapreplace(self._profiles, record)
+            else:
+                heapq.heappush(self._profiles, record)
+
+    def profiles(self) -> List[ProfileRecord]:
+        """Kept profiles, slowest first"""
+        with self._lock:
+            return sorted(self._profiles, reverse=True)
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        with self._lock:
+            for record in self._profiles:
+                if record.profile_id == profile_id:
+                    return record
+        return None
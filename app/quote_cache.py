@@ -0,0 +1,114 @@
+"""
+Bounded LRU cache of cart totals for pricing requests that do not create an
+order, such as POST /quote and batch pricing.
+
+A cart is canonicalised to its pricing time bucket plus the sorted
+(item, total quantity) pairs, so "2 mains, 1 drink" at 18:05 and
+"1 drink, 1 main, 1 main" at 18:40 share an entry when both times fall in
+the same bucket. Entries are keyed by the compiled price table as well, so
+quotes of a replaced config are never served again; they age out of the LRU
+like any other cart that is no longer asked for.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.order_decoder import MAX_QUANTITY
+from config.checkout_config import PricingConfig
+from config.price_table import REGULAR_BUCKET
+from models.order_time import parse_minute
+
+MAX_QUOTES = 4096
+
+CartKey = Tuple[int, Tuple[Tuple[str, int], ...]]
+
+
+def canonical_cart(
+    items: List, order_time: Optional[str], pricing_config: PricingConfig
+) -> Optional[CartKey]:
+    """
+    Canonical form of a cart, or None when it is not plain enough to cache;
+    such carts are priced the normal way, which also reports their errors.
+    """
+    if not isinstance(items, list):
+        return None
+    quantities: Dict[str, int] = {}
+    for item in items:
+        if type(item) is not dict:
+            return None
+        name, quantity = item.get("item"), item.get("quantity")
+        # Entries decode_items would reject must not share a key with
+        # valid carts that add up to the same quantities
+        if (
+            type(name) is not str
+            or type(quantity) is not int
+            or not 0 < quantity <= MAX_QUANTITY
+        ):
+            return None
+        quantities[name] = quantities.get(name, 0) + quantity
+
+    bucket = REGULAR_BUCKET
+    if order_time:
+        try:
+            bucket = pricing_config.price_table.bucket_for(parse_minute(order_time))
+        except (ValueError, TypeError):
+            return None
+    return bucket, tuple(sorted(quantities.items()))
+
+
+class QuoteCache:
+    """Thread-safe LRU map of (price table, cart key) to a total in cents"""
+
+    def __init__(self, max_entries: int = MAX_QUOTES):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._quotes: "OrderedDict[Hashable, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, pricing_config: PricingConfig, cart: CartKey) -> Optional[int]:
+        key = (pricing_config.price_table, cart)
+        with self._lock:
+            cents = self._quotes.get(key)
+            if cents is None:
+                self.misses += 1
+                return None
+            self._quotes.move_to_end(key)
+            self.hits += 1
+            return cents
+
+    def put(self, pricing_config: PricingConfig, cart: CartKey, cents: int) -> None:
+        key = (pricing_config.price_table, cart)
+        with self._lock:
+            self._quotes[key] = cents
+            self._quotes.move_to_end(key)
+            while len(self._quotes) > self.max_entries:
+                self._quotes.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._quotes.clear()
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._quotes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_default_cache = QuoteCache()
+
+
+def get_quote_cache() -> QuoteCache:
+    return _default_cache
@@ -0,0 +1,234 @@
+"""
+Re-price a CSV or JSON-Lines file of orders from the command line.
+
+    python -m app.reprice orders.jsonl totals.csv --workers 4
+
+JSON-Lines input holds one order per line:
+    {"order_id": "a", "items": [{"item": "main", "quantity": 2}], "order_time": "18:30"}
+Lines that are not valid JSON objects are reported as errors under their line
+number and the run carries on with the next line.
+
+CSV input holds one order line per row with the columns
+order_id,item,quantity[,order_time]; rows of the same order must be
+contiguous and may carry different order times (items added later).
+
+Output is written as it is produced with the columns order_id,total,error,
+so memory use does not grow with the size of the input.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.checkout_calculator import CheckoutCalculator
+from config.checkout_config import PricingConfig
+from config.config_loader import get_pricing_config, load_pricing_config
+
+# An order is its id plus the rounds it was ordered in: [(items, order_time)],
+# or the error that made its input record unreadable
+Order = Tuple[str, Union[List[Tuple[List[Dict], Optional[str]]], ValueError]]
+PricedOrder = Tuple[str, Optional[float], Optional[str]]
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    if path == "-":
+        return "csv"
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    raise ValueError(f"Cannot infer format of {path!r}, use --input/--output-format")
+
+
+def read_jsonl_orders(stream: IO[str]) -> Iterator[Order]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield str(line_number), ValueError(
+                f"Invalid JSON on line {line_number}: {e}"
+            )
+            continue
+        if not isinstance(record, dict):
+            yield str(line_number), ValueError(
+                f"Line {line_number} is not a JSON object"
+            )
+            continue
+        yield str(record.get("order_id", line_number)), [
+            (record.get("items"), record.get("order_time"))
+        ]
+
+
+def read_csv_orders(stream: IO[str]) -> Iterator[Order]:
+    reader = csv.DictReader(stream)
+    missing = {"order_id", "item", "quantity"} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing required CSV columns: {sorted(missing)}")
+    for order_id, rows in itertools.groupby(reader, key=lambda row: row["order_id"]):
+        rounds = []
+        for order_time, round_rows in itertools.groupby(
+            rows, key=lambda row: row.get("order_time") or None
+        ):
+            items = [
+                {"item": row["item"], "quantity": row["quantity"]} for row in round_rows
+            ]
+            rounds.append((items, order_time))
+        yield order_id, rounds
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def price_order(order: Order, pricing_config: PricingConfig) -> PricedOrder:
+    order_id, rounds = order
+    if isinstance(rounds, ValueError):
+        return order_id, None, f"{type(rounds).__name__}: {rounds}"
+    try:
+        calculator = CheckoutCalculator([], pricing_config=pricing_config)
+        for items, order_time in rounds:
+            if not isinstance(items, list):
+                raise ValueError("Items must be a list")
+            calculator.add_items(items, order_time)
+        return order_id, calculator.calculate_total(), None
+    except (ValueError, KeyError, TypeError) as e:
+        return order_id, None, f"{type(e).__name__}: {e}"
+
+
+def price_chunk(chunk: List[Order], pricing_config: PricingConfig) -> List[PricedOrder]:
+    return [price_order(order, pricing_config) for order in chunk]
+
+
+def price_chunks(
+    chunks: Iterable[List[Order]], pricing_config: PricingConfig, workers: int
+) -> Iterator[List[PricedOrder]]:
+    """Price chunks in input order, in-process or on a bounded process pool"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield price_chunk(chunk, pricing_config)
+        return
+
+    # Only a few chunks are in flight at once so memory stays bounded even
+    # when the input is much larger than what the workers can keep up with
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(price_chunk, chunk, pricing_config))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_csv(stream: IO[str], results: Iterable[PricedOrder]) -> None:
+    writer = csv.writer(stream)
+    writer.writerow(["order_id", "total", "error"])
+    for order_id, total, error in results:
+        writer.writerow([order_id, "" if total is None else total, error or ""])
+
+
+def write_jsonl(stream: IO[str], results: Iterable[PricedOrder]) -> None:
+    for order_id, total, error in results:
+        record = {"order_id": order_id, "total": total}
+        if error:
+            record["error"] = error
+        stream.write(json.dumps(record) + "\n")
+
+
+@contextmanager
+def open_stream(path: str, mode: str):
+    if path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+    else:
+        with open(path, mode, newline="") as stream:
+            yield stream
+
+
+def reprice(
+    input_path: str,
+    output_path: str,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    chunk_size: int = 10000,
+    workers: int = 0,
+    pricing_config: Optional[PricingConfig] = None,
+) -> Dict[str, int]:
+    """Stream orders from input_path, price them and write totals to output_path"""
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_format(output_path, output_format)
+    pricing_config = pricing_config or get_pricing_config()
+    reader = read_csv_orders if input_format == "csv" else read_jsonl_orders
+    writer = write_csv if output_format == "csv" else write_jsonl
+    counts = {"orders": 0, "errors": 0}
+
+    def counted(results_chunks: Iterable[List[PricedOrder]]) -> Iterator[PricedOrder]:
+        for results in results_chunks:
+            for result in results:
+                counts["orders"] += 1
+                counts["errors"] += result[2] is not None
+                yield result
+
+    with open_stream(input_path, "r") as source, open_stream(output_path, "w") as sink:
+        chunks = chunked(reader(source), chunk_size)
+        writer(sink, counted(price_chunks(chunks, pricing_config, workers)))
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.reprice",
+        description="Re-price a CSV or JSON-Lines file of orders.",
+    )
+    parser.add_argument("input", help="Input file, or - for stdin (CSV by default)")
+    parser.add_argument("output", help="Output file, or - for stdout (CSV by default)")
+    parser.add_argument("--input-format", choices=FORMATS)
+    parser.add_argument("--output-format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Worker processes (default: none)"
+    )
+    parser.add_argument("--config", help="Pricing config file (default: params.yaml)")
+    args = parser.parse_args(argv)
+
+    try:
+        counts = reprice(
+            args.input,
+            args.output,
+            input_format=args.input_format,
+            output_format=args.output_format,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            pricing_config=load_pricing_config(args.config) if args.config else None,
+        )
+    except (OSError, ValueError) as e:
+        print(f"reprice: {e}", file=sys.stderr)
+        return 1
+    print(
+        f"Priced {counts['orders']} orders, {counts['errors']} errors",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
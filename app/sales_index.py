@@ -0,0 +1,235 @@
+"""
+Running sales totals by business date, item type and minute of the day, for
+reports such as "drinks sold before the 19:00 cutoff tonight" or revenue per
+hour.
+
+OrderService records the quantity changes of every create, add and cancel
+with its order store as they happen, so a report sums one counter per item
+type and minute of the requested window and never looks at the orders
+themselves. Stores private to a process keep the counters in a SalesIndex;
+SQLiteOrderStore keeps them in a table written in the same transaction as
+the order, so every worker reports the sales of all of them.
+
+A change counts towards the business date on which it was made: the local
+calendar date, which rolls over at midnight. A report covers one date.
+
+Revenue is what customers pay for the items: discounts and the food service
+charge are included. It is kept exact, in units of 1/REVENUE_SCALE cents,
+and rounded to cents only when reported. Lines without an order time are
+totalled separately.
+"""
+
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.checkout_config import PricingConfig
+from config.price_table import BASIS_POINTS, round_half_up
+from models.order_model import ItemType
+from models.order_time import MINUTES_PER_DAY, format_minute
+
+# The amount scale of price tables with one discount window; amounts of
+# other tables are converted to it, rounding half up if they do not divide it
+REVENUE_SCALE = BASIS_POINTS**2
+
+# Days of counters a SalesIndex keeps before the latest recorded date
+DEFAULT_RETENTION_DAYS = 62
+
+# (item type, order time in minutes after midnight or None, quantity delta)
+LineChange = Tuple[ItemType, Optional[int], int]
+# A LineChange with its revenue in units of 1/REVENUE_SCALE cents
+PricedChange = Tuple[ItemType, Optional[int], int, int]
+
+
+def format_boundary(minute: int) -> str:
+    """HH:MM of a window boundary; the end of the day is 24:00"""
+    return "24:00" if minute == MINUTES_PER_DAY else format_minute(minute)
+
+
+def priced_changes(
+    pricing_config: PricingConfig, changes: Iterable[LineChange]
+) -> Iterator[PricedChange]:
+    """
+    The changes of one order with the revenue of each, in units of
+    1/REVENUE_SCALE cents, priced with the order's config
+    """
+    price_table = pricing_config.price_table
+    factor, remainder = divmod(REVENUE_SCALE, price_table.amount_scale)
+    for item_type, order_time, delta in changes:
+        amount = (
+            price_table.unit_amounts[(item_type, price_table.bucket_for(order_time))]
+            * delta
+        )
+        if remainder:
+            amount = round_half_up(amount * REVENUE_SCALE, price_table.amount_scale)
+        else:
+            amount *= factor
+        yield item_type, order_time, delta, amount
+
+
+def to_currency(amount: int) -> float:
+    return round_half_up(amount, REVENUE_SCALE) / 100
+
+
+def build_report(
+    business_date: date,
+    start_minute: int,
+    end_minute: int,
+    quantities: Dict[ItemType, List[int]],
+    amounts: Dict[ItemType, List[int]],
+    untimed_quantities: Dict[ItemType, int],
+    untimed_amounts: Dict[ItemType, int],
+) -> Dict:
+    """
+    Report of the counters of one window; quantities and amounts hold the
+    counters of its minutes, starting at start_minute
+    """
+    items = {
+        item_type.value: {
+            "quantity": sum(quantities[item_type]),
+            "revenue": to_currency(sum(amounts[item_type])),
+        }
+        for item_type in ItemType
+    }
+
+    hours = []
+    hour_start = start_minute
+    while hour_start < end_minute:
+        hour_end = min((hour_start // 60 + 1) * 60, end_minute)
+        offsets = slice(hour_start - start_minute, hour_end - start_minute)
+        hours.append(
+            {
+                "from": format_minute(hour_start),
+                "to": format_boundary(hour_end),
+                "quantity": sum(sum(counts[offsets]) for counts in quantities.values()),
+                "revenue": to_currency(
+                    sum(sum(counts[offsets]) for counts in amounts.values())
+                ),
+            }
+        )
+        hour_start = hour_end
+
+    return {
+        "date": business_date.isoformat(),
+        "from": format_boundary(start_minute),
+        "to": format_boundary(end_minute),
+        "quantity": sum(item["quantity"] for item in items.values()),
+        "revenue": to_currency(sum(sum(counts) for counts in amounts.values())),
+        "items": items,
+        "hours": hours,
+        "untimed": {
+            item_type.value: {
+                "quantity": untimed_quantities[item_type],
+                "revenue": to_currency(untimed_amounts[item_type]),
+            }
+            for item_type in ItemType
+        },
+    }
+
+
+def check_report_window(start_minute: int, end_minute: int) -> None:
+    if not 0 <= start_minute <= end_minute <= MINUTES_PER_DAY:
+        raise ValueError("The report window must be within one day, from <= to")
+
+
+class _DayCounters:
+    def __init__(self):
+        self.quantities: Dict[ItemType, List[int]] = {
+            item_type: [0] * MINUTES_PER_DAY for item_type in ItemType
+        }
+        self.amounts: Dict[ItemType, List[int]] = {
+            item_type: [0] * MINUTES_PER_DAY for item_type in ItemType
+        }
+        self.untimed_quantities: Dict[ItemType, int] = dict.fromkeys(ItemType, 0)
+        self.untimed_amounts: Dict[ItemType, int] = dict.fromkeys(ItemType, 0)
+
+
+class SalesIndex:
+    """
+    Thread-safe quantity and revenue counters per business date, item type
+    and minute. Dates more than retention_days before the latest recorded
+    date are dropped.
+    """
+
+    def __init__(self, retention_days: int = DEFAULT_RETENTION_DAYS):
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._days: Dict[date, _DayCounters] = {}
+
+    def record(
+        self,
+        business_date: date,
+        pricing_config: PricingConfig,
+        changes: Iterable[LineChange],
+    ) -> None:
+        """Add quantity changes of one order, priced with the order's config"""
+        self.add(business_date, priced_changes(pricing_config, changes))
+
+    def add(self, business_date: date, changes: Iterable[PricedChange]) -> None:
+        """Add changes that are already priced"""
+        changes = list(changes)
+        with self._lock:
+            day = self._days.get(business_date)
+            if day is None:
+                day = self._days[business_date] = _DayCounters()
+                oldest = max(self._days) - timedelta(days=self.retention_days)
+                for stale in [known for known in self._days if known < oldest]:
+                    del self._days[stale]
+            for item_type, order_time, delta, amount in changes:
+                if order_time is None:
+                    day.untimed_quantities[item_type] += delta
+                    day.untimed_amounts[item_type] += amount
+                else:
+                    day.quantities[item_type][order_time] += delta
+                    day.amounts[item_type][order_time] += amount
+
+    def days(self) -> Iterator[Tuple[date, List[PricedChange]]]:
+        """The non-zero counters of each date, as changes that add up to them"""
+        with self._lock:
+            days = list(self._days.items())
+        for business_date, day in days:
+            changes = [
+                (item_type, minute, quantity, day.amounts[item_type][minute])
+                for item_type, quantities in day.quantities.items()
+                for minute, quantity in enumerate(quantities)
+                if quantity or day.amounts[item_type][minute]
+            ]
+            changes.extend(
+                (item_type, None, quantity, day.untimed_amounts[item_type])
+                for item_type, quantity in day.untimed_quantities.items()
+                if quantity or day.untimed_amounts[item_type]
+            )
+            yield business_date, changes
+
+    def report(
+        self,
+        business_date: date,
+        start_minute: int = 0,
+        end_minute: int = MINUTES_PER_DAY,
+    ) -> Dict:
+        """
+        Sales of orders placed on business_date in [start_minute, end_minute),
+        per item type and per clock hour. Takes time proportional to the window.
+        """
+        check_report_window(start_minute, end_minute)
+        with self._lock:
+            day = self._days.get(business_date) or _DayCounters()
+            quantities = {
+                item_type: counts[start_minute:end_minute]
+                for item_type, counts in day.quantities.items()
+            }
+            amounts = {
+                item_type: counts[start_minute:end_minute]
+                for item_type, counts in day.amounts.items()
+            }
+            untimed_quantities = dict(day.untimed_quantities)
+            untimed_amounts = dict(day.untimed_amounts)
+        return build_report(
+            business_date,
+            start_minute,
+            end_minute,
+            quantities,
+            amounts,
+            untimed_quantities,
+            untimed_amounts,
+        )
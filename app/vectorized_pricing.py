@@ -0,0 +1,187 @@
+"""
+Columnar pricing for bulk re-pricing of historical order lines.
+
+Requires NumPy, which is an optional dependency; importing this module
+without it works, calling the pricing functions does not.
+"""
+
+from typing import Iterable, Optional, Sequence, Tuple
+
+from app.order_decoder import (
+    MAX_QUANTITY,
+    MAX_REPORTED_ERRORS,
+    InvalidItemsError,
+    parse_quantity,
+)
+from config.checkout_config import PricingConfig
+from config.config_loader import get_pricing_config
+from config.price_table import REGULAR_BUCKET
+from models.order_model import ItemType
+from models.order_time import MINUTES_PER_DAY, parse_minute
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+ITEM_CODES = {item_type: code for code, item_type in enumerate(ItemType)}
+NO_ORDER_TIME = -1
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Vectorized pricing requires numpy: pip install numpy")
+
+
+def encode_item_types(values: Iterable[str]) -> "np.ndarray":
+    """Map item names such as "drink" to the integer codes used by price_columns"""
+    _require_numpy()
+    codes = {item_type.value: code for item_type, code in ITEM_CODES.items()}
+    try:
+        return np.fromiter((codes[value] for value in values), dtype=np.int64)
+    except KeyError as e:
+        raise ValueError(f"{e.args[0]!r} is not a valid ItemType")
+
+
+def encode_order_times(values: Iterable[Optional[str]]) -> "np.ndarray":
+    """Map HH:MM strings to minutes after midnight, None to NO_ORDER_TIME"""
+    _require_numpy()
+
+    def to_minutes(value: Optional[str]) -> int:
+        if not value:
+            return NO_ORDER_TIME
+        try:
+            return parse_minute(value)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid order time {value!r}, must be HH:MM") from None
+
+    return np.fromiter((to_minutes(value) for value in values), dtype=np.int64)
+
+
+def _quantity_column(quantities: Sequence) -> "np.ndarray":
+    """
+    Quantities as int64, checked like decode_items checks them. Integer
+    columns are checked in bulk; others, such as floats or strings read from
+    a file, value by value with parse_quantity.
+    """
+    column = np.asarray(quantities)
+    if column.dtype.kind in "iu":
+        values = column.astype(np.int64)
+        bad = np.flatnonzero((column < 1) | (column > MAX_QUANTITY)).tolist()
+    else:
+        values = np.zeros(len(column), dtype=np.int64)
+        bad = []
+        for index, quantity in enumerate(column.tolist()):
+            try:
+                values[index] = parse_quantity(quantity)
+            except ValueError:
+                bad.append(index)
+    if bad:
+        raw = column.tolist()
+        errors = []
+        for index in bad[:MAX_REPORTED_ERRORS]:
+            try:
+                parse_quantity(raw[index])
+            except ValueError as e:
+                errors.append(
+                    {"index": int(index), "field": "quantity", "message": str(e)}
+                )
+        raise InvalidItemsError(errors, len(bad))
+    return values
+
+
+def price_columns(
+    order_ids: Sequence,
+    item_codes: Sequence[int],
+    quantities: Sequence[int],
+    order_minutes: Sequence[int],
+    pricing_config: Optional[PricingConfig] = None,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Price order lines held as parallel columns and total them per order.
+
+    Args:
+        order_ids: Order identifier of each line; lines of an order need not
+                   be contiguous
+        item_codes: ITEM_CODES value of each line
+        quantities: Quantity of each line
+        order_minutes: Minutes after midnight each line was ordered at, or
+                       NO_ORDER_TIME
+        pricing_config: Config to price with (default: the shared config)
+
+    Returns:
+        (unique order ids, totals) where totals are identical to
+        CheckoutCalculator.calculate_total.
+
+    Raises:
+        ValueError: If the columns differ in length, or an item code or
+                    order minute is out of range
+        InvalidItemsError: If a quantity is not a whole number from 1 to
+                           MAX_QUANTITY; index is the position of the line
+    """
+    _require_numpy()
+    pricing_config = pricing_config or get_pricing_config()
+    item_codes = np.asarray(item_codes, dtype=np.int64)
+    quantities = _quantity_column(quantities)
+    order_minutes = np.asarray(order_minutes, dtype=np.int64)
+    if not len(item_codes) == len(quantities) == len(order_minutes) == len(order_ids):
+        raise ValueError("All columns must have the same length")
+    invalid = (item_codes < 0) | (item_codes >= len(ITEM_CODES))
+    if invalid.any():
+        raise ValueError(f"Invalid item code {item_codes[invalid][0]}")
+    invalid = ((order_minutes < 0) | (order_minutes >= MINUTES_PER_DAY)) & (
+        order_minutes != NO_ORDER_TIME
+    )
+    if invalid.any():
+        raise ValueError(f"Invalid order minute {order_minutes[invalid][0]}")
+
+    unique_ids, order_index = np.unique(np.asarray(order_ids), return_inverse=True)
+    n_orders = len(unique_ids)
+    price_table = pricing_config.price_table
+    n_buckets = len(price_table.buckets)
+
+    minute_buckets = np.asarray(price_table.minute_buckets, dtype=np.int64)
+    # NO_ORDER_TIME indexes the last minute, whose bucket np.where discards
+    time_bucket = np.where(
+        order_minutes == NO_ORDER_TIME, REGULAR_BUCKET, minute_buckets[order_minutes]
+    )
+    # Same layout as price_table.buckets: item type major, then time bucket
+    bucket = item_codes * price_table.bucket_count + time_bucket
+
+    # Quantities per (order, bucket); float weights are exact for integers
+    bucket_quantities = (
+        np.bincount(
+            order_index * n_buckets + bucket,
+            weights=quantities,
+            minlength=n_orders * n_buckets,
+        )
+        .astype(np.int64)
+        .reshape(n_orders, n_buckets)
+    )
+
+    # Exact integer amounts as in calculate_total_cents; fall back to Python
+    # ints when an order could overflow int64
+    columns = [
+        column for column in range(n_buckets) if bucket_quantities[:, column].any()
+    ]
+    for column in columns:
+        if price_table.buckets[column] not in price_table.unit_amounts:
+            raise ValueError(
+                f"No price configured for {price_table.buckets[column][0].value}"
+            )
+    max_amount = sum(
+        price_table.unit_amounts[price_table.buckets[column]]
+        * int(bucket_quantities[:, column].max())
+        for column in columns
+    )
+    dtype = np.int64 if max_amount < 2**61 else object
+    amounts = np.zeros(n_orders, dtype=dtype)
+    for column in columns:
+        amounts += price_table.unit_amounts[
+            price_table.buckets[column]
+        ] * bucket_quantities[:, column].astype(dtype)
+
+    # Round half up to cents: amount / scale + 1/2, floored
+    scale = price_table.amount_scale
+    cents = (2 * amounts + scale) // (2 * scale)
+    return unique_ids, cents.astype(np.int64) / 100
@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+def minute_to_time(minute: int) -> str:
+    return f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+
+
+def add_rounds(calculator, rounds: int) -> None:
+    """Grow an order with one add round per minute of the day, starting at 00:00"""
+    for minute in range(rounds):
+        calculator.add_items(
+            [{"item": "main", "quantity": 1}, {"item": "drink", "quantity": 2}],
+            minute_to_time(minute),
+        )
@@ -0,0 +1,101 @@
+"""
+Closed-loop HTTP load test for the order API.
+
+Start a server, then point the load test at it, e.g. to compare the WSGI
+and ASGI serving modes:
+
+    make run          &  python -m benchmarks.load_test --url http://localhost:5000
+    make run-asgi     &  python -m benchmarks.load_test --url http://localhost:8000
+
+Each client thread keeps one connection open and loops over: create an
+order, add items, cancel items, read the order back.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+ORDER = {
+    "items": [
+        {"item": "starter", "quantity": 2},
+        {"item": "main", "quantity": 2},
+        {"item": "drink", "quantity": 2},
+    ],
+    "order_time": "18:30",
+}
+ADD = {"items": [{"item": "drink", "quantity": 2}], "order_time": "20:00"}
+CANCEL = {"items": [{"item": "drink", "quantity": 1}]}
+
+
+def run_client(url: str, deadline: float, latencies: List[float], errors: List[int]):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=10)
+    headers = {"Content-Type": "application/json"}
+
+    def request(method: str, path: str, payload: Dict = None) -> Dict:
+        body = json.dumps(payload) if payload is not None else None
+        started = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        latencies.append(time.perf_counter() - started)
+        if response.status != 200:
+            errors.append(response.status)
+            return {}
+        return json.loads(data)
+
+    while time.perf_counter() < deadline:
+        order_id = request("POST", "/order", ORDER).get("order_id")
+        if order_id is None:
+            continue
+        request("POST", f"/orders/{order_id}/add", ADD)
+        request("POST", f"/orders/{order_id}/cancel", CANCEL)
+        request("GET", f"/orders/{order_id}")
+    conn.close()
+
+
+def run_load_test(url: str, clients: int, duration: float) -> Dict[str, float]:
+    deadline = time.perf_counter() + duration
+    latencies: List[float] = []
+    errors: List[int] = []
+    threads = [
+        threading.Thread(target=run_client, args=(url, deadline, latencies, errors))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(0.50) * 1000,
+        "p99_ms": percentile(0.99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = run_load_test(args.url, args.clients, args.duration)
+    print(json.dumps({"url": args.url, "clients": args.clients, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
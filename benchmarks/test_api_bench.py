@@ -0,0 +1,44 @@
+import pytest
+
+from app.api import app
+
+ORDER = {
+    "items": [
+        {"item": "starter", "quantity": 4},
+        {"item": "main", "quantity": 4},
+        {"item": "drink", "quantity": 4},
+    ],
+    "order_time": "18:30",
+}
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.fixture
+def order_id(client):
+    return client.post("/order", json=ORDER).get_json()["order_id"]
+
+
+def test_post_order(benchmark, client):
+    response = benchmark(client.post, "/order", json=ORDER)
+    assert response.status_code == 200
+
+
+def test_add_items(benchmark, client, order_id):
+    add = {"items": [{"item": "drink", "quantity": 1}], "order_time": "20:00"}
+    response = benchmark(client.post, f"/orders/{order_id}/add", json=add)
+    assert response.status_code == 200
+
+
+def test_get_order(benchmark, client, order_id):
+    response = benchmark(client.get, f"/orders/{order_id}")
+    assert response.status_code == 200
+
+
+def test_batch_of_100_orders(benchmark, client):
+    batch = {"orders": [ORDER] * 100}
+    response = benchmark(client.post, "/orders/batch", json=batch)
+    assert response.status_code == 200
@@ -0,0 +1,113 @@
+import itertools
+
+import pytest
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_decoder import decode_items
+from benchmarks.conftest import add_rounds
+from config.config_loader import (
+    DEFAULT_CONFIG_PATH,
+    get_pricing_config,
+    load_pricing_config,
+)
+from config.venue_registry import VenueRegistry
+
+ORDER = [
+    {"item": "starter", "quantity": 4},
+    {"item": "main", "quantity": 4},
+    {"item": "drink", "quantity": 4},
+]
+ORDER_SIZES = [10, 100, 1000]
+ITEM_NAMES = ["starter", "main", "drink", "main"]
+
+
+def test_calculator_construction(benchmark):
+    benchmark(CheckoutCalculator, ORDER, "18:30")
+
+
+@pytest.mark.parametrize("rounds", ORDER_SIZES)
+def test_calculate_total(benchmark, rounds):
+    calculator = CheckoutCalculator([])
+    add_rounds(calculator, rounds)
+    benchmark(calculator.calculate_total)
+
+
+@pytest.mark.parametrize("rounds", ORDER_SIZES)
+def test_add_items_on_long_history(benchmark, rounds):
+    calculator = CheckoutCalculator([])
+    add_rounds(calculator, rounds)
+    benchmark(calculator.add_items, [{"item": "main", "quantity": 1}], "21:15")
+
+
+@pytest.mark.parametrize("rounds", ORDER_SIZES)
+def test_cancel_items_on_long_history(benchmark, rounds):
+    def setup():
+        calculator = CheckoutCalculator([])
+        add_rounds(calculator, rounds)
+        return (calculator, [{"item": "drink", "quantity": 3}]), {}
+
+    benchmark.pedantic(
+        lambda calculator, items: calculator.cancel_items(items),
+        setup=setup,
+        rounds=20,
+    )
+
+
+def test_load_pricing_config_from_disk(benchmark):
+    benchmark(load_pricing_config)
+
+
+def test_get_cached_pricing_config(benchmark):
+    benchmark(get_pricing_config)
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["priced", "cached"])
+def test_quote_set_menu(benchmark, cached):
+    items = [
+        {"item": "starter", "quantity": 2},
+        {"item": "main", "quantity": 2},
+        {"item": "drink", "quantity": 2},
+    ]
+    if cached:
+        benchmark(CheckoutCalculator.quote, items, "18:30")
+    else:
+        benchmark(lambda: CheckoutCalculator(items, "18:30").calculate_total())
+
+
+def many_lines(lines: int):
+    # Kitchen-display style orders that list every plate separately
+    return [
+        {"item": item_type, "quantity": 1 + line % 3}
+        for line, item_type in zip(range(lines), itertools.cycle(ITEM_NAMES))
+    ]
+
+
+@pytest.mark.parametrize("lines", [100, 500])
+def test_add_items_with_many_lines(benchmark, lines):
+    calculator = CheckoutCalculator([])
+    benchmark(calculator.add_items, many_lines(lines), "18:30")
+
+
+@pytest.mark.parametrize("lines", [100, 500])
+def test_decode_items(benchmark, lines):
+    benchmark(decode_items, many_lines(lines))
+
+
+@pytest.fixture(scope="module")
+def venue_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("venues")
+    with open(DEFAULT_CONFIG_PATH) as f:
+        params = f.read()
+    for index in range(1000):
+        (directory / f"venue-{index}.yaml").write_text(params)
+    return str(directory)
+
+
+def test_load_venue_configs(benchmark, venue_dir):
+    benchmark.pedantic(VenueRegistry(venue_dir).load_all, rounds=3)
+
+
+def test_venue_config_lookup(benchmark, venue_dir):
+    registry = VenueRegistry(venue_dir)
+    registry.load_all()
+    benchmark(registry.get, "venue-500")
@@ -0,0 +1,40 @@
+import atexit
+
+import pytest
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_journal import JournaledOrderStore
+
+OPEN_ORDERS = 20000
+
+
+@pytest.fixture(scope="module", params=["snapshot", "journal"])
+def journal_dir(request, tmp_path_factory):
+    """A journal with OPEN_ORDERS orders, folded into a snapshot or not"""
+    directory = str(tmp_path_factory.mktemp(request.param))
+    store = JournaledOrderStore(directory, max_orders=OPEN_ORDERS)
+    for number in range(OPEN_ORDERS):
+        calculator = CheckoutCalculator(
+            [{"item": "main", "quantity": 2}, {"item": "drink", "quantity": 2}],
+            "18:30",
+        )
+        store.put(str(number), calculator)
+        calculator.add_items([{"item": "starter", "quantity": 1}], "20:00")
+        store.put(str(number), calculator)
+    if request.param == "snapshot":
+        store.close()
+    else:
+        store.journal.close()
+        atexit.unregister(store.close)
+    return directory
+
+
+def test_recover_open_orders(benchmark, journal_dir):
+    def recover():
+        store = JournaledOrderStore(journal_dir, max_orders=OPEN_ORDERS)
+        store.journal.close()
+        atexit.unregister(store.close)
+        return store
+
+    store = benchmark.pedantic(recover, rounds=3, iterations=1)
+    assert len(store) == OPEN_ORDERS
@@ -0,0 +1,43 @@
+import logging
+import os
+
+import pytest
+
+from app import api
+from app.logger_config import setup_logging
+
+ORDER = {
+    "items": [
+        {"item": "starter", "quantity": 4},
+        {"item": "main", "quantity": 4},
+        {"item": "drink", "quantity": 4},
+    ],
+    "order_time": "18:30",
+}
+
+
+@pytest.fixture(params=[0, 10000], ids=["sync-logging", "queue-logging"])
+def client(request, tmp_path):
+    setup_logging(
+        level=logging.INFO,
+        log_to_file=True,
+        log_file_path=str(tmp_path / "flask-app.log"),
+        logger_name="flask-app",
+        queue_size=request.param,
+    )
+    yield api.app.test_client()
+    # Put back the logging app.api set up, in the configured log directory
+    api.log_queue_handler = setup_logging(
+        level=logging.INFO,
+        log_to_file=True,
+        log_file_path=os.path.join(api.app_config.log_dir, "flask-app.log"),
+        logger_name="flask-app",
+        queue_size=api.app_config.log_queue_size,
+        block_when_full=api.app_config.log_queue_policy == "block",
+    )
+
+
+def test_post_order_latency_by_logging_mode(benchmark, client):
+    """Compare the two ids to see the latency queue logging removes"""
+    response = benchmark(client.post, "/order", json=ORDER)
+    assert response.status_code == 200
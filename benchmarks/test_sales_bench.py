@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from app.sales_index import SalesIndex
+from config.config_loader import get_pricing_config
+from models.order_model import ItemType
+
+DAY = date(2024, 3, 1)
+
+
+@pytest.fixture(scope="module")
+def sales():
+    # A busy day: 100,000 orders, spread over the opening hours
+    index = SalesIndex()
+    config = get_pricing_config()
+    for order in range(100000):
+        minute = 11 * 60 + order % (12 * 60)
+        index.record(
+            DAY, config, [(ItemType.MAIN, minute, 2), (ItemType.DRINK, minute, 1)]
+        )
+    return index
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [(18 * 60, 19 * 60), (12 * 60, 18 * 60), (0, 24 * 60)],
+    ids=["one-hour", "six-hours", "whole-day"],
+)
+def test_sales_report(benchmark, sales, start, end):
+    benchmark(sales.report, DAY, start, end)
+
+
+def test_record_order_changes(benchmark):
+    index = SalesIndex()
+    config = get_pricing_config()
+    changes = [(ItemType.MAIN, 18 * 60, 2), (ItemType.DRINK, 18 * 60, 1)]
+    benchmark(index.record, DAY, config, changes)
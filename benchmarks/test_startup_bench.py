@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cumulative_import_us(module: str) -> int:
+    """Cumulative import time of a module reported by -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_api_cold_import(benchmark):
+    """Wall time of a fresh interpreter importing app.api, as a worker would"""
+    import_us = benchmark.pedantic(
+        cumulative_import_us, args=("app.api",), rounds=5, iterations=1
+    )
+    benchmark.extra_info["app_api_import_us"] = import_us
@@ -0,0 +1,107 @@
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    order_store: str = "memory"
+    order_store_path: str = "data/orders.sqlite3"
+    order_journal_dir: str = "data/journal"
+    journal_flush_seconds: float = 0.05
+    max_active_orders: int = 10000
+    order_ttl_seconds: Optional[float] = 12 * 60 * 60
+    log_queue_size: int = 0
+    log_queue_policy: str = "drop"
+    profile_sample_rate: float = 0.0
+    profile_slow_seconds: Optional[float] = None
+    profile_keep: int = 20
+    debug_endpoints: bool = False
+    json_provider: str = "auto"
+    preload: bool = False
+    log_dir: str = "logs"
+    # Directory of <venue_id>.yaml pricing configs; None serves only params.yaml
+    venue_config_dir: Optional[str] = None
+    # Seconds between checks of the venue files for changes; 0 disables
+    venue_poll_seconds: float = 5.0
+
+    @property
+    def profiling_enabled(self) -> bool:
+        return self.profile_sample_rate > 0 or self.profile_slow_seconds is not None
+
+
+def load_app_config(environ: Mapping[str, str] = None) -> AppConfig:
+    """Read deployment settings from RESTAURANT_* environment variables"""
+    if environ is None:
+        environ = os.environ
+    defaults = AppConfig()
+
+    order_store = environ.get("RESTAURANT_ORDER_STORE", defaults.order_store)
+    if order_store not in ("memory", "sqlite", "journal"):
+        raise ValueError(f"Unknown order store: {order_store}")
+
+    log_queue_policy = environ.get(
+        "RESTAURANT_LOG_QUEUE_POLICY", defaults.log_queue_policy
+    )
+    if log_queue_policy not in ("drop", "block"):
+        raise ValueError(f"Unknown log queue policy: {log_queue_policy}")
+
+    ttl = environ.get("RESTAURANT_ORDER_TTL_SECONDS")
+    slow_seconds = environ.get("RESTAURANT_PROFILE_SLOW_SECONDS")
+    try:
+        config = AppConfig(
+            order_store=order_store,
+            order_store_path=environ.get(
+                "RESTAURANT_ORDER_STORE_PATH", defaults.order_store_path
+            ),
+            order_journal_dir=environ.get(
+                "RESTAURANT_ORDER_JOURNAL_DIR", defaults.order_journal_dir
+            ),
+            journal_flush_seconds=float(
+                environ.get(
+                    "RESTAURANT_JOURNAL_FLUSH_SECONDS", defaults.journal_flush_seconds
+                )
+            ),
+            max_active_orders=int(
+                environ.get("RESTAURANT_MAX_ACTIVE_ORDERS", defaults.max_active_orders)
+            ),
+            order_ttl_seconds=(
+                defaults.order_ttl_seconds
+                if ttl is None
+                else (float(ttl) if float(ttl) > 0 else None)
+            ),
+            log_queue_size=int(
+                environ.get("RESTAURANT_LOG_QUEUE_SIZE", defaults.log_queue_size)
+            ),
+            log_queue_policy=log_queue_policy,
+            profile_sample_rate=float(
+                environ.get(
+                    "RESTAURANT_PROFILE_SAMPLE_RATE", defaults.profile_sample_rate
+                )
+            ),
+            profile_slow_seconds=(
+                float(slow_seconds) if slow_seconds else defaults.profile_slow_seconds
+            ),
+            profile_keep=int(
+                environ.get("RESTAURANT_PROFILE_KEEP", defaults.profile_keep)
+            ),
+            json_provider=environ.get(
+                "RESTAURANT_JSON_PROVIDER", defaults.json_provider
+            ),
+            debug_endpoints=environ.get("RESTAURANT_DEBUG_ENDPOINTS", "")
+            in ("1", "true", "yes"),
+            preload=environ.get("RESTAURANT_PRELOAD", "") in ("1", "true", "yes"),
+            log_dir=environ.get("RESTAURANT_LOG_DIR", defaults.log_dir),
+            venue_config_dir=environ.get("RESTAURANT_VENUE_CONFIG_DIR")
+            or defaults.venue_config_dir,
+            venue_poll_seconds=float(
+                environ.get(
+                    "RESTAURANT_VENUE_POLL_SECONDS", defaults.venue_poll_seconds
+                )
+            ),
+        )
+    except ValueError:
+        raise ValueError("Invalid numeric values in environment configuration")
+    if config.profile_keep <= 0:
+        raise ValueError("RESTAURANT_PROFILE_KEEP must be positive")
+    return config
@@ -1,7 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import time
 from typing import Dict
 
+from config.price_table import PriceTable, shared_price_table
 from models.order_model import ItemType
 
 
@@ -11,3 +12,10 @@ class PricingConfig:
     service_charge_rate: float
     drink_discount_rate: float
     discount_cutoff_time: time
+    version: int = 0
+    # Compiled when the config is created, or shared with an earlier config
+    # with the same prices; see config/price_table.py
+    price_table: PriceTable = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "price_table", shared_price_table(self))
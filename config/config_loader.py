@@ -1,18 +1,39 @@
 import os
-from datetime import datetime
-
-import yaml
+import threading
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
 
 from config.checkout_config import PricingConfig
+from config.price_table import BASIS_POINTS
 from models.order_model import ItemType
+from models.order_time import (
+    format_minute,
+    minute_to_time,
+    parse_minute,
+    time_to_minute,
+)
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "params.yaml"
+)
 
 
-def load_pricing_config(path: str = None) -> PricingConfig:
+def load_pricing_config(path: str = None, version: int = 0) -> PricingConfig:
+    # PyYAML is only needed when a config is read, not to import this module
+    import yaml
+
     if path is None:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(current_dir, "params.yaml")
+        path = DEFAULT_CONFIG_PATH
     with open(path, "r") as f:
-        data = yaml.safe_load(f)
+        # The libyaml parser, when PyYAML was built with it, is several times
+        # faster; that adds up when loading the configs of many venues
+        data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    return parse_pricing_config(data, version=version)
+
+
+def parse_pricing_config(data: Dict, version: int = 0) -> PricingConfig:
+    if not isinstance(data, dict):
+        raise ValueError("Pricing config must be a mapping")
     required_fields = [
         "item_prices",
         "service_charge_rate",
@@ -38,11 +59,109 @@ def load_pricing_config(path: str = None) -> PricingConfig:
     except ValueError:
         raise ValueError("Invalid numeric values in configuration")
 
+    # Totals are computed in whole cents and basis points; rounding a finer
+    # value at load would quietly change every price that uses it
+    for item_type, price in item_prices.items():
+        if (Decimal(repr(price)) * 100) % 1:
+            raise ValueError(
+                f"Price of {item_type.name} must be a whole number of cents, got {price}"
+            )
+    for name, rate in (
+        ("service_charge_rate", service_charge_rate),
+        ("drink_discount_rate", drink_discount_rate),
+    ):
+        if (Decimal(repr(rate)) * BASIS_POINTS) % 1:
+            raise ValueError(
+                f"{name} must be a whole number of basis points (0.0001), got {rate}"
+            )
+
     return PricingConfig(
         item_prices=item_prices,
         service_charge_rate=service_charge_rate,
         drink_discount_rate=drink_discount_rate,
-        discount_cutoff_time=datetime.strptime(
-            data["discount_cutoff_time"], "%H:%M"
-        ).time(),
+        discount_cutoff_time=minute_to_time(parse_minute(data["discount_cutoff_time"])),
+        version=version,
     )
+
+
+def pricing_config_to_dict(config: PricingConfig) -> Dict:
+    """Inverse of parse_pricing_config, used to persist orders with their prices"""
+    return {
+        "item_prices": {
+            item_type.name: price for item_type, price in config.item_prices.items()
+        },
+        "service_charge_rate": config.service_charge_rate,
+        "drink_discount_rate": config.drink_discount_rate,
+        "discount_cutoff_time": format_minute(
+            time_to_minute(config.discount_cutoff_time)
+        ),
+    }
+
+
+class PricingConfigCache:
+    """
+    Thread-safe, process-wide cache of a parsed pricing config file.
+
+    The file is only re-read when its mtime, size or inode changes, or when
+    reload() is called explicitly. Every successful load gets a new version
+    number; calculators keep a reference to the PricingConfig they were
+    created with, so existing orders stay priced with their original version.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CONFIG_PATH
+        self._lock = threading.Lock()
+        self._config: Optional[PricingConfig] = None
+        self._file_key: Optional[Tuple[int, int, int]] = None
+        self.hits = 0
+        self.reloads = 0
+
+    def _current_file_key(self) -> Tuple[int, int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _load(self, file_key: Tuple[int, int, int]) -> PricingConfig:
+        version = self._config.version + 1 if self._config else 1
+        self._config = load_pricing_config(self.path, version=version)
+        self._file_key = file_key
+        self.reloads += 1
+        return self._config
+
+    def get(self) -> PricingConfig:
+        """Return the cached config, re-reading the file if it has changed."""
+        file_key = self._current_file_key()
+        with self._lock:
+            if self._config is None or file_key != self._file_key:
+                return self._load(file_key)
+            self.hits += 1
+            return self._config
+
+    def reload(self) -> PricingConfig:
+        """Force a re-read of the config file regardless of its stat data."""
+        file_key = self._current_file_key()
+        with self._lock:
+            return self._load(file_key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "version": self._config.version if self._config else 0,
+            }
+
+
+_default_cache = PricingConfigCache()
+
+
+def get_pricing_config() -> PricingConfig:
+    """Return the shared pricing config, reloading it only if params.yaml changed."""
+    return _default_cache.get()
+
+
+def reload_pricing_config() -> PricingConfig:
+    return _default_cache.reload()
+
+
+def pricing_config_stats() -> Dict[str, int]:
+    return _default_cache.stats()
@@ -0,0 +1,223 @@
+"""
+Pricing config compiled into a lookup table.
+
+Every minute of the day maps to a time bucket, and every (item type, time
+bucket) pair to the effective unit price: discounts of the windows active in
+that bucket and, for food, the service charge are already applied. Pricing an
+order is then one multiplication per bucket with no branching on item
+classes or times.
+
+Money is fixed point. Prices are converted to whole cents and rates to basis
+points once, when the config is compiled; the effective unit prices are then
+exact integers in units of 1/amount_scale cents, so a total is an exact
+integer sum that is rounded to cents once, half up. The result is the same
+whichever order lines are added in and whether orders are priced one at a
+time, in batches or in columns.
+"""
+
+import math
+import threading
+import weakref
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
+
+from models.order_model import FOOD_ITEM_TYPES, ItemType
+from models.order_time import MINUTES_PER_DAY, time_to_minute
+
+if TYPE_CHECKING:
+    from config.checkout_config import PricingConfig
+
+# Orders without an order time, and minutes outside every discount window
+REGULAR_BUCKET = 0
+BASIS_POINTS = 10000
+
+PriceKey = Tuple[ItemType, int]
+
+
+def to_cents(price: float) -> int:
+    """Convert a price to whole cents, rounding half up"""
+    return int(
+        (Decimal(repr(price)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    )
+
+
+def to_basis_points(rate: float) -> int:
+    """Convert a rate such as 0.1 to basis points (1000), rounding half up"""
+    return int(
+        (Decimal(repr(rate)) * BASIS_POINTS).quantize(
+            Decimal(1), rounding=ROUND_HALF_UP
+        )
+    )
+
+
+def round_half_up(amount: int, scale: int) -> int:
+    """amount / scale rounded to the nearest integer, halves away from zero"""
+    quotient, remainder = divmod(amount, scale)
+    return quotient + (2 * remainder >= scale)
+
+
+@dataclass(frozen=True)
+class DiscountWindow:
+    """Discount rates per item type for orders placed in [start, end) minutes"""
+
+    start_minute: int
+    end_minute: int
+    rates: Mapping[ItemType, float]
+
+
+# Compared and hashed by identity, so a table can key caches of its prices
+@dataclass(frozen=True, eq=False)
+class PriceTable:
+    # Time bucket of each minute of the day
+    minute_buckets: Tuple[int, ...]
+    # Exact unit price that goes into the total, service charge included for
+    # food, in units of 1/amount_scale cents
+    unit_amounts: Dict[PriceKey, int]
+    amount_scale: int
+    # Every (item type, time bucket) pair, item type major
+    buckets: Tuple[PriceKey, ...]
+    bucket_count: int
+
+    def bucket_for_minute(self, minute: int) -> int:
+        return self.minute_buckets[minute]
+
+    def bucket_for(self, order_time: Optional[int]) -> int:
+        """Time bucket of an order time in minutes after midnight, or None"""
+        if order_time is None:
+            return REGULAR_BUCKET
+        return self.minute_buckets[order_time]
+
+    def to_cents(self, amount: int) -> int:
+        """Round a sum of unit amounts to whole cents"""
+        return round_half_up(amount, self.amount_scale)
+
+
+def discount_windows(config: "PricingConfig") -> List[DiscountWindow]:
+    """The time windows with discounted prices; early bird is the only one today"""
+    return [
+        DiscountWindow(
+            start_minute=0,
+            end_minute=time_to_minute(config.discount_cutoff_time),
+            rates={ItemType.DRINK: config.drink_discount_rate},
+        )
+    ]
+
+
+def compile_price_table(
+    config: "PricingConfig", windows: Optional[List[DiscountWindow]] = None
+) -> PriceTable:
+    """
+    Compile a pricing config into a PriceTable.
+
+    Minutes covered by the same set of discount windows share a time bucket,
+    so the number of buckets grows with the number of windows, not minutes.
+    Rates of overlapping windows compound.
+
+    Args:
+        config: Config to compile
+        windows: Discount windows to use instead of discount_windows(config)
+    """
+    if windows is None:
+        windows = discount_windows(config)
+    bucket_ids: Dict[Tuple[int, ...], int] = {(): REGULAR_BUCKET}
+    minute_buckets = []
+    for minute in range(MINUTES_PER_DAY):
+        active = tuple(
+            index
+            for index, window in enumerate(windows)
+            if window.start_minute <= minute < window.end_minute
+        )
+        minute_buckets.append(bucket_ids.setdefault(active, len(bucket_ids)))
+
+    item_cents = {
+        item_type: to_cents(price) for item_type, price in config.item_prices.items()
+    }
+    window_rates = [
+        {item_type: to_basis_points(rate) for item_type, rate in window.rates.items()}
+        for window in windows
+    ]
+    service_rate = to_basis_points(config.service_charge_rate)
+
+    unit_amounts: Dict[PriceKey, int] = {}
+    for active, bucket in bucket_ids.items():
+        for item_type in config.item_prices:
+            # One basis point factor per window, active or not, and one for
+            # the service charge, so every amount has the same scale
+            amount = item_cents[item_type]
+            for index, rates in enumerate(window_rates):
+                discount = rates.get(item_type, 0) if index in active else 0
+                amount *= BASIS_POINTS - discount
+            if item_type in FOOD_ITEM_TYPES:
+                amount *= BASIS_POINTS + service_rate
+            else:
+                amount *= BASIS_POINTS
+            unit_amounts[(item_type, bucket)] = amount
+
+    # Keep the integers small (int64 friendly for columnar pricing) by
+    # dividing out the factors all amounts share with the scale
+    amount_scale = BASIS_POINTS ** (len(windows) + 1)
+    divisor = math.gcd(amount_scale, *unit_amounts.values())
+    amount_scale //= divisor
+
+    return PriceTable(
+        minute_buckets=tuple(minute_buckets),
+        unit_amounts={key: amount // divisor for key, amount in unit_amounts.items()},
+        amount_scale=amount_scale,
+        buckets=tuple(
+            (item_type, bucket)
+            for item_type in ItemType
+            for bucket in range(len(bucket_ids))
+        ),
+        bucket_count=len(bucket_ids),
+    )
+
+
+# Tables of the configs alive in the process, keyed by everything that goes
+# into a table, so configs with the same prices (many venues on one menu, or
+# the same config parsed again) share one table instead of compiling their own
+_shared_tables: "weakref.WeakValueDictionary[Tuple, PriceTable]" = (
+    weakref.WeakValueDictionary()
+)
+_shared_tables_lock = threading.Lock()
+
+
+def price_table_key(config: "PricingConfig", windows: List[DiscountWindow]) -> Tuple:
+    return (
+        tuple(
+            sorted(
+                (item_type.value, price)
+                for item_type, price in config.item_prices.items()
+            )
+        ),
+        config.service_charge_rate,
+        tuple(
+            (
+                window.start_minute,
+                window.end_minute,
+                tuple(
+                    sorted(
+                        (item_type.value, rate)
+                        for item_type, rate in window.rates.items()
+                    )
+                ),
+            )
+            for window in windows
+        ),
+    )
+
+
+def shared_price_table(config: "PricingConfig") -> PriceTable:
+    """The compiled table for a config, shared with configs that price the same"""
+    windows = discount_windows(config)
+    key = price_table_key(config, windows)
+    with _shared_tables_lock:
+        table = _shared_tables.get(key)
+        if table is None:
+            table = compile_price_table(config, windows)
+            _shared_tables[key] = table
+        return table
+
+
+def shared_price_table_count() -> int:
+    return len(_shared_tables)
@@ -0,0 +1,233 @@
+"""
+Pricing configs of many venues served by one deployment.
+
+Each venue has its own YAML file in a directory, named <venue_id>.yaml and
+in the same format as params.yaml. All files are parsed when the registry is
+loaded at startup, and a lookup is a dict read with no file I/O.
+
+Changed and added files are picked up by refresh(), which re-reads every file
+whose mtime, size or inode changed. start_polling() calls it from a
+background thread in each process, restarted in processes forked from it,
+so every gunicorn worker picks up an edited file without a request reaching
+it. reload() re-reads one venue at once. A config's version is its file's
+mtime in nanoseconds, the same in every process that loaded the same file.
+
+Venues with the same prices share one compiled PriceTable (see
+shared_price_table in config/price_table.py), so the memory per venue is
+the small PricingConfig itself.
+"""
+
+import logging
+import os
+import re
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+from config.checkout_config import PricingConfig
+from config.config_loader import load_pricing_config
+from config.price_table import shared_price_table_count
+
+VENUE_FILE = re.compile(r"^(?P<venue_id>[A-Za-z0-9_-]+)\.ya?ml$")
+VENUE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+logger = logging.getLogger(__name__)
+
+# Registries polling their directory, restarted in forked children
+_polling: "weakref.WeakSet[VenueRegistry]" = weakref.WeakSet()
+
+
+def file_key(path: str) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class VenueRegistry:
+    """Thread-safe map of venue id to PricingConfig, loaded from a directory"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        # Written under _lock; lookups are plain dict reads and take no lock
+        self._configs: Dict[str, PricingConfig] = {}
+        self._paths: Dict[str, str] = {}
+        # Stat data of each file when it was last read, including files that
+        # turned out invalid, so they are not parsed again on every refresh
+        self._file_keys: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.poll_interval: Optional[float] = None
+        self._stop_polling: Optional[threading.Event] = None
+
+    def _venue_files(self) -> Dict[str, str]:
+        files = {}
+        for name in sorted(os.listdir(self.directory)):
+            match = VENUE_FILE.match(name)
+            if match:
+                venue_id = match.group("venue_id")
+                if venue_id in files:
+                    raise ValueError(f"Venue {venue_id} has more than one config file")
+                files[venue_id] = os.path.join(self.directory, name)
+        return files
+
+    def _find_file(self, venue_id: str) -> Optional[str]:
+        if self.directory is None or not VENUE_ID.match(venue_id):
+            return None
+        paths = [
+            os.path.join(self.directory, venue_id + extension)
+            for extension in (".yaml", ".yml")
+        ]
+        found = [path for path in paths if os.path.exists(path)]
+        if len(found) > 1:
+            raise ValueError(f"Venue {venue_id} has more than one config file")
+        return found[0] if found else None
+
+    def _load(self, venue_id: str, path: str) -> PricingConfig:
+        """Read a venue file and store its config; call with _lock held"""
+        # Stat before reading: a write in between is seen on the next lookup
+        key = file_key(path)
+        self._file_keys[venue_id] = key
+        self._paths[venue_id] = path
+        try:
+            config = load_pricing_config(path, version=key[0])
+        except ValueError as e:
+            raise ValueError(f"Invalid pricing config {path}: {e}") from e
+        self._configs[venue_id] = config
+        self.reloads += 1
+        return config
+
+    def load_all(self) -> int:
+        """
+        Parse every venue file in the directory, replacing all venues.
+
+        Nothing is replaced if any file is invalid.
+
+        Returns:
+            The number of venues loaded
+        """
+        if self.directory is None:
+            return 0
+        paths = self._venue_files()
+        with self._lock:
+            configs, self._configs = self._configs, {}
+            file_keys, self._file_keys = self._file_keys, {}
+            try:
+                for venue_id, path in paths.items():
+                    self._load(venue_id, path)
+            except Exception:
+                self._configs, self._file_keys = configs, file_keys
+                raise
+            self._paths = paths
+        return len(paths)
+
+    def get(self, venue_id: str) -> PricingConfig:
+        """
+        The pricing config of a venue, as of the last load or refresh.
+
+        Raises:
+            ValueError: If the venue is unknown
+        """
+        config = self._configs.get(venue_id) if isinstance(venue_id, str) else None
+        if config is None:
+            raise ValueError(f"Unknown venue: {venue_id!r}")
+        return config
+
+    def refresh(self) -> int:
+        """
+        Re-read the venue files that changed on disk since they were last read
+        and load those added since. An invalid file is logged and its venue
+        keeps its config; a removed file keeps it too.
+
+        Returns:
+            The number of venues loaded
+        """
+        if self.directory is None:
+            return 0
+        loaded = 0
+        for venue_id, path in self._venue_files().items():
+            try:
+                key = file_key(path)
+            except OSError:
+                continue
+            if key == self._file_keys.get(venue_id):
+                continue
+            with self._lock:
+                try:
+                    self._load(venue_id, path)
+                    loaded += 1
+                except (OSError, ValueError) as e:
+                    logger.warning("Keeping the pricing config of %s: %s", venue_id, e)
+        return loaded
+
+    def start_polling(self, interval: float) -> None:
+        """Call refresh() every interval seconds from a background thread"""
+        if interval <= 0:
+            raise ValueError("The venue poll interval must be positive")
+        self.stop_polling()
+        self.poll_interval = interval
+        _polling.add(self)
+        self._start_poller()
+
+    def stop_polling(self) -> None:
+        _polling.discard(self)
+        if self._stop_polling is not None:
+            self._stop_polling.set()
+            self._stop_polling = None
+
+    def _start_poller(self) -> None:
+        self._stop_polling = threading.Event()
+        threading.Thread(
+            target=self._poll,
+            args=(self._stop_polling,),
+            name="venue-config-poll",
+            daemon=True,
+        ).start()
+
+    def _poll(self, stop: threading.Event) -> None:
+        while not stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception(
+                    "Refreshing venue configs from %s failed", self.directory
+                )
+
+    def reload(self, venue_id: str) -> PricingConfig:
+        """
+        Re-read the config file of one venue. A file added since startup
+        adds the venue; other venues are not touched.
+
+        Raises:
+            LookupError: If the venue has no config file
+            ValueError: If the file is invalid; the venue keeps its config
+        """
+        if self.directory is None:
+            raise LookupError("No venue config directory is configured")
+        path = self._paths.get(venue_id) or self._find_file(venue_id)
+        if path is None or not os.path.exists(path):
+            raise LookupError(f"No config file for venue {venue_id!r}")
+        with self._lock:
+            return self._load(venue_id, path)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def __contains__(self, venue_id: str) -> bool:
+        return venue_id in self._configs
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "venues": len(self._configs),
+            "reloads": self.reloads,
+            "price_tables": shared_price_table_count(),
+        }
+
+
+def _restart_polling_after_fork() -> None:
+    # Only the forking thread survives in the child, and the registry lock may
+    # have been held by a poller thread that no longer exists
+    for registry in list(_polling):
+        registry._lock = threading.Lock()
+        registry._start_poller()
+
+
+os.register_at_fork(after_in_child=_restart_polling_after_fork)
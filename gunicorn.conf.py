@@ -0,0 +1,36 @@
+"""
+gunicorn settings for the Flask app:
+
+    gunicorn -c gunicorn.conf.py app.api:app
+
+The app is imported once in the master process with the pricing config
+already parsed and validated, then workers are forked from it and share
+that warm state copy-on-write.
+
+WEB_CONCURRENCY sets the number of workers (default: one per CPU). Open
+orders are kept in the SQLite store so any worker can serve any order;
+point RESTAURANT_ORDER_STORE_PATH at a tmpfs such as /dev/shm to keep
+that shared state in memory.
+"""
+
+import gc
+import os
+
+os.environ.setdefault("RESTAURANT_PRELOAD", "1")
+os.environ.setdefault("RESTAURANT_ORDER_STORE", "sqlite")
+
+bind = os.environ.get("RESTAURANT_BIND", "127.0.0.1:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+preload_app = True
+
+if workers > 1 and os.environ["RESTAURANT_ORDER_STORE"] in ("memory", "journal"):
+    raise SystemExit(
+        f"RESTAURANT_ORDER_STORE={os.environ['RESTAURANT_ORDER_STORE']} cannot be"
+        " shared between gunicorn workers; use sqlite or WEB_CONCURRENCY=1"
+    )
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not touch (and copy) the shared pages
+    gc.freeze()
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 from typing import Optional
 
+from models.order_time import format_minute
+
 
 class ItemType(Enum):
     STARTER = "starter"
@@ -10,21 +11,25 @@ class ItemType(Enum):
     DRINK = "drink"
 
 
+FOOD_ITEM_TYPES = frozenset((ItemType.STARTER, ItemType.MAIN))
+
+
 @dataclass
 class OrderItem:
+    __slots__ = ("item_type", "quantity", "order_time")
+
     item_type: ItemType
     quantity: int
-    order_time: Optional[datetime]
+    # Minutes after midnight, see models/order_time.py
+    order_time: Optional[int]
 
     @property
     def is_food(self) -> bool:
-        return self.item_type in (ItemType.STARTER, ItemType.MAIN)
+        return self.item_type in FOOD_ITEM_TYPES
 
     def to_dict(self):
         return {
             "item": self.item_type.value,
             "quantity": self.quantity,
-            "order_time": (
-                self.order_time.strftime("%H:%M") if self.order_time else None
-            ),
+            "order_time": format_minute(self.order_time),
         }
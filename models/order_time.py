@@ -0,0 +1,45 @@
+"""
+Order times as minutes after midnight.
+
+There are only 1440 valid HH:MM values, so the parser and formatter are
+table lookups instead of strptime/strftime calls.
+"""
+
+from datetime import datetime, time
+from typing import Optional
+
+MINUTES_PER_DAY = 24 * 60
+TIME_FORMAT = "%H:%M"
+
+_FORMATTED = tuple(
+    f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(MINUTES_PER_DAY)
+)
+_PARSED = {text: minute for minute, text in enumerate(_FORMATTED)}
+
+
+def parse_minute(value: str) -> int:
+    """
+    Parse an HH:MM string into minutes after midnight.
+
+    Raises ValueError or TypeError like datetime.strptime for invalid values.
+    Non-padded forms such as "9:05", which strptime also accepts, are
+    rare and take the slow path.
+    """
+    minute = _PARSED.get(value)
+    if minute is None:
+        parsed = datetime.strptime(value, TIME_FORMAT)
+        minute = parsed.hour * 60 + parsed.minute
+    return minute
+
+
+def format_minute(minute: Optional[int]) -> Optional[str]:
+    """Format minutes after midnight as HH:MM; None stays None"""
+    return None if minute is None else _FORMATTED[minute]
+
+
+def minute_to_time(minute: int) -> time:
+    return time(minute // 60, minute % 60)
+
+
+def time_to_minute(value: time) -> int:
+    return value.hour * 60 + value.minute
@@ -1,20 +1,27 @@
 import logging
 import os
+import tempfile
 
 import pytest
 import responses
 
 from app.logger_config import setup_logging
+from app.order_service import OrderService
+from app.order_store import InMemoryOrderStore, SQLiteOrderStore
+from config.venue_registry import VenueRegistry
 
 
 def pytest_configure(config):
-    logs_dir = "logs/tests"
-    os.makedirs(logs_dir, exist_ok=True)
+    # Runs before test modules are collected, so apps imported by the tests
+    # (app.api, app.asgi) also log into this directory instead of logs/
+    logs_dir = os.environ.setdefault(
+        "RESTAURANT_LOG_DIR", tempfile.mkdtemp(prefix="restaurant-test-logs-")
+    )
     worker_id = getattr(config, "workerinput", {}).get("workerid", "master")
     setup_logging(
         level=logging.INFO,
         log_to_file=True,
-        log_file_path=f"logs/tests/test_log_{worker_id}.log",
+        log_file_path=os.path.join(logs_dir, f"test_log_{worker_id}.log"),
         logger_name="bdd-tests",
     )
 
@@ -29,6 +36,35 @@ def log_test_start_and_end():
     logger.info("Finished pytest-bdd test session")
 
 
+@pytest.fixture(params=["memory", "sqlite"])
+def order_store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteOrderStore(str(tmp_path / "orders.sqlite3"))
+    return InMemoryOrderStore()
+
+
+@pytest.fixture
+def venues():
+    return VenueRegistry()
+
+
+@pytest.fixture
+def service(order_store, venues):
+    return OrderService(order_store, venues=venues)
+
+
+@pytest.fixture
+def client(service, venues, monkeypatch):
+    """Test client of the Flask app, serving from the service fixture"""
+    # Imported here: the app configures logging on import, which must only
+    # happen after pytest_configure has chosen the log directory
+    import app.api
+
+    monkeypatch.setattr(app.api, "order_service", service)
+    monkeypatch.setattr(app.api, "venue_registry", venues)
+    return app.api.app.test_client()
+
+
 @pytest.fixture
 def context():
     return {}
@@ -0,0 +1,10 @@
+Feature: Batch order pricing
+
+  Scenario: A batch of orders is priced with per-order errors
+    Given a batch with an order of 4 "starter" at "18:00"
+    And a batch with an order of 4 "drink" at "18:00"
+    And a batch with an order of 1 "dessert" at "18:00"
+    When the batch is submitted
+    Then the batch result 1 should have total 17.6
+    And the batch result 2 should have total 7
+    And the batch result 3 should be an error mentioning "dessert"
@@ -0,0 +1,45 @@
+import logging
+
+import requests
+from pytest_bdd import given, parsers, then, when
+
+from tests.utils.test_utils import check_response
+
+BASE_URL = "http://localhost:5000"
+logger = logging.getLogger("bdd-tests")
+
+
+@given(
+    parsers.parse('a batch with an order of {quantity:d} "{item}" at "{order_time}"')
+)
+def add_batch_order(context, quantity, item, order_time):
+    context.setdefault("batch", []).append(
+        {"items": [{"item": item, "quantity": quantity}], "order_time": order_time}
+    )
+
+
+@when("the batch is submitted")
+def submit_batch(context):
+    response = requests.post(
+        f"{BASE_URL}/orders/batch", json={"orders": context["batch"]}
+    )
+    check_response(response, "Batch pricing")
+    context["batch_results"] = response.json()["results"]
+    logger.info(f"Submitted batch of {len(context['batch'])} orders")
+
+
+@then(parsers.parse("the batch result {position:d} should have total {total:g}"))
+def check_batch_total(context, position, total):
+    result = context["batch_results"][position - 1]
+    assert round(result["total"], 2) == round(total, 2)
+
+
+@then(
+    parsers.parse(
+        'the batch result {position:d} should be an error mentioning "{message}"'
+    )
+)
+def check_batch_error(context, position, message):
+    result = context["batch_results"][position - 1]
+    assert result["status"] == "error"
+    assert message in result["error"]["error_message"]
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.asgi import create_asgi_app
+from app.order_store import InMemoryOrderStore, SQLiteOrderStore
+from tests.utils.test_utils import call
+
+
+def test_asgi_order_lifecycle():
+    app = create_asgi_app(InMemoryOrderStore())
+
+    async def scenario():
+        status, order = await call(
+            app,
+            "POST",
+            "/order",
+            {
+                "items": [
+                    {"item": "main", "quantity": 2},
+                    {"item": "drink", "quantity": 2},
+                ],
+                "order_time": "18:45",
+            },
+        )
+        assert status == 200
+        order_id = order["order_id"]
+        await call(
+            app,
+            "POST",
+            f"/orders/{order_id}/add",
+            {"items": [{"item": "main", "quantity": 2}], "order_time": "20:00"},
+        )
+        await call(
+            app,
+            "POST",
+            f"/orders/{order_id}/cancel",
+            {"items": [{"item": "drink", "quantity": 1}]},
+        )
+        return await call(app, "GET", f"/orders/{order_id}")
+
+    status, order = asyncio.run(scenario())
+    assert status == 200
+    assert order["total"] == 32.55
+
+
+def test_asgi_reports_errors_like_flask_app():
+    app = create_asgi_app(InMemoryOrderStore())
+
+    status, response = asyncio.run(call(app, "POST", "/order", {"items": "nope"}))
+
+    assert status == 400
+    assert response["error"]["error_message"] == "Items must be a list"
+
+
+def test_concurrent_adds_to_one_order_are_not_lost(tmp_path):
+    app = create_asgi_app(SQLiteOrderStore(str(tmp_path / "orders.sqlite3")))
+
+    async def scenario():
+        _, order = await call(app, "POST", "/order", {"items": []})
+        add = {"items": [{"item": "main", "quantity": 1}]}
+        await asyncio.gather(
+            *(
+                call(app, "POST", f"/orders/{order['order_id']}/add", add)
+                for _ in range(20)
+            )
+        )
+        return await call(app, "GET", f"/orders/{order['order_id']}")
+
+    _, order = asyncio.run(scenario())
+    assert order["items"] == [{"item": "main", "quantity": 20, "order_time": None}]
@@ -0,0 +1,10 @@
+from pytest_bdd import scenario
+from tests.steps.test_batch_pricing_steps import *
+
+
+@scenario(
+    "features/test_batch_pricing.feature",
+    "A batch of orders is priced with per-order errors",
+)
+def test_batch_pricing_with_errors():
+    pass
@@ -0,0 +1,192 @@
+from datetime import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from app.checkout_calculator import CheckoutCalculator
+from config.checkout_config import PricingConfig
+from config.config_loader import parse_pricing_config
+from models.order_model import ItemType
+
+item_lines = st.lists(
+    st.fixed_dictionaries(
+        {
+            "item": st.sampled_from([item.value for item in ItemType]),
+            "quantity": st.integers(min_value=1, max_value=20),
+        }
+    ),
+    max_size=6,
+)
+order_times = st.one_of(
+    st.none(),
+    st.builds(
+        "{:02d}:{:02d}".format,
+        st.integers(min_value=0, max_value=23),
+        st.integers(min_value=0, max_value=59),
+    ),
+)
+operations = st.lists(
+    st.one_of(
+        st.tuples(st.just("add"), item_lines, order_times),
+        st.tuples(st.just("cancel"), item_lines, st.none()),
+    ),
+    max_size=25,
+)
+
+
+pricing_configs = st.fixed_dictionaries(
+    {
+        "item_prices": st.fixed_dictionaries(
+            {
+                item.name: st.integers(min_value=1, max_value=99999).map(
+                    lambda cents: cents / 100
+                )
+                for item in ItemType
+            }
+        ),
+        "service_charge_rate": st.integers(min_value=0, max_value=10000).map(
+            lambda basis_points: basis_points / 10000
+        ),
+        "drink_discount_rate": st.integers(min_value=0, max_value=10000).map(
+            lambda basis_points: basis_points / 10000
+        ),
+        "discount_cutoff_time": order_times.filter(bool),
+    }
+)
+
+
+def recompute_total(calculator: CheckoutCalculator, config: Dict) -> float:
+    """
+    Full recomputation over every order line in Decimal, from the config
+    values as written, independent of the compiled price table
+    """
+    hours, minutes = config["discount_cutoff_time"].split(":")
+    cutoff = int(hours) * 60 + int(minutes)
+    food_total = drink_total = Decimal(0)
+    for item in calculator.order_items:
+        unit = Decimal(str(config["item_prices"][item.item_type.name]))
+        if item.is_food:
+            food_total += unit * item.quantity
+            continue
+        if item.order_time is not None and item.order_time < cutoff:
+            unit *= 1 - Decimal(str(config["drink_discount_rate"]))
+        drink_total += unit * item.quantity
+    service_charge = food_total * Decimal(str(config["service_charge_rate"]))
+    total = (food_total + service_charge + drink_total).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+    return float(total)
+
+
+@settings(max_examples=200, deadline=None)
+@given(
+    config=pricing_configs, initial=item_lines, order_time=order_times, ops=operations
+)
+def test_running_total_matches_full_recomputation(config, initial, order_time, ops):
+    calculator = CheckoutCalculator(initial, order_time, parse_pricing_config(config))
+    assert calculator.calculate_total() == recompute_total(calculator, config)
+
+    for action, items, op_time in ops:
+        if action == "add":
+            calculator.add_items(items, op_time)
+        else:
+            try:
+                calculator.cancel_items(items)
+            except ValueError:
+                pass
+        assert calculator.calculate_total() == recompute_total(calculator, config)
+
+
+def test_recomputation_rounds_half_up_like_the_total():
+    config = {
+        "item_prices": {"STARTER": 4.0, "MAIN": 7.0, "DRINK": 0.05},
+        "service_charge_rate": 0.15,
+        "drink_discount_rate": 0.3,
+        "discount_cutoff_time": "19:00",
+    }
+    calculator = CheckoutCalculator(
+        [{"item": "drink", "quantity": 1}], "18:00", parse_pricing_config(config)
+    )
+
+    # 0.035 exactly; float round() gives 0.03
+    assert calculator.calculate_total() == recompute_total(calculator, config) == 0.04
+
+
+def test_add_rounds_at_same_time_share_a_line():
+    calculator = CheckoutCalculator([{"item": "main", "quantity": 2}], "18:00")
+    calculator.add_items([{"item": "main", "quantity": 1}], "18:00")
+    calculator.add_items([{"item": "main", "quantity": 1}], "20:00")
+
+    assert [item.to_dict() for item in calculator.order_items] == [
+        {"item": "main", "quantity": 3, "order_time": "18:00"},
+        {"item": "main", "quantity": 1, "order_time": "20:00"},
+    ]
+
+
+def test_cancel_takes_latest_lines_first():
+    calculator = CheckoutCalculator([{"item": "drink", "quantity": 2}], "18:00")
+    calculator.add_items([{"item": "drink", "quantity": 2}], "20:00")
+
+    calculator.cancel_items([{"item": "drink", "quantity": 3}])
+
+    assert [item.to_dict() for item in calculator.order_items] == [
+        {"item": "drink", "quantity": 1, "order_time": "18:00"},
+    ]
+    assert calculator.calculate_total() == 1.75
+
+
+def test_price_many_reports_errors_per_order():
+    results = CheckoutCalculator.price_many(
+        [
+            ([{"item": "main", "quantity": 1}], None),
+            ([{"item": "main", "quantity": 1}], "25:00"),
+            ([{"item": "drink", "quantity": 2}], "18:00"),
+        ]
+    )
+
+    assert results[0] == 7.7
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 3.5
+
+
+@settings(max_examples=200, deadline=None)
+@given(
+    prices=st.lists(st.integers(min_value=1, max_value=99999), min_size=3, max_size=3),
+    service_bp=st.integers(min_value=0, max_value=10000),
+    discount_bp=st.integers(min_value=0, max_value=10000),
+    lines=st.lists(
+        st.tuples(
+            st.sampled_from(list(ItemType)),
+            st.integers(min_value=1, max_value=50),
+            st.booleans(),
+        ),
+        max_size=8,
+    ),
+)
+def test_total_matches_exact_decimal_arithmetic(prices, service_bp, discount_bp, lines):
+    cents = dict(zip(ItemType, prices))
+    config = PricingConfig(
+        item_prices={item: cents[item] / 100 for item in ItemType},
+        service_charge_rate=service_bp / 10000,
+        drink_discount_rate=discount_bp / 10000,
+        discount_cutoff_time=time(19, 0),
+    )
+    calculator = CheckoutCalculator([], pricing_config=config)
+    expected = Decimal(0)
+    for item_type, quantity, early_bird in lines:
+        calculator.add_items(
+            [{"item": item_type.value, "quantity": quantity}],
+            "18:00" if early_bird else "20:00",
+        )
+        unit = Decimal(cents[item_type]) / 100
+        if item_type == ItemType.DRINK and early_bird:
+            unit *= 1 - Decimal(discount_bp) / 10000
+        if item_type != ItemType.DRINK:
+            unit *= 1 + Decimal(service_bp) / 10000
+        expected += unit * quantity
+
+    assert calculator.calculate_total_cents() == int(
+        (expected * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    )
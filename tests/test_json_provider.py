@@ -0,0 +1,43 @@
+import json
+
+from flask import Flask, jsonify
+
+from app.checkout_calculator import CheckoutCalculator
+from app.json_provider import install_json_provider
+
+
+def test_orjson_provider_matches_stdlib_output():
+    payload = {"total": 58.4, "order_id": "a", "items": [{"quantity": 4, "item": "x"}]}
+    bodies = []
+    for provider in ("stdlib", "orjson"):
+        app = Flask(__name__)
+        install_json_provider(app, provider)
+        with app.app_context():
+            bodies.append(jsonify(payload).get_data())
+
+    assert bodies[0] == bodies[1]
+    assert json.loads(bodies[1]) == payload
+
+
+def test_orjson_provider_falls_back_for_big_integers():
+    app = Flask(__name__)
+    install_json_provider(app, "orjson")
+    with app.app_context():
+        response = jsonify({"quantity": 10**30})
+        assert json.loads(response.get_data()) == {"quantity": 10**30}
+        assert app.json.dumps([10**30]) == "[1000000000000000000000000000000]"
+
+
+def test_items_payload_is_cached_until_the_order_changes():
+    calculator = CheckoutCalculator([{"item": "main", "quantity": 1}], "18:00")
+    payload = calculator.items_payload()
+    assert calculator.items_payload() is payload
+
+    calculator.add_items([{"item": "drink", "quantity": 1}], "18:00")
+
+    assert calculator.items_payload() is not payload
+    assert calculator.items_payload()[-1] == {
+        "item": "drink",
+        "quantity": 1,
+        "order_time": "18:00",
+    }
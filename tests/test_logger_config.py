@@ -0,0 +1,81 @@
+import logging
+import os
+import queue
+
+from app.logger_config import BoundedQueueHandler, setup_logging
+
+
+def make_record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_full_queue_drops_and_counts_records():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+
+    handler.emit(make_record("kept"))
+    handler.emit(make_record("dropped"))
+
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "kept"
+
+
+def test_records_are_queued_unformatted():
+    handler = BoundedQueueHandler(queue.Queue())
+    handler.setFormatter(logging.Formatter("formatted: %(message)s"))
+    record = logging.LogRecord(
+        "test", logging.INFO, __file__, 1, "Order %s created", ("abc",), None
+    )
+
+    handler.emit(record)
+
+    queued = handler.queue.get_nowait()
+    assert queued is record
+    assert queued.msg == "Order %s created" and queued.args == ("abc",)
+
+
+def test_queue_logging_writes_from_background_thread(tmp_path):
+    log_file = tmp_path / "app.log"
+    handler = setup_logging(
+        log_to_file=True,
+        log_file_path=str(log_file),
+        logger_name="queue-logging-test",
+        queue_size=100,
+    )
+    logging.getLogger("queue-logging-test").info("Order %s created", "abc")
+
+    # Reconfiguring stops the listener, which flushes the queue
+    setup_logging(logger_name="queue-logging-test")
+
+    assert handler.dropped == 0
+    assert "Order abc created" in log_file.read_text()
+
+
+def test_log_directory_is_created_on_first_record(tmp_path):
+    log_file = tmp_path / "logs" / "app.log"
+    setup_logging(
+        log_to_file=True, log_file_path=str(log_file), logger_name="lazy-dir-test"
+    )
+    assert not log_file.parent.exists()
+
+    logging.getLogger("lazy-dir-test").info("first record")
+    assert "first record" in log_file.read_text()
+
+
+def test_queue_logging_keeps_working_in_forked_child(tmp_path):
+    log_file = tmp_path / "child.log"
+    setup_logging(
+        log_to_file=True,
+        log_file_path=str(log_file),
+        logger_name="fork-logging-test",
+        queue_size=100,
+    )
+
+    pid = os.fork()
+    if pid == 0:
+        logging.getLogger("fork-logging-test").info("logged by child")
+        setup_logging(logger_name="fork-logging-test")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    setup_logging(logger_name="fork-logging-test")
+
+    assert "logged by child" in log_file.read_text()
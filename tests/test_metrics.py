@@ -0,0 +1,49 @@
+from app.api import app
+from app.metrics import Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, "/order")
+    histogram.observe(0.5, "/order")
+    histogram.observe(5, "/order")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/order",le="0.1"} 1',
+        'latency_seconds_bucket{route="/order",le="1"} 2',
+        'latency_seconds_bucket{route="/order",le="+Inf"} 3',
+        'latency_seconds_sum{route="/order"} 5.55',
+        'latency_seconds_count{route="/order"} 3',
+    ]
+
+
+def test_metrics_endpoint_reports_routes_stages_and_errors():
+    client = app.test_client()
+    client.post("/order", json={"items": [{"item": "main", "quantity": 1}]})
+    client.post("/order", json={"items": "not a list"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{method="POST",route="/order",status="200"}' in body
+    assert 'http_errors_total{status="400",error_type="ValueError"}' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/order"}' in body
+    for stage in ("json_parse", "validation", "config_load", "total_calculation"):
+        assert f'checkout_stage_seconds_count{{stage="{stage}"}}' in body
+    assert "active_orders " in body
+    assert "order_store_evictions " in body
+    assert "order_store_expirations " in body
+    assert "log_records_dropped " in body
+
+
+def test_order_store_gauges_report_missing_counters_as_zero(client, service):
+    # SQLite stores never evict, so their stats have no "evictions" entry
+    service.create_order({"items": [{"item": "main", "quantity": 1}]})
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    stats = service.store.stats()
+    assert f"order_store_evictions {stats.get('evictions', 0)}" in body
+    assert f"order_store_expirations {stats['expirations']}" in body
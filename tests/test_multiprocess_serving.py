@@ -0,0 +1,147 @@
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.load_test import run_load_test
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("gunicorn") is None, reason="gunicorn is not installed"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, payload=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request(
+            method,
+            path,
+            body=json.dumps(payload) if payload is not None else None,
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def start_server(tmp_path, workers):
+    port = free_port()
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        RESTAURANT_BIND=f"127.0.0.1:{port}",
+        RESTAURANT_ORDER_STORE="sqlite",
+        RESTAURANT_ORDER_STORE_PATH=str(tmp_path / f"orders-{workers}.sqlite3"),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.api:app"],
+        cwd=PACKAGE_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server, port
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                server.kill()
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.1)
+
+
+@pytest.fixture
+def servers(tmp_path):
+    started = []
+
+    def start(workers):
+        server, port = start_server(tmp_path, workers)
+        started.append(server)
+        return port
+
+    start.started = started
+
+    yield start
+    for server in started:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def test_workers_share_orders_without_lost_updates(servers):
+    port = servers(2)
+    status, order = request(port, "POST", "/order", {"items": []})
+    assert status == 200
+    order_id = order["order_id"]
+
+    def add(_):
+        return request(
+            port,
+            "POST",
+            f"/orders/{order_id}/add",
+            {"items": [{"item": "main", "quantity": 1}], "order_time": "20:00"},
+        )[0]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(add, range(40))) == {200}
+
+    _, order = request(port, "GET", f"/orders/{order_id}")
+    assert order["items"] == [{"item": "main", "quantity": 40, "order_time": "20:00"}]
+    assert order["version"] == 41
+
+
+def test_every_worker_reports_all_sales_across_restarts(servers):
+    port = servers(2)
+    items = [{"item": "drink", "quantity": 2}, {"item": "main", "quantity": 1}]
+
+    def place(_):
+        return request(port, "POST", "/order", {"items": items, "order_time": "18:30"})[
+            0
+        ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(place, range(20))) == {200}
+
+    def drinks(port):
+        status, report = request(port, "GET", "/reports/sales?from=18:00&to=19:00")
+        assert status == 200
+        return report["items"]["drink"]
+
+    # Successive requests land on either worker
+    expected = {"quantity": 40, "revenue": 70.0}
+    assert all(drinks(port) == expected for _ in range(10))
+
+    servers.started[0].terminate()
+    servers.started[0].wait(timeout=30)
+    assert drinks(servers(2)) == expected
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs at least 2 CPUs")
+def test_throughput_scales_with_workers(servers):
+    workers = min(os.cpu_count(), 4)
+    single = run_load_test(f"http://127.0.0.1:{servers(1)}", clients=16, duration=5)
+    multi = run_load_test(
+        f"http://127.0.0.1:{servers(workers)}", clients=16, duration=5
+    )
+
+    assert single["errors"] == multi["errors"] == 0
+    speedup = multi["requests_per_second"] / single["requests_per_second"]
+    # Near-linear, allowing for the load generator sharing the same CPUs
+    assert speedup >= 0.6 * workers
@@ -0,0 +1,45 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+THREADS = 16
+ROUNDS = 25
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Switch threads as often as possible to make lost updates likely
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(switch_interval)
+
+
+def test_concurrent_add_and_cancel_on_one_order(client):
+    order_id = client.post("/order", json={"items": []}).get_json()["order_id"]
+
+    def hammer(_):
+        for _ in range(ROUNDS):
+            added = client.post(
+                f"/orders/{order_id}/add",
+                json={
+                    "items": [{"item": "main", "quantity": 2}],
+                    "order_time": "20:00",
+                },
+            )
+            cancelled = client.post(
+                f"/orders/{order_id}/cancel",
+                json={"items": [{"item": "main", "quantity": 1}]},
+            )
+            assert added.status_code == cancelled.status_code == 200
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(hammer, range(THREADS)))
+
+    order = client.get(f"/orders/{order_id}").get_json()
+    assert order["items"] == [
+        {"item": "main", "quantity": THREADS * ROUNDS, "order_time": "20:00"}
+    ]
+    assert order["total"] == round(THREADS * ROUNDS * 7.0 * 1.1, 2)
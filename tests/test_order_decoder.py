@@ -0,0 +1,150 @@
+import pytest
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_decoder import (
+    MAX_QUANTITY,
+    MAX_REPORTED_ERRORS,
+    InvalidItemsError,
+    decode_items,
+    parse_quantity,
+)
+from models.order_model import ItemType
+
+
+def test_decode_items_aggregates_in_order_of_first_appearance():
+    quantities = decode_items(
+        [
+            {"item": "drink", "quantity": 1},
+            {"item": "main", "quantity": 2},
+            {"item": "drink", "quantity": 3},
+        ]
+    )
+
+    assert list(quantities.items()) == [(ItemType.DRINK, 4), (ItemType.MAIN, 2)]
+    assert decode_items([]) == {}
+
+
+@pytest.mark.parametrize(
+    "quantity, expected", [(3, 3), (3.0, 3), ("3", 3), (" 12 ", 12)]
+)
+def test_parse_quantity_accepts_whole_numbers(quantity, expected):
+    assert parse_quantity(quantity) == expected
+
+
+@pytest.mark.parametrize("quantity", [0, -1, 1.5, True, None, "two", "", [1]])
+def test_parse_quantity_rejects_everything_else(quantity):
+    with pytest.raises(ValueError, match="positive whole number"):
+        parse_quantity(quantity)
+
+
+@pytest.mark.parametrize("quantity", [MAX_QUANTITY + 1, 10**30, "10001"])
+def test_parse_quantity_rejects_huge_quantities(quantity):
+    assert parse_quantity(MAX_QUANTITY) == MAX_QUANTITY
+    with pytest.raises(ValueError, match="at most 10000"):
+        parse_quantity(quantity)
+
+
+def test_every_invalid_entry_is_reported_with_its_position():
+    with pytest.raises(InvalidItemsError) as error:
+        decode_items(
+            [
+                {"item": "main", "quantity": 1},
+                "main",
+                {"item": "dessert", "quantity": 0},
+                {"item": "drink"},
+                {"item": ["main"], "quantity": 1},
+            ]
+        )
+
+    assert error.value.errors == [
+        {"index": 1, "field": None, "message": "must be an object"},
+        {
+            "index": 2,
+            "field": "item",
+            "message": "'dessert' is not a valid item (starter, main, drink)",
+        },
+        {
+            "index": 2,
+            "field": "quantity",
+            "message": "quantity must be a positive whole number, got 0",
+        },
+        {
+            "index": 3,
+            "field": None,
+            "message": "must have 'item' and 'quantity' fields",
+        },
+        {
+            "index": 4,
+            "field": "item",
+            "message": "['main'] is not a valid item (starter, main, drink)",
+        },
+    ]
+    assert str(error.value).startswith(
+        "items[1]: must be an object; items[2].item: 'dessert' is not a valid item"
+    )
+
+
+def test_reported_errors_are_capped():
+    with pytest.raises(InvalidItemsError) as error:
+        decode_items([{"item": "soup", "quantity": 1}] * (MAX_REPORTED_ERRORS + 5))
+
+    assert len(error.value.errors) == MAX_REPORTED_ERRORS
+    assert error.value.error_count == MAX_REPORTED_ERRORS + 5
+    assert str(error.value).endswith("(and 5 more)")
+
+
+def test_invalid_entries_leave_the_order_unchanged():
+    calculator = CheckoutCalculator([{"item": "main", "quantity": 2}], "18:00")
+
+    with pytest.raises(InvalidItemsError):
+        calculator.add_items(
+            [{"item": "drink", "quantity": 1}, {"item": "soup", "quantity": 1}]
+        )
+
+    assert calculator.version == 1
+    assert calculator.items_payload() == [
+        {"item": "main", "quantity": 2, "order_time": "18:00"}
+    ]
+
+
+def test_cancel_sums_repeated_entries():
+    calculator = CheckoutCalculator([{"item": "main", "quantity": 3}])
+    calculator.cancel_items(
+        [{"item": "main", "quantity": 1}, {"item": "main", "quantity": 1}]
+    )
+    assert calculator.items_payload()[0]["quantity"] == 1
+
+    with pytest.raises(ValueError, match="Cannot cancel 2 of main"):
+        calculator.cancel_items(
+            [{"item": "main", "quantity": 1}, {"item": "main", "quantity": 1}]
+        )
+
+
+def test_routes_report_item_errors(client):
+    response = client.post(
+        "/order", json={"items": [{"item": "main", "quantity": "lots"}]}
+    )
+
+    assert response.status_code == 400
+    error = response.get_json()["error"]
+    assert error["error_type"] == "InvalidItemsError"
+    assert error["errors"] == [
+        {
+            "index": 0,
+            "field": "quantity",
+            "message": "quantity must be a positive whole number, got 'lots'",
+        }
+    ]
+
+    order_id = client.post(
+        "/order", json={"items": [{"item": "main", "quantity": 1}]}
+    ).get_json()["order_id"]
+    response = client.post(
+        f"/orders/{order_id}/add",
+        json={"items": [{"item": "main", "quantity": 10**30}]},
+    )
+    assert response.status_code == 400
+    assert response.get_json()["error"]["errors"][0]["field"] == "quantity"
+    response = client.post(f"/orders/{order_id}/cancel", json={"items": [7]})
+    assert response.status_code == 400
+    assert response.get_json()["error"]["errors"][0]["message"] == "must be an object"
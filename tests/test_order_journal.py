@@ -0,0 +1,113 @@
+import atexit
+import os
+import time
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_journal import SNAPSHOT_FILE, JournaledOrderStore, list_segments
+
+
+def make_order(quantity=1, order_time="18:00"):
+    return CheckoutCalculator([{"item": "drink", "quantity": quantity}], order_time)
+
+
+def fill(store):
+    kept = make_order(quantity=3)
+    store.put("kept", kept)
+    kept.add_items([{"item": "main", "quantity": 2}], "20:00")
+    store.put("kept", kept)
+    kept.cancel_items([{"item": "drink", "quantity": 1}])
+    store.put("kept", kept)
+    store.put("deleted", make_order())
+    store.delete("deleted")
+    return kept
+
+
+def test_orders_survive_clean_restart(tmp_path):
+    store = JournaledOrderStore(str(tmp_path))
+    kept = fill(store)
+    store.close()
+
+    assert list_segments(str(tmp_path)) == []
+    restored = JournaledOrderStore(str(tmp_path))
+    assert restored.recovered_orders == 1
+    assert restored.get("deleted") is None
+    order = restored.get("kept")
+    assert order.items_payload() == kept.items_payload()
+    assert order.calculate_total() == kept.calculate_total()
+    assert order.version == kept.version == 3
+    restored.close()
+
+
+def test_orders_survive_crash_with_truncated_record(tmp_path):
+    store = JournaledOrderStore(str(tmp_path))
+    kept = fill(store)
+    # Stop writing without a snapshot, as if the process was killed after
+    # the last group commit, and leave a half-written record behind
+    store.journal.close()
+    atexit.unregister(store.close)
+    segment = os.path.join(str(tmp_path), "journal-00000000.jsonl")
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "put", "id": "lost", "sta')
+
+    restored = JournaledOrderStore(str(tmp_path))
+    assert restored.get("lost") is None
+    assert restored.get("kept").items_payload() == kept.items_payload()
+    restored.close()
+
+
+def test_unchanged_puts_are_not_journaled(tmp_path):
+    store = JournaledOrderStore(str(tmp_path))
+    order = make_order()
+    store.put("a", order)
+    store.put("a", order)
+    order.add_items([{"item": "main", "quantity": 1}], "20:00")
+    store.put("a", order)
+    store.journal.flush()
+
+    assert store.stats()["journal_records"] == 2
+    store.close()
+
+
+def test_full_segments_are_compacted_into_snapshot(tmp_path):
+    store = JournaledOrderStore(str(tmp_path), segment_records=5)
+    orders = {}
+    for number in range(20):
+        orders[f"order-{number}"] = make_order(quantity=number + 1)
+        store.put(f"order-{number}", orders[f"order-{number}"])
+        store.journal.flush()
+    with store._compacting:
+        pass
+
+    assert store.snapshots >= 1
+    assert os.path.exists(os.path.join(str(tmp_path), SNAPSHOT_FILE))
+    assert len(list_segments(str(tmp_path))) < 4
+    store.journal.close()
+    atexit.unregister(store.close)
+
+    restored = JournaledOrderStore(str(tmp_path))
+    assert len(restored) == 20
+    for order_id, order in orders.items():
+        assert restored.get(order_id).calculate_total() == order.calculate_total()
+    restored.close()
+
+
+def test_store_created_before_fork_journals_in_the_child(tmp_path):
+    # As with gunicorn's preload_app: created in the master, used in a worker
+    store = JournaledOrderStore(str(tmp_path), flush_interval=0.01)
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            store.put("tab", make_order(quantity=2))
+            time.sleep(0.2)
+            code = 0
+        finally:
+            # Killed without a clean shutdown: only group commits reach disk
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    assert list_segments(str(tmp_path)) == [0]
+    restored = JournaledOrderStore(str(tmp_path))
+    assert restored.get("tab").items_payload() == make_order(quantity=2).items_payload()
+    restored.close()
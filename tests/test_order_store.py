@@ -0,0 +1,117 @@
+import json
+import sqlite3
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_store import InMemoryOrderStore, SQLiteOrderStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_order(quantity=1, order_time="18:00"):
+    return CheckoutCalculator([{"item": "drink", "quantity": quantity}], order_time)
+
+
+def test_in_memory_store_evicts_least_recently_used():
+    store = InMemoryOrderStore(max_orders=2)
+    store.put("a", make_order())
+    store.put("b", make_order())
+    store.get("a")
+    store.put("c", make_order())
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.stats() == {"orders": 2, "evictions": 1, "expirations": 0}
+
+
+def test_in_memory_store_expires_idle_orders():
+    clock = FakeClock()
+    store = InMemoryOrderStore(ttl_seconds=60, clock=clock)
+    store.put("a", make_order())
+
+    clock.now += 61
+    assert store.get("a") is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_sqlite_store_round_trips_orders(tmp_path):
+    path = str(tmp_path / "orders.sqlite3")
+    calculator = make_order(quantity=2)
+    calculator.add_items([{"item": "main", "quantity": 1}], "20:00")
+    SQLiteOrderStore(path).put("a", calculator)
+
+    restored = SQLiteOrderStore(path).get("a")
+
+    assert restored.calculate_total() == calculator.calculate_total()
+    assert [item.to_dict() for item in restored.order_items] == [
+        item.to_dict() for item in calculator.order_items
+    ]
+    assert restored.pricing_config == calculator.pricing_config
+
+
+def test_sqlite_store_expires_idle_orders(tmp_path):
+    clock = FakeClock()
+    store = SQLiteOrderStore(str(tmp_path / "orders.sqlite3"), 60, clock=clock)
+    store.put("a", make_order())
+
+    clock.now += 61
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_sqlite_store_reads_versions_without_decoding_orders(tmp_path, monkeypatch):
+    clock = FakeClock()
+    store = SQLiteOrderStore(str(tmp_path / "orders.sqlite3"), 60, clock=clock)
+    calculator = make_order()
+    calculator.add_items([{"item": "main", "quantity": 1}])
+    store.put("a", calculator)
+
+    def from_state(state):
+        raise AssertionError("the order was decoded")
+
+    monkeypatch.setattr(CheckoutCalculator, "from_state", from_state)
+    assert store.get_version("a") == calculator.version == 2
+    assert store.get_version("missing") is None
+    clock.now += 61
+    assert store.get_version("a") is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_sqlite_store_adds_the_version_column_to_old_databases(tmp_path):
+    path = str(tmp_path / "orders.sqlite3")
+    calculator = make_order()
+    calculator.add_items([{"item": "main", "quantity": 1}])
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE orders (order_id TEXT PRIMARY KEY, state TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO orders VALUES ('a', ?, 0)",
+            (json.dumps(calculator.to_state()),),
+        )
+    conn.close()
+
+    assert SQLiteOrderStore(path).get_version("a") == calculator.version == 2
+
+
+def test_sqlite_transaction_rolls_back_on_error(tmp_path):
+    store = SQLiteOrderStore(str(tmp_path / "orders.sqlite3"))
+    store.put("a", make_order(quantity=1))
+
+    try:
+        with store.transaction("a"):
+            store.put("a", make_order(quantity=5))
+            raise RuntimeError("failed after the write")
+    except RuntimeError:
+        pass
+
+    assert store.get("a").items_payload()[0]["quantity"] == 1
+    with store.transaction("a"):
+        store.put("a", make_order(quantity=3))
+    assert store.get("a").items_payload()[0]["quantity"] == 3
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import pytest
+
+from app.checkout_calculator import CheckoutCalculator
+from models.order_time import MINUTES_PER_DAY, format_minute, parse_minute
+
+
+def test_lookup_table_matches_strptime_and_strftime():
+    for minute in range(MINUTES_PER_DAY):
+        text = format_minute(minute)
+        assert text == datetime(1900, 1, 1, minute // 60, minute % 60).strftime("%H:%M")
+        assert parse_minute(text) == minute
+
+
+def test_non_padded_times_are_still_accepted():
+    assert parse_minute("9:05") == 9 * 60 + 5
+
+
+@pytest.mark.parametrize("value", ["24:00", "18:60", "1830", "", " 18:30", 1830])
+def test_invalid_times_are_rejected(value):
+    with pytest.raises((ValueError, TypeError)):
+        parse_minute(value)
+
+
+def test_midnight_order_time_is_kept():
+    calculator = CheckoutCalculator([{"item": "drink", "quantity": 1}], "00:00")
+    assert calculator.items_payload()[0]["order_time"] == "00:00"
+    assert calculator.calculate_total() == 1.75
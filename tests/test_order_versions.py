@@ -0,0 +1,69 @@
+from app.checkout_calculator import CheckoutCalculator
+
+
+def test_changes_since_reports_only_newer_lines():
+    calculator = CheckoutCalculator(
+        [{"item": "main", "quantity": 2}, {"item": "drink", "quantity": 1}], "18:00"
+    )
+    assert calculator.version == 1
+    calculator.add_items([{"item": "starter", "quantity": 1}], "20:00")
+    calculator.cancel_items([{"item": "drink", "quantity": 1}])
+
+    assert calculator.version == 3
+    assert calculator.changes_since(3) == []
+    assert calculator.changes_since(2) == [
+        {"item": "drink", "quantity": 0, "order_time": "18:00"}
+    ]
+    assert calculator.changes_since(1) == [
+        {"item": "starter", "quantity": 1, "order_time": "20:00"},
+        {"item": "drink", "quantity": 0, "order_time": "18:00"},
+    ]
+
+
+def test_versions_survive_state_round_trip():
+    calculator = CheckoutCalculator([{"item": "main", "quantity": 2}], "18:00")
+    calculator.cancel_items([{"item": "main", "quantity": 2}])
+
+    restored = CheckoutCalculator.from_state(calculator.to_state())
+    assert restored.version == 2
+    assert restored.changes_since(1) == calculator.changes_since(1)
+
+
+def test_get_order_answers_304_for_current_etag(client):
+    created = client.post(
+        "/order",
+        json={"items": [{"item": "main", "quantity": 1}], "order_time": "18:00"},
+    )
+    order_id = created.get_json()["order_id"]
+    etag = created.headers["ETag"]
+
+    unchanged = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+
+    client.post(
+        f"/orders/{order_id}/add", json={"items": [{"item": "drink", "quantity": 1}]}
+    )
+    changed = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["version"] == 2
+
+
+def test_since_returns_delta_lines(client):
+    order_id = client.post(
+        "/order",
+        json={"items": [{"item": "main", "quantity": 1}], "order_time": "18:00"},
+    ).get_json()["order_id"]
+
+    added = client.post(
+        f"/orders/{order_id}/add?since=1",
+        json={"items": [{"item": "drink", "quantity": 2}], "order_time": "19:00"},
+    ).get_json()
+    assert added["since"] == 1
+    assert added["items"] == [{"item": "drink", "quantity": 2, "order_time": "19:00"}]
+    assert added["total"] == 12.7
+
+    assert client.get(f"/orders/{order_id}?since=2").get_json()["items"] == []
+    invalid = client.get(f"/orders/{order_id}?since=-1")
+    assert invalid.status_code == 400
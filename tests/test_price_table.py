@@ -0,0 +1,82 @@
+from datetime import time
+
+import pytest
+
+from config.checkout_config import PricingConfig
+from config.config_loader import parse_pricing_config
+from config.price_table import REGULAR_BUCKET, DiscountWindow, compile_price_table
+from models.order_model import ItemType
+
+
+@pytest.fixture
+def config():
+    return PricingConfig(
+        item_prices={ItemType.STARTER: 4.0, ItemType.MAIN: 7.0, ItemType.DRINK: 2.5},
+        service_charge_rate=0.1,
+        drink_discount_rate=0.3,
+        discount_cutoff_time=time(19, 0),
+    )
+
+
+def test_config_is_compiled_with_early_bird_bucket(config):
+    table = config.price_table
+    early = table.bucket_for_minute(18 * 60 + 59)
+    assert table.bucket_for_minute(19 * 60) == REGULAR_BUCKET
+    assert table.bucket_for(None) == REGULAR_BUCKET
+    assert table.bucket_count == 2
+
+    # Whole cents for this config; service charge is baked into food prices
+    assert table.amount_scale == 1
+    assert table.unit_amounts[(ItemType.DRINK, early)] == 175
+    assert table.unit_amounts[(ItemType.DRINK, REGULAR_BUCKET)] == 250
+    assert table.unit_amounts[(ItemType.MAIN, early)] == 770
+
+
+def test_overlapping_windows_get_their_own_buckets(config):
+    happy_hours = [
+        DiscountWindow(17 * 60, 18 * 60, {ItemType.DRINK: 0.5}),
+        DiscountWindow(22 * 60, 23 * 60, {ItemType.STARTER: 0.25}),
+    ]
+    table = compile_price_table(
+        config, happy_hours + [DiscountWindow(0, 19 * 60, {ItemType.DRINK: 0.3})]
+    )
+
+    assert table.bucket_count == 4
+    happy_early = table.bucket_for_minute(17 * 60 + 30)
+    late = table.bucket_for_minute(22 * 60 + 30)
+    # 87.5 cents is kept exact by scaling every amount
+    assert table.amount_scale == 2
+    assert table.unit_amounts[(ItemType.DRINK, happy_early)] == 175
+    assert table.unit_amounts[(ItemType.STARTER, late)] == 660
+    assert table.unit_amounts[(ItemType.DRINK, late)] == 500
+    assert len(table.buckets) == len(ItemType) * table.bucket_count
+
+
+def test_totals_are_rounded_half_up_once(config):
+    # 3 x 87.5 cents = 262.5 cents; floats would give round(2.625, 2) == 2.62
+    table = compile_price_table(
+        config, [DiscountWindow(0, 19 * 60, {ItemType.DRINK: 0.65})]
+    )
+    amount = table.unit_amounts[(ItemType.DRINK, 1)] * 3
+    assert table.to_cents(amount) == 263
+
+
+RAW_CONFIG = {
+    "item_prices": {"STARTER": 4.0, "MAIN": 7.0, "DRINK": 2.5},
+    "service_charge_rate": 0.1,
+    "drink_discount_rate": 0.3,
+    "discount_cutoff_time": "19:00",
+}
+
+
+def test_prices_finer_than_a_cent_are_rejected():
+    with pytest.raises(ValueError, match="DRINK must be a whole number of cents"):
+        parse_pricing_config(
+            {**RAW_CONFIG, "item_prices": {**RAW_CONFIG["item_prices"], "DRINK": 2.555}}
+        )
+
+
+def test_rates_finer_than_a_basis_point_are_rejected():
+    with pytest.raises(ValueError, match="service_charge_rate .* basis points"):
+        parse_pricing_config({**RAW_CONFIG, "service_charge_rate": 0.12345})
+    assert parse_pricing_config({**RAW_CONFIG, "drink_discount_rate": 0.1234})
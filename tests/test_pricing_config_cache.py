@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from config.config_loader import DEFAULT_CONFIG_PATH, PricingConfigCache
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "params.yaml"
+    with open(DEFAULT_CONFIG_PATH) as src:
+        path.write_text(src.read())
+    return path
+
+
+def test_cache_hits_until_file_changes(config_path):
+    cache = PricingConfigCache(str(config_path))
+
+    first = cache.get()
+    assert cache.get() is first
+    assert cache.stats() == {"hits": 1, "reloads": 1, "version": 1}
+
+    config_path.write_text(config_path.read_text().replace("7.0", "8.0"))
+    stat = os.stat(config_path)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = cache.get()
+    assert second is not first
+    assert second.version == 2
+    assert first.version == 1
+    assert cache.stats()["reloads"] == 2
+
+
+def test_explicit_reload_bumps_version(config_path):
+    cache = PricingConfigCache(str(config_path))
+
+    first = cache.get()
+    reloaded = cache.reload()
+
+    assert reloaded.version == first.version + 1
+    assert cache.get() is reloaded
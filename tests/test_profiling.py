@@ -0,0 +1,67 @@
+import marshal
+import pstats
+
+import pytest
+
+import app.api
+from app.profiling import ProfilingMiddleware
+from config.app_config import load_app_config
+
+
+def slow_app(environ, start_response):
+    sum(i * i for i in range(20000 if environ["PATH_INFO"] == "/slow" else 10))
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"ok"]
+
+
+def call(middleware, path):
+    return middleware({"REQUEST_METHOD": "GET", "PATH_INFO": path}, lambda *a: None)
+
+
+def test_keeps_only_the_slowest_profiles():
+    middleware = ProfilingMiddleware(slow_app, slow_threshold_seconds=0, max_profiles=2)
+    for path in ("/fast", "/slow", "/fast", "/slow"):
+        call(middleware, path)
+
+    assert [record.path for record in middleware.profiles()] == ["/slow", "/slow"]
+
+
+def test_max_profiles_must_be_positive():
+    with pytest.raises(ValueError, match="max_profiles"):
+        ProfilingMiddleware(slow_app, slow_threshold_seconds=0, max_profiles=0)
+    with pytest.raises(ValueError, match="RESTAURANT_PROFILE_KEEP"):
+        load_app_config({"RESTAURANT_PROFILE_KEEP": "0"})
+
+
+def test_disabled_sampling_profiles_nothing():
+    middleware = ProfilingMiddleware(slow_app, sample_rate=0.0)
+    call(middleware, "/slow")
+    assert middleware.profiles() == []
+
+
+def test_profiles_download_as_pstats_and_collapsed(monkeypatch, tmp_path):
+    profiler = ProfilingMiddleware(
+        app.api.app.wsgi_app, slow_threshold_seconds=0, max_profiles=5
+    )
+    monkeypatch.setattr(app.api.app, "wsgi_app", profiler)
+    monkeypatch.setattr(app.api, "profiler", profiler)
+    monkeypatch.setattr(app.api.app, "debug", True)
+    client = app.api.app.test_client()
+    client.post("/order", json={"items": [{"item": "main", "quantity": 1}]})
+
+    listing = client.get("/debug/profiles").get_json()["profiles"]
+    order_profile = next(p for p in listing if p["path"] == "/order")
+
+    dump = client.get(f"/debug/profiles/{order_profile['id']}.pstats").data
+    path = tmp_path / "order.pstats"
+    path.write_bytes(dump)
+    assert pstats.Stats(str(path)).total_calls > 0
+    assert marshal.loads(dump)
+
+    collapsed = client.get(f"/debug/profiles/{order_profile['id']}.collapsed")
+    assert "calculate_total" in collapsed.get_data(as_text=True)
+
+
+def test_profile_endpoints_are_hidden_without_debug():
+    response = app.api.app.test_client().get("/debug/profiles")
+    assert response.status_code == 404
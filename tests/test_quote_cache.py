@@ -0,0 +1,112 @@
+import dataclasses
+from unittest import mock
+
+import app.api
+from app.checkout_calculator import CheckoutCalculator
+from app.quote_cache import QuoteCache, canonical_cart, get_quote_cache
+from config.config_loader import (
+    get_pricing_config,
+    parse_pricing_config,
+    pricing_config_to_dict,
+)
+
+
+def test_equivalent_carts_share_a_key():
+    config = get_pricing_config()
+    split = canonical_cart(
+        [
+            {"item": "drink", "quantity": 1},
+            {"item": "main", "quantity": 1},
+            {"item": "main", "quantity": 1},
+        ],
+        "18:40",
+        config,
+    )
+    merged = canonical_cart(
+        [{"item": "main", "quantity": 2}, {"item": "drink", "quantity": 1}],
+        "18:05",
+        config,
+    )
+
+    assert split == merged
+    assert split != canonical_cart(
+        [{"item": "main", "quantity": 2}, {"item": "drink", "quantity": 1}],
+        "19:05",
+        config,
+    )
+    assert canonical_cart([{"item": "main", "quantity": "2"}], None, config) is None
+    assert canonical_cart([{"item": "main", "quantity": 1}], "25:00", config) is None
+
+
+def test_cache_evicts_least_recently_used_and_counts():
+    config = get_pricing_config()
+    cache = QuoteCache(max_entries=2)
+    cache.put(config, (0, (("main", 1),)), 770)
+    cache.put(config, (0, (("main", 2),)), 1540)
+    assert cache.get(config, (0, (("main", 1),))) == 770
+    cache.put(config, (0, (("main", 3),)), 2310)
+
+    assert cache.get(config, (0, (("main", 2),))) is None
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 1, "evictions": 1}
+
+
+def test_quotes_are_kept_per_price_table():
+    config = get_pricing_config()
+    cache = QuoteCache()
+    cache.put(config, (0, (("main", 1),)), 770)
+
+    # A reload of the same prices, or an older config still used by a venue
+    assert cache.get(dataclasses.replace(config, version=0), (0, (("main", 1),))) == 770
+    dearer = parse_pricing_config(
+        {**pricing_config_to_dict(config), "item_prices": {"MAIN": 8.0}}
+    )
+    assert cache.get(dearer, (0, (("main", 1),))) is None
+
+
+def test_batches_read_but_do_not_fill_the_cache():
+    config = get_pricing_config()
+    cache = QuoteCache()
+    cart = [{"item": "main", "quantity": 5}]
+    cache.put(config, canonical_cart(cart, None, config), 1)
+
+    with mock.patch("app.checkout_calculator.get_quote_cache", return_value=cache):
+        totals = CheckoutCalculator.price_many(
+            [(cart, None), ([{"item": "drink", "quantity": 9}], None)], config
+        )
+
+    assert totals[0] == 0.01
+    assert len(cache) == 1 and cache.stats()["hits"] == 1
+
+
+def test_quantities_over_the_limit_are_not_served_from_the_cache(client):
+    split = [{"item": "main", "quantity": 6000}, {"item": "main", "quantity": 6000}]
+    assert client.post("/quote", json={"items": split}).get_json() == {"total": 92400.0}
+
+    response = client.post(
+        "/quote", json={"items": [{"item": "main", "quantity": 12000}]}
+    )
+    assert response.status_code == 400
+    assert "at most 10000" in response.get_json()["error"]["error_message"]
+
+
+def test_quote_endpoint_uses_cache():
+    client = app.api.app.test_client()
+    cart = {
+        "items": [{"item": "main", "quantity": 2}, {"item": "drink", "quantity": 2}],
+        "order_time": "18:30",
+    }
+    first = client.post("/quote", json=cart)
+    hits = get_quote_cache().stats()["hits"]
+    second = client.post("/quote", json=cart)
+
+    assert first.get_json() == second.get_json() == {"total": 18.9}
+    assert get_quote_cache().stats()["hits"] == hits + 1
+    assert (
+        CheckoutCalculator(cart["items"], cart["order_time"]).calculate_total() == 18.9
+    )
+    assert (
+        client.post(
+            "/quote", json={"items": [{"item": "pizza", "quantity": 1}]}
+        ).status_code
+        == 400
+    )
@@ -0,0 +1,106 @@
+import csv
+import json
+
+import pytest
+
+from app.reprice import main
+
+
+@pytest.fixture
+def jsonl_orders(tmp_path):
+    path = tmp_path / "orders.jsonl"
+    orders = [
+        {
+            "order_id": "a",
+            "items": [{"item": "drink", "quantity": 4}],
+            "order_time": "18:00",
+        },
+        {"order_id": "b", "items": [{"item": "main", "quantity": 1}]},
+        {"order_id": "c", "items": [{"item": "dessert", "quantity": 1}]},
+    ]
+    path.write_text("".join(json.dumps(order) + "\n" for order in orders))
+    return path
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_reprice_jsonl_to_csv(jsonl_orders, tmp_path, workers):
+    output = tmp_path / "totals.csv"
+
+    assert (
+        main(
+            [
+                str(jsonl_orders),
+                str(output),
+                "--chunk-size",
+                "1",
+                "--workers",
+                str(workers),
+            ]
+        )
+        == 0
+    )
+
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["order_id"], row["total"]) for row in rows] == [
+        ("a", "7.0"),
+        ("b", "7.7"),
+        ("c", ""),
+    ]
+    assert "dessert" in rows[2]["error"]
+
+
+def test_reprice_csv_groups_rows_by_order_and_time(tmp_path):
+    source = tmp_path / "orders.csv"
+    source.write_text(
+        "order_id,item,quantity,order_time\n"
+        "a,starter,1,18:45\n"
+        "a,main,2,18:45\n"
+        "a,drink,2,18:45\n"
+        "a,main,2,20:00\n"
+        "a,drink,2,20:00\n"
+        "b,main,1,\n"
+    )
+    output = tmp_path / "totals.jsonl"
+
+    assert main([str(source), str(output)]) == 0
+
+    assert [json.loads(line) for line in output.read_text().splitlines()] == [
+        {"order_id": "a", "total": 43.7},
+        {"order_id": "b", "total": 7.7},
+    ]
+
+
+def test_records_that_are_not_objects_are_reported_per_order(tmp_path, capsys):
+    source = tmp_path / "orders.jsonl"
+    source.write_text(
+        '[1, 2]\n{"order_id": "b", "items": [{"item": "main", "quantity": 1}]}\n'
+    )
+
+    assert main([str(source), "-"]) == 0
+
+    rows = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+    assert [(row["order_id"], row["total"]) for row in rows] == [
+        ("1", ""),
+        ("b", "7.7"),
+    ]
+    assert rows[0]["error"] == "ValueError: Line 1 is not a JSON object"
+
+
+def test_malformed_json_lines_are_reported_and_skipped(tmp_path, capsys):
+    source = tmp_path / "orders.jsonl"
+    source.write_text(
+        '{"order_id": "a", "items": [{"item": "drink", "quantity": 4}]}\n'
+        '{"order_id": "b", "items": [\n'
+        '{"order_id": "c", "items": [{"item": "main", "quantity": 1}]}\n'
+    )
+
+    assert main([str(source), "-"]) == 0
+
+    rows = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+    assert [(row["order_id"], row["total"]) for row in rows] == [
+        ("a", "10.0"),
+        ("2", ""),
+        ("c", "7.7"),
+    ]
+    assert rows[1]["error"].startswith("ValueError: Invalid JSON on line 2")
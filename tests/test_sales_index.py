@@ -0,0 +1,227 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.asgi import create_asgi_app
+from app.order_service import OrderService, parse_report_date, parse_report_window
+from app.order_journal import JournaledOrderStore
+from app.order_store import SQLiteOrderStore
+from app.sales_index import SalesIndex
+from config.config_loader import parse_pricing_config
+from models.order_model import ItemType
+from tests.utils.test_utils import call
+
+DAY = date(2024, 3, 1)
+NEXT_DAY = date(2024, 3, 2)
+
+
+@pytest.fixture
+def service(order_store, venues):
+    return OrderService(order_store, venues=venues, today=lambda: DAY)
+
+
+def place_orders(service):
+    order_id = service.create_order(
+        {
+            "items": [
+                {"item": "drink", "quantity": 2},
+                {"item": "main", "quantity": 1},
+            ],
+            "order_time": "18:30",
+        }
+    )["order_id"]
+    service.add_items(
+        order_id,
+        {
+            "items": [
+                {"item": "drink", "quantity": 1},
+                {"item": "starter", "quantity": 2},
+            ],
+            "order_time": "19:15",
+        },
+    )
+    # Taken from the 19:15 round
+    service.cancel_items(order_id, {"items": [{"item": "drink", "quantity": 1}]})
+    service.create_order({"items": [{"item": "main", "quantity": 1}]})
+
+
+def test_report_covers_only_the_window(service):
+    place_orders(service)
+
+    report = service.store.sales_report(DAY, 18 * 60, 19 * 60)
+
+    assert report["date"] == "2024-03-01"
+    assert report["from"] == "18:00" and report["to"] == "19:00"
+    assert report["items"] == {
+        "starter": {"quantity": 0, "revenue": 0.0},
+        "main": {"quantity": 1, "revenue": 7.7},
+        "drink": {"quantity": 2, "revenue": 3.5},
+    }
+    assert report["quantity"] == 3
+    assert report["revenue"] == 11.2
+    assert report["hours"] == [
+        {"from": "18:00", "to": "19:00", "quantity": 3, "revenue": 11.2}
+    ]
+    assert report["untimed"]["main"] == {"quantity": 1, "revenue": 7.7}
+
+
+def test_report_splits_the_window_by_clock_hour(service):
+    place_orders(service)
+
+    report = service.store.sales_report(DAY, 18 * 60 + 30, 24 * 60)
+
+    assert report["to"] == "24:00"
+    assert report["revenue"] == 20.0
+    assert report["items"]["drink"] == {"quantity": 2, "revenue": 3.5}
+    assert report["hours"][:2] == [
+        {"from": "18:30", "to": "19:00", "quantity": 3, "revenue": 11.2},
+        {"from": "19:00", "to": "20:00", "quantity": 2, "revenue": 8.8},
+    ]
+    assert len(report["hours"]) == 6
+
+
+def test_reports_cover_one_business_date(service):
+    place_orders(service)
+    service.today = lambda: NEXT_DAY
+    service.create_order(
+        {"items": [{"item": "drink", "quantity": 4}], "order_time": "18:10"}
+    )
+
+    first = service.store.sales_report(DAY)
+    second = service.store.sales_report(NEXT_DAY)
+    assert first["revenue"] == 20.0
+    assert first["items"]["drink"] == {"quantity": 2, "revenue": 3.5}
+    assert second["date"] == "2024-03-02"
+    assert second["revenue"] == 7.0
+    assert second["items"]["drink"] == {"quantity": 4, "revenue": 7.0}
+    assert service.store.sales_report(date(2024, 2, 29))["quantity"] == 0
+
+
+def test_sqlite_sales_survive_a_restart(tmp_path):
+    path = str(tmp_path / "orders.sqlite3")
+    place_orders(OrderService(SQLiteOrderStore(path), today=lambda: DAY))
+
+    # Another worker, or the same one after a restart
+    report = SQLiteOrderStore(path).sales_report(DAY)
+    assert report["revenue"] == 20.0
+    assert report["untimed"]["main"] == {"quantity": 1, "revenue": 7.7}
+    assert SQLiteOrderStore(path).sales_report(NEXT_DAY)["quantity"] == 0
+
+
+def test_journal_sales_survive_restarts_and_compaction(tmp_path):
+    store = JournaledOrderStore(str(tmp_path), segment_records=2)
+    service = OrderService(store, today=lambda: DAY)
+    place_orders(service)
+    # Closed orders still count
+    for order_id in list(store._orders):
+        store.delete(order_id)
+    service.today = lambda: NEXT_DAY
+    service.create_order({"items": [{"item": "drink", "quantity": 4}]})
+    expected = [store.sales_report(DAY), store.sales_report(NEXT_DAY)]
+    assert expected[0]["revenue"] == 20.0
+    store.close()
+
+    restored = JournaledOrderStore(str(tmp_path))
+    assert [restored.sales_report(DAY), restored.sales_report(NEXT_DAY)] == expected
+    restored.close()
+
+    # close() folded everything into the snapshot; read it back once more
+    again = JournaledOrderStore(str(tmp_path))
+    assert [again.sales_report(DAY), again.sales_report(NEXT_DAY)] == expected
+    again.close()
+
+
+def test_sales_index_drops_dates_past_retention():
+    sales = SalesIndex(retention_days=1)
+    config = parse_pricing_config(
+        {
+            "item_prices": {"STARTER": 4.0, "MAIN": 7.0, "DRINK": 2.5},
+            "service_charge_rate": 0.1,
+            "drink_discount_rate": 0.3,
+            "discount_cutoff_time": "19:00",
+        }
+    )
+    for business_date in (DAY, NEXT_DAY, date(2024, 3, 3)):
+        sales.record(business_date, config, [(ItemType.DRINK, 18 * 60, 1)])
+
+    assert [business_date for business_date, _ in sales.days()] == [
+        NEXT_DAY,
+        date(2024, 3, 3),
+    ]
+    assert sales.report(DAY)["quantity"] == 0
+    assert sales.report(NEXT_DAY)["quantity"] == 1
+
+
+def test_revenue_is_exact_until_reported():
+    sales = SalesIndex()
+    config = parse_pricing_config(
+        {
+            "item_prices": {"STARTER": 4.0, "MAIN": 7.0, "DRINK": 0.05},
+            "service_charge_rate": 0.1,
+            "drink_discount_rate": 0.3,
+            "discount_cutoff_time": "19:00",
+        }
+    )
+    # 0.035 per drink: rounding each line to cents would report 0.12
+    for _ in range(3):
+        sales.record(DAY, config, [(ItemType.DRINK, 18 * 60, 1)])
+
+    assert sales.report(DAY)["revenue"] == 0.11
+
+
+def test_parse_report_window():
+    assert parse_report_window(None, None) == (0, 24 * 60)
+    assert parse_report_window("17:00", "24:00") == (17 * 60, 24 * 60)
+    with pytest.raises(ValueError, match="'from'"):
+        parse_report_window("25:00", None)
+    with pytest.raises(ValueError, match="later than"):
+        parse_report_window("19:00", "18:00")
+
+
+def test_parse_report_date():
+    assert parse_report_date(None, DAY) == DAY
+    assert parse_report_date("2024-02-29", DAY) == date(2024, 2, 29)
+    for value in ("2024-02-30", "20240229", "yesterday"):
+        with pytest.raises(ValueError, match="'date'"):
+            parse_report_date(value, DAY)
+
+
+def test_sales_report_route(client, service):
+    place_orders(service)
+
+    response = client.get("/reports/sales?from=18:00&to=19:00")
+    assert response.status_code == 200
+    assert response.get_json()["date"] == "2024-03-01"
+    assert response.get_json()["items"]["drink"] == {"quantity": 2, "revenue": 3.5}
+
+    response = client.get("/reports/sales?date=2024-03-02")
+    assert response.status_code == 200
+    assert response.get_json()["quantity"] == 0
+
+    assert client.get("/reports/sales?to=7pm").status_code == 400
+    assert client.get("/reports/sales?date=01/03/2024").status_code == 400
+
+
+def test_asgi_sales_report_route(order_store):
+    asgi_app = create_asgi_app(order_store)
+    asgi_app.service.today = lambda: DAY
+
+    async def scenario():
+        await call(
+            asgi_app,
+            "POST",
+            "/order",
+            {"items": [{"item": "drink", "quantity": 4}], "order_time": "18:10"},
+        )
+        return (
+            await call(asgi_app, "GET", "/reports/sales?date=2024-03-01"),
+            await call(asgi_app, "GET", "/reports/sales?date=2024-03-02"),
+            await call(asgi_app, "GET", "/reports/sales?date=tomorrow"),
+        )
+
+    (status, report), (_, next_day), (bad_status, _) = asyncio.run(scenario())
+    assert status == 200
+    assert report["items"]["drink"] == {"quantity": 4, "revenue": 7.0}
+    assert next_day["quantity"] == 0
+    assert bad_status == 400
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only needed once a feature is used, not to serve the first request
+DEFERRED_MODULES = {"yaml", "cProfile", "app.profiling", "numpy"}
+
+
+def import_api(cwd, **environ):
+    """Import app.api in a fresh interpreter and return the modules it imported"""
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    env.pop("RESTAURANT_PRELOAD", None)
+    env.update(environ)
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import app.api; from config.config_loader import pricing_config_stats;"
+            " print(pricing_config_stats()['reloads'])",
+        ],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+    return modules, int(result.stdout.strip().splitlines()[-1])
+
+
+def test_importing_api_defers_optional_work(tmp_path):
+    modules, config_loads = import_api(tmp_path)
+
+    assert "app.api" in modules
+    assert not DEFERRED_MODULES & modules
+    assert config_loads == 0
+    assert not (tmp_path / "logs").exists()
+
+
+def test_preload_parses_config_at_boot(tmp_path):
+    modules, config_loads = import_api(tmp_path, RESTAURANT_PRELOAD="1")
+
+    assert "yaml" in modules
+    assert config_loads == 1
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from app.checkout_calculator import CheckoutCalculator
+from app.order_decoder import InvalidItemsError
+from config.checkout_config import PricingConfig
+from config.config_loader import get_pricing_config
+from models.order_model import ItemType
+
+np = pytest.importorskip("numpy")
+
+from app.vectorized_pricing import (  # noqa: E402
+    NO_ORDER_TIME,
+    encode_item_types,
+    encode_order_times,
+    price_columns,
+)
+
+
+def random_orders(count, seed=7):
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        order_time = rng.choice(
+            [None, f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"]
+        )
+        items = [
+            {"item": rng.choice(list(ItemType)).value, "quantity": rng.randint(1, 9)}
+            for _ in range(rng.randint(1, 5))
+        ]
+        orders.append((items, order_time))
+    return orders
+
+
+def to_columns(orders):
+    columns = {"order_id": [], "item": [], "quantity": [], "order_time": []}
+    for order_id, (items, order_time) in enumerate(orders):
+        for item in items:
+            columns["order_id"].append(order_id)
+            columns["item"].append(item["item"])
+            columns["quantity"].append(item["quantity"])
+            columns["order_time"].append(order_time)
+    return columns
+
+
+@pytest.mark.parametrize(
+    "pricing_config",
+    [
+        None,
+        PricingConfig(
+            item_prices={
+                ItemType.STARTER: 3.99,
+                ItemType.MAIN: 12.45,
+                ItemType.DRINK: 2.35,
+            },
+            service_charge_rate=0.125,
+            drink_discount_rate=0.15,
+            discount_cutoff_time=get_pricing_config().discount_cutoff_time,
+        ),
+    ],
+)
+def test_vectorized_totals_match_calculator(pricing_config):
+    orders = random_orders(500)
+    columns = to_columns(orders)
+
+    order_ids, totals = price_columns(
+        columns["order_id"],
+        encode_item_types(columns["item"]),
+        columns["quantity"],
+        encode_order_times(columns["order_time"]),
+        pricing_config,
+    )
+
+    assert order_ids.tolist() == list(range(len(orders)))
+    assert totals.tolist() == CheckoutCalculator.price_many(orders, pricing_config)
+
+
+def test_unknown_item_is_rejected():
+    with pytest.raises(ValueError):
+        encode_item_types(["drink", "dessert"])
+
+
+def test_invalid_order_times_are_rejected():
+    assert encode_order_times([None, "", "18:30"]).tolist() == [-1, -1, 18 * 60 + 30]
+    with pytest.raises(ValueError, match="'25:00'"):
+        encode_order_times(["18:00", "25:00"])
+
+
+@pytest.mark.parametrize(
+    "item_codes, order_minutes",
+    [([0, 3], [0, 0]), ([0, -1], [0, 0]), ([0, 1], [0, 24 * 60]), ([0, 1], [-2, 0])],
+)
+def test_out_of_range_columns_are_rejected(item_codes, order_minutes):
+    with pytest.raises(ValueError, match="Invalid"):
+        price_columns([1, 2], item_codes, [1, 1], order_minutes)
+
+
+@pytest.mark.parametrize(
+    "quantities, message",
+    [
+        ([1, 2.5], "quantity must be a positive whole number, got 2.5"),
+        ([1, None], "quantity must be a positive whole number, got None"),
+        ([1, "two"], "quantity must be a positive whole number, got 'two'"),
+        ([1, 0], "quantity must be a positive whole number, got 0"),
+        ([1, -3], "quantity must be a positive whole number, got -3"),
+        ([1, 10001], "quantity must be at most 10000, got 10001"),
+    ],
+    ids=["fraction", "missing", "text", "zero", "negative", "too-large"],
+)
+def test_invalid_quantities_are_rejected(quantities, message):
+    with pytest.raises(InvalidItemsError) as excinfo:
+        price_columns([1, 2], [0, 1], quantities, [0, 0])
+    assert excinfo.value.errors == [
+        {"index": 1, "field": "quantity", "message": message}
+    ]
+
+
+def test_whole_float_quantities_are_accepted():
+    _, totals = price_columns([1], [1], [2.0], [NO_ORDER_TIME])
+    assert totals.tolist() == price_columns([1], [1], [2], [NO_ORDER_TIME])[1].tolist()
@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+
+import pytest
+
+from config.config_loader import load_pricing_config
+from config.price_table import shared_price_table_count
+from config.venue_registry import VenueRegistry
+from models.order_model import ItemType
+
+VENUE_CONFIG = """
+item_prices:
+  STARTER: {starter}
+  MAIN: 7.0
+  DRINK: 2.5
+service_charge_rate: 0.10
+drink_discount_rate: 0.30
+discount_cutoff_time: "19:00"
+"""
+
+
+def write_venue(directory, venue_id, starter=4.0):
+    (directory / f"{venue_id}.yaml").write_text(VENUE_CONFIG.format(starter=starter))
+
+
+@pytest.fixture
+def venues(tmp_path):
+    write_venue(tmp_path, "soho", starter=4.0)
+    write_venue(tmp_path, "camden", starter=5.0)
+    (tmp_path / "README.txt").write_text("not a venue")
+    registry = VenueRegistry(str(tmp_path))
+    registry.load_all()
+    return registry
+
+
+def test_venues_are_loaded_from_their_files(venues):
+    assert len(venues) == 2
+    assert "soho" in venues and "README" not in venues
+    assert venues.get("camden").item_prices != venues.get("soho").item_prices
+    with pytest.raises(ValueError, match="Unknown venue: 'leeds'"):
+        venues.get("leeds")
+
+
+def test_reload_replaces_only_that_venue(venues, tmp_path):
+    soho, camden = venues.get("soho"), venues.get("camden")
+    write_venue(tmp_path, "soho", starter=4.5)
+    write_venue(tmp_path, "leeds")
+
+    reloaded = venues.reload("soho")
+    assert venues.get("soho") is reloaded
+    assert reloaded.version > max(soho.version, camden.version)
+    assert venues.get("camden") is camden
+
+    venues.reload("leeds")
+    assert len(venues) == 3
+    with pytest.raises(LookupError):
+        venues.reload("york")
+
+
+def test_changed_files_are_picked_up_by_every_registry(venues, tmp_path):
+    # A second worker process, loaded from the same directory
+    other = VenueRegistry(str(tmp_path))
+    other.load_all()
+    camden = other.get("camden")
+    write_venue(tmp_path, "soho", starter=4.5)
+    os.utime(tmp_path / "soho.yaml", ns=(10**18, 10**18))
+    write_venue(tmp_path, "leeds", starter=6.0)
+
+    venues.reload("soho")
+    assert other.refresh() == 2
+    assert other.refresh() == 0
+    for registry in (venues, other):
+        assert registry.get("soho").item_prices[ItemType.STARTER] == 4.5
+        assert registry.get("soho").version == 10**18
+    assert other.get("leeds").item_prices[ItemType.STARTER] == 6.0
+    assert other.get("camden") is camden
+
+
+def test_lookups_do_no_file_io(venues, monkeypatch):
+    def no_io(*args):
+        raise AssertionError("file I/O on lookup")
+
+    monkeypatch.setattr(os, "stat", no_io)
+    monkeypatch.setattr(os.path, "exists", no_io)
+    monkeypatch.setattr(os, "listdir", no_io)
+
+    assert venues.get("soho").item_prices[ItemType.STARTER] == 4.0
+    with pytest.raises(ValueError, match="Unknown venue"):
+        venues.get("leeds")
+
+
+def test_polling_picks_up_changes(venues, tmp_path):
+    write_venue(tmp_path, "soho", starter=4.5)
+    venues.start_polling(0.01)
+    try:
+        deadline = time.monotonic() + 5
+        while venues.get("soho").item_prices[ItemType.STARTER] != 4.5:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        venues.stop_polling()
+
+
+def test_invalid_file_keeps_the_loaded_config(venues, tmp_path):
+    soho = venues.get("soho")
+    (tmp_path / "soho.yaml").write_text("item_prices: {}\n")
+
+    with pytest.raises(ValueError, match="soho.yaml"):
+        venues.reload("soho")
+    assert venues.get("soho") is soho
+    assert venues.reloads == 2
+
+
+def test_venues_with_equal_prices_share_a_price_table(tmp_path):
+    for index in range(300):
+        write_venue(tmp_path, f"venue-{index}", starter=4.0 + index % 3)
+    registry = VenueRegistry(str(tmp_path))
+    registry.load_all()
+
+    tables = {id(registry.get(f"venue-{index}").price_table) for index in range(300)}
+    assert len(tables) == 3
+    assert registry.stats()["price_tables"] == shared_price_table_count()
+    # The config of params.yaml prices like venue-0
+    assert load_pricing_config().price_table is registry.get("venue-0").price_table
+
+
+def test_orders_and_quotes_use_the_venue_config(client):
+    items = [{"item": "starter", "quantity": 2}]
+
+    response = client.post("/order", json={"items": items, "venue_id": "camden"})
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 11.0
+    assert client.post("/quote", json={"items": items}).get_json()["total"] == 8.8
+    assert (
+        client.post("/quote", json={"items": items, "venue_id": "soho"}).get_json()[
+            "total"
+        ]
+        == 8.8
+    )
+
+    response = client.post("/order", json={"items": items, "venue_id": "leeds"})
+    assert response.status_code == 400
+    assert response.get_json()["error"]["error_message"] == "Unknown venue: 'leeds'"
+
+
+def test_batches_use_the_venue_config(client):
+    batch = {"orders": [{"items": [{"item": "starter", "quantity": 2}]}]}
+
+    response = client.post("/orders/batch", json={**batch, "venue_id": "camden"})
+    assert response.status_code == 200
+    assert response.get_json()["results"] == [{"total": 11.0}]
+    default = client.post("/orders/batch", json=batch).get_json()
+    assert default["results"] == [{"total": 8.8}]
+
+    response = client.post("/orders/batch", json={**batch, "venue_id": "leeds"})
+    assert response.status_code == 400
+    assert response.get_json()["error"]["error_message"] == "Unknown venue: 'leeds'"
+
+
+def test_reload_route(client, tmp_path):
+    write_venue(tmp_path, "camden", starter=6.0)
+
+    response = client.post("/venues/camden/reload")
+    assert response.status_code == 200
+    assert response.get_json()["venue_id"] == "camden"
+    order = client.post(
+        "/order",
+        json={"items": [{"item": "starter", "quantity": 1}], "venue_id": "camden"},
+    ).get_json()
+    assert order["total"] == 6.6
+
+    assert client.post("/venues/york/reload").status_code == 404
+
+
+def test_polling_restarts_in_forked_children(venues):
+    venues.start_polling(60)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            alive = any(
+                thread.name == "venue-config-poll" for thread in threading.enumerate()
+            )
+            os._exit(0 if alive else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        venues.stop_polling()
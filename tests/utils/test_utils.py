@@ -1,3 +1,4 @@
+import json
 import logging
 
 import requests
@@ -22,3 +23,35 @@ def check_response(response: requests.Response, operation: str) -> None:
         )
         logger.error(error_message)
         raise AssertionError(error_message)
+
+
+async def call(app, method, path, payload=None):
+    """
+    Send one HTTP request to an ASGI app.
+    Args:
+        app: ASGI application
+        method: HTTP method
+        path: Request path, optionally with a ?query string
+        payload: JSON body, or None to send an empty body
+    Returns:
+        (status code, decoded JSON response body)
+    """
+    path, _, query_string = path.partition("?")
+    body = json.dumps(payload).encode() if payload is not None else b""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string.encode("latin-1"),
+    }
+    await app(scope, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])